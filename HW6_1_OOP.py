@@ -1,9 +1,21 @@
 #region imports
+import gc
+from itertools import chain, repeat
+from operator import itemgetter, methodcaller
+import numpy as np
+from scipy import sparse
 from scipy.optimize import fsolve
+from scipy.sparse.linalg import splu
+from cycle_basis import fundamental_cycle_arrays
 #endregion
 
 #region class definitions
 class ResistorNetwork():
+    # blocks of a network file and the fields each may hold
+    FILE_BLOCKS = {'resistor': ('name', 'resistance', 'nodes'), 'source': ('name', 'value', 'type', 'nodes'),
+                   'loop': ('name', 'nodes')}
+    FILE_NUMBERS = ('resistance', 'value')  # fields read as numbers
+
     #region constructor
     def __init__(self):
         """
@@ -15,164 +27,458 @@ class ResistorNetwork():
         self.Loops = []  # initialize an empty list of loop objects in the network
         self.Resistors = []  # initialize an empty a list of resistor objects in the network
         self.VSources = []  # initialize an empty a list of source objects in the network
+        self.KirchoffMatrix = None  # sparse KCL/KVL equations of the elements and loops (see BuildKirchoffMatrices)
+        self.KirchoffRHS = None  # right hand side of those equations
+        # element name in either node order -> (element, +1 for its own order, -1 reversed), or None until the next
+        # lookup after the elements change (see ElementsChanged)
+        self.ElementIndex = None
+        self.NodeNames = None  # node names of the element tables read from a file (see SetElementTables)
+    #endregion
+
+    #region properties
+    @property
+    def Resistors(self):
+        """
+        The list of resistor objects in the network, which tells the network whenever it changes (see ElementList).
+        """
+        return self._Resistors
+
+    @Resistors.setter
+    def Resistors(self, elements):
+        self._Resistors = ElementList(self, elements)
+        self.ElementsChanged()
+
+    @property
+    def VSources(self):
+        """
+        The list of voltage source objects in the network, which tells the network whenever it changes.
+        """
+        return self._VSources
+
+    @VSources.setter
+    def VSources(self, elements):
+        self._VSources = ElementList(self, elements)
+        self.ElementsChanged()
     #endregion
 
     #region methods/functions
-    def BuildNetworkFromFile(self, filename):
+    def BuildNetworkFromFile(self, filename, chunk_size=1 << 20):
         """
         This function reads the lines from a file and processes the file to populate the fields
         for Loops, Resistors and Voltage Sources
+        The file is read as a stream in one pass, chunk_size characters at a time: each line is a comment ('#'), an
+        opening or closing tag of a <Resistor>, <Source> or <Loop> block, or a 'field = value' line inside a block (see
+        FILE_BLOCKS).  Only whole tags open and close blocks, so names containing 'resistor', 'source' or 'loop' are
+        read as names.  Each chunk is made lower case and split into lines at once.  Blocks laid out alike are read a
+        run at a time (see ReadBlockRun), and any other block is read line by line.  The elements are handed to the
+        network in bulk at the end, so it does not discard what it derived from them once per element (see
+        ElementsChanged), and their nodes are numbered into node index pairs (see SetElementTables).  Garbage
+        collection is paused while reading, as every object made is kept.
         :param filename: string for file to process
+        :param chunk_size: number of characters read at a time
         :return: nothing
+        :raises ValueError: for a malformed file, naming the file and line
+        """
+        elements = {kind: [] for kind in self.FILE_BLOCKS}  # the objects made from the blocks of each type
+        ends = {kind: [] for kind in self.FILE_BLOCKS}  # node names of those elements, two per element
+        tags = {}  # tag line as written (lower case) -> (block type, True if it closes the block)
+        for kind in self.FILE_BLOCKS:
+            tags['<{}>'.format(kind)] = (kind, False)
+            tags['</{}>'.format(kind)] = (kind, True)
+        names = {kind: {} for kind in self.FILE_BLOCKS}  # block type -> {field text as written: field name}
+        kind = None  # type of the block being read line by line
+        fields = None  # fields of that block: {field: [value]}
+        known = {}  # field names of its type seen so far (none outside of a block)
+        start = 0  # line number of its tag
+        first = 1  # line number of the first line of the chunk
+        rest = ''  # start of a line left over from the previous chunk
+
+        def error(LineNum, message):
+            return ValueError("{}, line {}: {}".format(filename, LineNum, message))
+
+        def LinesError(at, message):
+            # an error on lines[at] of the chunk
+            return error(first + at, message)
+
+        def BlockError(message, block, field=None):
+            # an error in the block read line by line, on the line of its tag (a field's number was checked on its line)
+            return error(start, message)
+
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            with open(filename, "r") as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    text = rest + chunk
+                    end = text.rfind('\n') if chunk else len(text)  # the last line may go on in the next chunk
+                    if end < 0:
+                        rest = text
+                        continue
+                    text, rest = text[:end], text[end + 1:]
+                    lines = text.lower().split('\n')
+                    i = 0  # index in lines of the line being read
+                    while i < len(lines):
+                        lineTxt = lines[i]
+                        if not lineTxt:
+                            i += 1
+                            continue  # skips blank lines
+                        tag = tags.get(lineTxt)
+                        if tag is not None and kind is None and not tag[1]:
+                            run = self.ReadBlockRun(tag[0], lines, i, LinesError)
+                            if run is not None:
+                                i, made, nodes = run
+                                elements[tag[0]] += made
+                                ends[tag[0]] += nodes
+                                continue
+                        LineNum = first + i
+                        i += 1
+                        if tag is None:
+                            field, equals, value = lineTxt.partition('=')
+                            name = known.get(field) if equals else None
+                            if name is None:  # a line not seen before
+                                stripped = lineTxt.strip()
+                                if not stripped or stripped[0] == '#':
+                                    continue  # skips blank and comment lines
+                                if stripped[0] == '<':
+                                    tag = tags.get(stripped.replace(' ', ''))
+                                elif equals and kind is not None and field.strip() in self.FILE_BLOCKS[kind]:
+                                    name = known[field] = field.strip()
+                                if tag is not None:
+                                    tags[lineTxt] = tag
+                                elif name is None:
+                                    lineTxt = text.split('\n')[i - 1].strip()  # as written
+                                    if lineTxt[0] == '<':
+                                        raise error(LineNum, "unknown tag {}".format(lineTxt))
+                                    if not equals:
+                                        raise error(LineNum, "expected a tag or 'field = value', not '{}'".format(
+                                            lineTxt))
+                                    if kind is None:
+                                        raise error(LineNum, "'{}' is outside of any block".format(lineTxt))
+                                    raise error(LineNum, "unknown field '{}' in <{}>".format(field.strip(), kind))
+                            if name is not None:
+                                if name in self.FILE_NUMBERS:
+                                    try:
+                                        value = float(value)
+                                    except ValueError:
+                                        raise error(LineNum, "{} '{}' is not a number".format(
+                                            name, value.strip())) from None
+                                fields[name] = [value]
+                                continue
+                        if not tag[1]:
+                            if kind is not None:
+                                raise error(LineNum, "<{}> inside the <{}> opened on line {}".format(
+                                    tag[0], kind, start))
+                            kind, fields, known, start = tag[0], {}, names[tag[0]], LineNum
+                            continue
+                        if kind != tag[0]:
+                            raise error(LineNum, "</{}> without an open <{}>".format(tag[0], tag[0]))
+                        made, nodes = self.MakeElements(kind, fields, BlockError)
+                        elements[kind] += made
+                        ends[kind] += nodes
+                        kind, known = None, {}
+                    first += len(lines)
+                    if not chunk:
+                        break
+            if kind is not None:
+                raise error(start, "<{}> is never closed".format(kind))
+
+            # replace any previous elements
+            self.Resistors = elements['resistor']
+            self.VSources = elements['source']
+            self.Loops = elements['loop']
+            # number the nodes in order of first appearance
+            index = {}
+            pairs = [np.array([index.setdefault(n, len(index)) for n in ends[k]], dtype=int).reshape(-1, 2)
+                     for k in ('resistor', 'source')]
+            self.SetElementTables(list(index), *pairs)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def ReadBlockRun(self, kind, lines, i, error):
+        """
+        Reads at once the blocks of one type that follow each other from lines[i] on laid out alike, as in files
+        written by a program: the same tags and fields, spelled the same way on the same lines, and the same number of
+        blank lines between blocks.  With P lines from one opening tag to the next, the lines holding a field are
+        then lines[k::P] for the offset k of its line in the first block, so the run is checked and read a column of
+        lines at a time rather than line by line.  The run ends at the first block laid out otherwise, or the last
+        block closed in lines.
+        :param kind: type of the block opened at lines[i]
+        :param lines: list of the lower case lines of a chunk of the file
+        :param i: index in lines of the opening tag of the first block
+        :param error: function of (index in lines, message) returning the exception to raise
+        :return: (index in lines after the run, list of its elements, list of their node names), or None if the first
+        block is not closed in lines or holds other lines than fields, to be read line by line
+        """
+        try:  # a block of nothing but fields, one line for each at most
+            j = lines.index('</{}>'.format(kind), i + 1, i + 2 + len(self.FILE_BLOCKS[kind]))
+        except ValueError:
+            return None
+        layout = {}  # offset of each field line from the opening tag -> the text starting the line up to the '='
+        where = {}  # field -> offset of its line
+        for offset, lineTxt in enumerate(lines[i + 1:j], 1):
+            field, equals, value = lineTxt.partition('=')
+            if not equals or field.strip() not in self.FILE_BLOCKS[kind] or field.strip() in where:
+                return None
+            layout[offset] = field + equals
+            where[field.strip()] = offset
+        k = j + 1
+        while k < len(lines) and not lines[k]:
+            k += 1
+        period = k - i  # lines from one opening tag to the next
+        count = (len(lines) - 1 - j) // period + 1  # blocks closed in lines
+
+        def column(offset):
+            # the line at offset from the opening tag in each block of the run
+            return lines[i + offset:i + offset + count * period:period]
+
+        for offset in range(period):
+            # each column is checked as a whole, and its first line laid out otherwise found only if there is one
+            same = column(offset)
+            if offset in layout:
+                if all(map(str.startswith, same, repeat(layout[offset]))):
+                    continue
+                alike = list(map(str.startswith, same, repeat(layout[offset])))
+            else:  # a tag or a blank line
+                if same.count(lines[i + offset]) == len(same):
+                    continue
+                alike = list(map(lines[i + offset].__eq__, same))
+            # a blank line laid out otherwise only ends the run after its block
+            count = min(count, alike.index(False) + (offset > j - i))
+
+        fields = {field: list(map(itemgetter(slice(len(layout[offset]), None)), column(offset)))
+                  for field, offset in where.items()}  # field -> list of its value in each block
+        made, nodes = self.MakeElements(kind, fields, lambda message, block, field=None: error(
+            i + block * period + where.get(field, 0), message))
+        return j + (count - 1) * period + 1, made, nodes
+
+    def MakeElements(self, kind, fields, error):
+        """
+        Make the resistor, voltage source or loop objects of one or more blocks of a network file of one type.
+        :param kind: 'resistor', 'source' or 'loop'
+        :param fields: dictionary of field name to the list of its value in each block, as text (a float may be given
+        for FILE_NUMBERS)
+        :param error: function of (message, index of the block at fault, the field at fault or None for the whole
+        block) returning the exception to raise
+        :return: (list of the new objects, list of their node names, two per resistor or source)
         """
-        FileTxt = open(filename,"r").read().split('\n')  # reads from file and then splits the string at the new line characters
-        LineNum = 0  # a counting variable to point to the line of text to be processed from FileTxt
-        # erase any previous
-        self.Resistors = []
-        self.VSources = []
-        self.Loops = []
-        LineNum = 0
-        lineTxt = ""
-        FileLength = len(FileTxt)
-        while LineNum < FileLength:
-            lineTxt = FileTxt[LineNum].lower().strip()
-            if len(lineTxt) <1:
-                pass # skip
-            elif lineTxt[0] == '#':
-                pass  # skips comment lines
-            elif "resistor" in lineTxt:
-                LineNum = self.MakeResistor(LineNum, FileTxt)
-            elif "source" in lineTxt:
-                LineNum = self.MakeVSource(LineNum, FileTxt)
-            elif "loop" in lineTxt:
-                LineNum = self.MakeLoop(LineNum, FileTxt)
-            LineNum+=1
-        pass
-
-    def MakeResistor(self, N, Txt):
-        """
-        Make a resistor object from reading the text file starting after detecting '<resistor>' in the text file.
-        :param N: (int) Line number for current processing
-        :param Txt: [string] the lines of the text file
-        :return: a resistor object
-        """
-        R = Resistor()  # instantiate a new resistor object
-        N += 1  # <Resistor> was detected, so move to next line in Txt
-        txt = Txt[N].lower()  # retrieve line from Txt and make it lower case
-        while "resistor" not in txt:
-            if "name" in txt:
-                R.Name = txt.split('=')[1].strip()
-            if "resistance" in txt:
-                R.Resistance = float(txt.split('=')[1].strip())
-            N+=1
-            txt=Txt[N].lower()
-
-        self.Resistors.append(R)  # append the resistor object to the list of resistors
-        return N
-
-    def MakeVSource (self, N, Txt):
-        """
-        Make a voltage source object from reading the text file
-        :param N: (int) Line number for current processing
-        :param Txt: [string] the lines of the text file
-        :return: a voltage source object
-        """
-        VS=VoltageSource()
-        N+=1
-        txt = Txt[N].lower()
-        while "source" not in txt:
-            if "name" in txt:
-                VS.Name = txt.split('=')[1].strip()
-            if "value" in txt:
-                VS.Voltage = float(txt.split('=')[1].strip())
-            if "type" in txt:
-                VS.Type = txt.split('=')[1].strip()
-            N+=1
-            txt=Txt[N].lower()
-
-        self.VSources.append(VS)
-        return N
-
-    def MakeLoop(self, N, Txt):
-        """
-        Make a Loop object from reading the text file
-        :param N: (int) Line number for current processing
-        :param Txt: [string] the lines of the text file
-        :return: a resistor object
-        """
-        L=Loop()
-        N+=1
-        txt = Txt[N].lower()
-        while "loop" not in txt:
-            if "name" in txt:
-                L.Name = txt.split('=')[1].strip()
-            if "nodes" in txt:
-                txt=txt.replace(" ","")
-                L.Nodes = txt.split('=')[1].strip().split(',')
-            N+=1
-            txt=Txt[N].lower()
-
-        self.Loops.append(L)
-        return N
-
-    def AnalyzeCircuit(self):
-        """
-        Use fsolve to find currents in the resistor network.
+        try:
+            if kind == 'loop':
+                loops = []
+                for name, nodes in zip(fields.get('name', repeat('')), fields['nodes']):
+                    L = Loop()
+                    L.Name = name.strip()
+                    L.Nodes = nodes.replace(' ', '').strip().split(',')
+                    loops.append(L)
+                return loops, []
+            field = 'resistance' if kind == 'resistor' else 'value'
+            names = list(map(str.strip, fields['name']))
+            values = fields[field]
+        except KeyError as missing:
+            raise error("<{}> has no {}".format(kind, missing.args[0]), 0) from None
+        try:
+            values = list(map(float, values))
+        except ValueError:
+            for block, value in enumerate(values):
+                try:
+                    float(value)
+                except ValueError:
+                    raise error("{} '{}' is not a number".format(field, value.strip()), block, field) from None
+        if 'nodes' in fields:
+            nodes = list(map(str.split, map(str.strip, map(methodcaller('replace', ' ', ''), fields['nodes'])),
+                             repeat(',')))
+            pairs = nodes
+        else:
+            nodes = repeat(None)
+            pairs = [(name[:1], name[1:]) for name in names]  # the two letters of the name
+        ends = list(chain.from_iterable(pairs))
+        if len(ends) != 2 * len(names) or '' in ends:
+            block = next(block for block, pair in enumerate(pairs) if len(pair) != 2 or '' in pair)
+            raise error("{} {} does not name two nodes".format(kind, names[block]), block)
+        if kind == 'resistor':
+            return list(map(Resistor, values, repeat(0.0), names, nodes)), ends
+        sources = list(map(VoltageSource, values, names, nodes))
+        for e, Type in zip(sources, fields.get('type', ())):
+            e.Type = Type.strip()
+        return sources, ends
+
+    def SetElementTables(self, names, resistor_nodes, source_nodes):
+        """
+        Stores the node numbering of the network as arrays, as read from a file: the node names and the node index
+        pairs of the resistors and the voltage sources.  GetNodeIndices numbers the nodes from these tables until the
+        elements change, which discards them (see ElementsChanged); resistances and voltages are always read from the
+        element objects.
+        :param names: list of node names, in order of node index
+        :param resistor_nodes: integer array of the first and second node index of each resistor
+        :param source_nodes: integer array of the first and second node index of each voltage source
+        :return: nothing
+        """
+        self.NodeNames = names
+        self.ResistorNodes = resistor_nodes
+        self.SourceNodes = source_nodes
+
+    def AnalyzeCircuit(self, solver='kirchoff'):
+        """
+        Find the currents in the resistor network.
         1. KCL:  The total current flowing into any node in the network is zero.
         2. KVL:  When traversing a closed loop in the circuit, the net voltage drop must be zero.
-        :return: a list of the currents in the resistor network
+        The unknowns and equations come from the resistors, sources and loops of the network (see
+        BuildKirchoffMatrices), so no circuit needs its own GetKirchoffVals.
+        Loops not listed in the file are found automatically.
+        The equations are linear, so by default the sparse system is solved directly by LU factorization.  With
+        solver='fsolve' the residual GetKirchoffVals is solved with fsolve instead, which works with a dense Jacobian
+        and so only suits small networks.  With solver='mna' the network is solved by modified nodal analysis (see
+        SolveMNA), which needs no loops at all.
+        :param solver: 'kirchoff', 'fsolve' or 'mna'
+        :return: a list of the current of each resistor in self.Resistors, positive from the first to the second
+        node of its name
+        :raises ValueError: if the loops do not give as many independent equations as there are currents
         """
-        # need to set the currents to that Kirchoff's laws are satisfied
-        i0 = [1.0, 1.0, 1.0]  # Adjust the size of this list based on the actual number of currents you are solving for
-        i = fsolve(self.GetKirchoffVals,i0)
+        if solver == 'mna':
+            self.SolveMNA()
+        else:
+            M, rhs = self.BuildKirchoffMatrices()
+            if M.shape[0] != M.shape[1]:
+                loops = M.shape[0] - len(self.GetNodes()) + 1
+                raise ValueError("{} KCL and KVL equations for {} unknown currents: the network needs {} independent "
+                                 "loops, not {}".format(M.shape[0], M.shape[1], M.shape[1] - M.shape[0] + loops, loops))
+            if solver == 'fsolve':
+                i = fsolve(self.GetKirchoffVals, np.ones(M.shape[1]))  # one current per resistor and source
+            else:
+                try:
+                    i = splu(M.tocsc()).solve(rhs)
+                except RuntimeError:  # an exactly singular factor
+                    raise ValueError("The KCL and KVL equations are singular: the loops are not independent") from None
+            for e, c in zip(self.Resistors + self.VSources, i.tolist()):
+                e.Current = c
+        i = [r.Current for r in self.Resistors]
         # print output to the screen
-        print("I1 = {:0.01f} ohms".format(i[0]))
-        print("I2 = {:0.01f} ohms".format(i[1]))
-        print("I3 = {:0.01f} ohms".format(i[2]))
+        for r in self.Resistors:
+            print("I_{} = {:0.01f} amps".format(r.Name, r.Current))
         return i
 
+    def BuildKirchoffMatrices(self):
+        """
+        Derives the KCL and KVL equations of the network from its resistors, sources and loops as one sparse linear
+        system M i = rhs, stored in self.KirchoffMatrix and self.KirchoffRHS.
+        The unknowns i are the currents of self.Resistors followed by self.VSources, each positive from the first to
+        the second node of the element's name.  The first rows are KCL at every node but the first (the node incidence
+        matrix; the equation of the last node follows from the others) and the remaining rows are KVL around each loop
+        (the loop incidence matrix, signed by the direction of traversal, times the resistances, with the source
+        voltages on the right hand side).  The loops are those of self.Loops or, if the file lists none, a fundamental
+        cycle basis of the network (see cycle_basis.fundamental_cycle_arrays).
+        :return: (M as scipy.sparse.csr_matrix, rhs as ndarray)
+        """
+        names, ends = self.GetNodeIndices()
+        nodes = {n: k for k, n in enumerate(names)}
+        E = len(ends)
+        k = np.arange(E)
+        # node incidence: element k takes current out of its first node and into its second
+        B = sparse.csr_matrix((np.r_[-np.ones(E), np.ones(E)], (ends.T.ravel(), np.r_[k, k])), shape=(len(nodes), E))
+
+        # loops as lists of (element index, +1 when traversed from its first to its second node, -1 against)
+        if self.Loops:
+            element = {}
+            for j, (a, b) in enumerate(ends.tolist()):
+                element[a, b] = (j, 1)
+                element[b, a] = (j, -1)
+            loops = []
+            for l, L in enumerate(self.Loops):
+                loop = []
+                for p, q in zip(L.Nodes, L.Nodes[1:] + L.Nodes[:1]):
+                    if (nodes.get(p), nodes.get(q)) not in element:
+                        raise ValueError("Loop {} has no element between nodes {} and {}".format(
+                            getattr(L, 'Name', l), p, q))
+                    loop.append(element[nodes[p], nodes[q]])
+                loops.append(loop)
+            start = np.cumsum([0] + [len(L) for L in loops])
+            cols = np.array([j for L in loops for j, sign in L], dtype=int)
+            signs = np.array([sign for L in loops for j, sign in L], dtype=float)
+        else:
+            start, cols, signs = fundamental_cycle_arrays([tuple(e) for e in ends.tolist()])
+        # loop incidence matrix, one row per loop
+        C = sparse.csr_matrix((signs.astype(float), cols, start), shape=(len(start) - 1, E))
+
+        # traversing a resistor along its current drops the voltage by i R; traversing a source raises it by V
+        R, V = self.GetElementValues()
+        R = np.r_[R, np.zeros(len(V))]
+        V = np.r_[np.zeros(len(self.Resistors)), V]
+        self.KirchoffMatrix = sparse.vstack([B[1:], -C @ sparse.diags(R)]).tocsr()
+        self.KirchoffRHS = np.r_[np.zeros(len(nodes) - 1), -(C @ V)]
+        return self.KirchoffMatrix, self.KirchoffRHS
+
     def GetKirchoffVals(self,i):
         """
-        This function uses Kirchoff Voltage and Current laws to analyze this specific circuit
+        This function uses Kirchoff Voltage and Current laws to analyze the circuit
         KVL:  The net voltage drop for a closed loop in a circuit should be zero
         KCL:  The net current flow into a node in a circuit should be zero
-        :param i: a list of currents relevant to the circuit
-        :return: a list of loop voltage drops and node currents
-        """
-        # set current in resistors in the top loop.
-        self.GetResistorByName('ad').Current=i[0]  #I_1 in diagram
-        self.GetResistorByName('bc').Current=i[0]  #I_1 in diagram
-        self.GetResistorByName('cd').Current=i[2]  #I_3 in diagram
-        #set current in resistor in bottom loop.
-        self.GetResistorByName('ce').Current=i[1]  #I_2 in diagram
-        #calculate net current into node c
-        Node_c_Current = sum([i[0],i[1],-i[2]])
-
-        KVL = self.GetLoopVoltageDrops()  # two equations here
-        KVL.append(Node_c_Current)  # one equation here
-        return KVL
+        The residual is one sparse matrix-vector product with the equations from BuildKirchoffMatrices.
+        :param i: a list of the currents of self.Resistors followed by self.VSources
+        :return: an array of node currents followed by loop voltage drops
+        """
+        if self.KirchoffMatrix is None:
+            self.BuildKirchoffMatrices()
+        return self.KirchoffMatrix @ np.asarray(i, dtype=float) - self.KirchoffRHS
+
+    def IndexElements(self):
+        """
+        Builds the lookup of resistors and voltage sources by name and by their pair of nodes in either order (e.g.
+        'ad' and 'da'), so finding an element is one dictionary lookup instead of a scan of the element lists.
+        This is done on the first lookup after the network is read from a file and again after any change to the
+        elements (see ElementsChanged), so solvers that never look elements up by name do not pay for it.
+        :return: nothing
+        """
+        index = {}
+        # resistors are indexed last, so they win over sources between the same two nodes (as in the old scans)
+        for e in self.VSources + self.Resistors:
+            a, b = e.GetNodes()
+            index[b + a] = (e, -1)
+            index[a + b] = (e, 1)
+            index[e.Name] = (e, 1)
+        self.ElementIndex = index
+
+    def ElementsChanged(self):
+        """
+        Discards everything derived from the resistors and voltage sources: the element index, the node tables
+        read from a file and the KCL/KVL equations.  Adding, removing or replacing elements in self.Resistors or
+        self.VSources calls this itself; call it after editing the name or nodes of an element in place (their
+        resistances and voltages are read afresh by every solve).
+        :return: nothing
+        """
+        self.ElementIndex = None
+        self.NodeNames = self.ResistorNodes = self.SourceNodes = None
+        self.KirchoffMatrix = None
+        self.KirchoffRHS = None
+
+    def GetElement(self, name):
+        """
+        Retrieves a resistor or a voltage source by its name or its nodes in either order.
+        :param name: element name, e.g. 'ad' or 'da'
+        :return: (the element, +1 if name is in the element's own node order or -1 if reversed), or (None, 0) if
+        there is no such element
+        """
+        if self.ElementIndex is None:
+            self.IndexElements()
+        return self.ElementIndex.get(name, (None, 0))
 
     def GetElementDeltaV(self, name):
         """
         Need to retrieve either a resistor or a voltage source by name.
-        :param name:
-        :return:
+        :param name: the element traversed from its first to its second node, e.g. 'da' traverses element 'ad'
+        from d to a
+        :return: the voltage change across the element in the direction of traversal
         """
-        for r in self.Resistors:
-            if name == r.Name:
-                return -r.DeltaV()
-            if name[::-1] == r.Name:
-                return -r.DeltaV()
-        for v in self.VSources:
-            if name == v.Name:
-                return v.Voltage
-            if name[::-1] == v.Name:
-                return v.Voltage
+        e, sign = self.GetElement(name)
+        if isinstance(e, Resistor):
+            return -sign*e.DeltaV()  # the voltage drops along the direction of the current
+        if isinstance(e, VoltageSource):
+            return sign*e.Voltage
 
     def GetLoopVoltageDrops(self):
         """
         This calculates the net voltage drop around a closed loop in a circuit based on the
-        current flowing through resistors (cause a drop in voltage regardless of direction of traversal) or
+        current flowing through resistors (cause a drop in voltage along the direction of the current) or
         the value of the voltage source that have been set up as positive based on the direction of traversal.
         :return: net voltage drop for all loops in the network.
         """
@@ -182,22 +488,132 @@ class ResistorNetwork():
             loopDeltaV=0
             for n in range(len(L.Nodes)):
                 if n == len(L.Nodes)-1:
-                    name = L.Nodes[0] + L.Nodes[n]
+                    name = L.Nodes[n] + L.Nodes[0]
                 else:
                     name = L.Nodes[n]+L.Nodes[n+1]
                 loopDeltaV += self.GetElementDeltaV(name)
             loopVoltages.append(loopDeltaV)
         return loopVoltages
 
+    def GetNodes(self):
+        """
+        Collects the nodes of all resistors and voltage sources.
+        :return: a dictionary of node name to node index, in sorted order of the node names
+        """
+        names, ends = self.GetNodeIndices()
+        return {n: k for k, n in enumerate(names)}
+
+    def GetNodeIndices(self):
+        """
+        Numbers the nodes of the network in one pass over its elements, or from the element tables read from a file.
+        :return: (sorted list of node names, integer array with one row per element of self.Resistors followed by
+        self.VSources holding the indices of its first and second node)
+        """
+        if self.NodeNames is not None:
+            names = self.NodeNames
+            ends = np.concatenate([self.ResistorNodes, self.SourceNodes])
+        else:
+            index = {}  # node name -> index in order of first appearance
+            ends = [index.setdefault(n, len(index)) for e in self.Resistors + self.VSources for n in e.GetNodes()]
+            names = list(index)
+        order = sorted(range(len(names)), key=names.__getitem__)
+        rank = np.empty(len(names), dtype=int)
+        rank[order] = np.arange(len(names))
+        return [names[k] for k in order], rank[np.array(ends, dtype=int)].reshape(-1, 2)
+
+    def GetElementValues(self):
+        """
+        Collects the resistances and source voltages of the network from the element objects, so values edited in
+        place are always used.
+        :return: (array of the resistances of self.Resistors, array of the voltages of self.VSources)
+        """
+        return (np.array([r.Resistance for r in self.Resistors], dtype=float),
+                np.array([v.Voltage for v in self.VSources], dtype=float))
+
+    def BuildMNA(self, ground=None):
+        """
+        Assembles the modified nodal analysis (MNA) system A x = b of the network as a sparse matrix.
+        The unknowns x are the voltages of every node except the ground node, followed by the current through each
+        voltage source (and each zero-ohm resistor, which is treated as a 0 V source) from its first to its second
+        node.  The first len(nodes)-1 rows are KCL at the non-ground nodes (conductance stamps of the resistors plus
+        the source currents) and the remaining rows fix the voltage across each source, written so that A is
+        symmetric.  The stamps are assembled as coordinate arrays, so building the matrix costs one pass over the
+        elements and no dense storage.
+        :param ground: name of the reference node at 0 V (default: the first node in sorted order)
+        :return: (A as scipy.sparse.csc_matrix, b as ndarray, dictionary of node name to node index, list of the
+        elements carrying the current unknowns, node index pairs of the elements as from GetNodeIndices)
+        """
+        names, ends = self.GetNodeIndices()
+        nodes = {n: k for k, n in enumerate(names)}
+        if ground is not None and ground not in nodes:
+            raise ValueError("Ground node {} is not in the network".format(ground))
+        g = nodes[ground] if ground is not None else 0
+        # node index -> unknown index, with the ground node removed (-1)
+        col = np.arange(len(nodes)) - (np.arange(len(nodes)) > g)
+        col[g] = -1
+
+        R, Vs = self.GetElementValues()
+        short = R == 0
+        branches = [r for r, z in zip(self.Resistors, short) if z] + self.VSources
+        n = len(nodes) - 1
+        m = len(branches)
+
+        # resistor conductance stamps: +g on the two diagonals, -g off the diagonal
+        ra, rb = col[ends[:len(R)][~short]].T
+        cond = 1.0 / R[~short]
+        rows = [ra, rb, ra, rb]
+        cols = [ra, rb, rb, ra]
+        vals = [cond, cond, -cond, -cond]
+
+        # voltage source stamps: current k leaves node a through the source and enters node b, and V_a - V_b = -V
+        sa, sb = col[np.concatenate([ends[:len(R)][short], ends[len(R):]])].T
+        k = n + np.arange(m)
+        rows += [sa, sb, k, k]
+        cols += [k, k, sa, sb]
+        vals += [np.ones(m), -np.ones(m), np.ones(m), -np.ones(m)]
+
+        rows, cols, vals = (np.concatenate(a) for a in (rows, cols, vals))
+        keep = (rows >= 0) & (cols >= 0)  # drop the ground row and column
+        A = sparse.csc_matrix((vals[keep], (rows[keep], cols[keep])), shape=(n + m, n + m))
+        b = np.zeros(n + m)
+        b[n:] = -np.r_[np.zeros(short.sum()), Vs]
+        return A, b, nodes, branches, ends
+
+    def SolveMNA(self, ground=None):
+        """
+        Solves the network by modified nodal analysis with a direct sparse LU factorization (SuperLU, with a
+        minimum degree ordering of the symmetric MNA matrix).
+        Sets the current of every resistor (positive from the first to the second node of its name) and stores
+        the node voltages in self.NodeVoltages.
+        :param ground: name of the reference node at 0 V (default: the first node in sorted order)
+        :return: a dictionary of node name to node voltage
+        """
+        A, b, nodes, branches, ends = self.BuildMNA(ground)
+        lu = splu(A, permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0.1, options={'SymmetricMode': True})
+        x = lu.solve(b)
+        n = len(nodes) - 1
+        V = np.insert(x[:n], nodes[ground] if ground is not None else 0, 0.0)
+        R = self.GetElementValues()[0]
+        Va, Vb = V[ends[:len(R)]].T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            I = (Va - Vb) / R
+        for r, i, short in zip(self.Resistors, I.tolist(), (R == 0).tolist()):
+            if not short:
+                r.Current = i
+        for e, i in zip(branches, x[n:].tolist()):
+            e.Current = i
+        self.NodeVoltages = dict(zip(nodes, V.tolist()))
+        return self.NodeVoltages
+
     def GetResistorByName(self, name):
         """
         A way to retrieve a resistor object from self.Resistors based on resistor name
-        :param name:
-        :return:
+        :param name: resistor name, with its nodes in either order
+        :return: the resistor, or None if there is no such resistor
         """
-        for r in self.Resistors:
-            if r.Name == name:
-                return r
+        r, sign = self.GetElement(name)
+        if isinstance(r, Resistor):
+            return r
     #endregion
 
 class Loop():
@@ -209,18 +625,90 @@ class Loop():
         self.Nodes = []
     #endregion
 
+class ElementList(list):
+    """
+    A list of resistors or voltage sources that calls ElementsChanged of its network after every change, so the
+    network rebuilds what it derived from the elements rather than use stale lookups.
+    """
+    def __init__(self, network, elements=()):
+        """
+        :param network: the ResistorNetwork holding the list
+        :param elements: the initial elements
+        """
+        super().__init__(elements)
+        self.Network = network
+
+    #region methods that change the list
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.Network.ElementsChanged()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.Network.ElementsChanged()
+
+    def __iadd__(self, elements):
+        super().__iadd__(elements)
+        self.Network.ElementsChanged()
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self.Network.ElementsChanged()
+        return self
+
+    def append(self, element):
+        super().append(element)
+        self.Network.ElementsChanged()
+
+    def extend(self, elements):
+        super().extend(elements)
+        self.Network.ElementsChanged()
+
+    def insert(self, index, element):
+        super().insert(index, element)
+        self.Network.ElementsChanged()
+
+    def pop(self, index=-1):
+        element = super().pop(index)
+        self.Network.ElementsChanged()
+        return element
+
+    def remove(self, element):
+        super().remove(element)
+        self.Network.ElementsChanged()
+
+    def clear(self):
+        super().clear()
+        self.Network.ElementsChanged()
+
+    def sort(self, *, key=None, reverse=False):
+        super().sort(key=key, reverse=reverse)
+        self.Network.ElementsChanged()
+
+    def reverse(self):
+        super().reverse()
+        self.Network.ElementsChanged()
+    #endregion
+
 class Resistor():
+    # fixed attribute slots instead of a per-instance __dict__, as a network read from a file may hold many elements
+    __slots__ = ('Resistance', 'Current', 'Name', 'Nodes')
+
     # region constructor
-    def __init__(self, R=1.0, i=0.0, name='ab'):
+    def __init__(self, R=1.0, i=0.0, name='ab', nodes=None):
         """
         Defines a resistor to have a self.Resistance, self.Current, and self.Name instance variables.
         :param R: resistance in Ohm
         :param i: current in amps
         :param name: name of resistor by alphabetically ordered pair of node names
+        :param nodes: pair of node names, for networks with node names longer than one letter (default: the two
+        letters of name)
         """
         self.Resistance = R  # Assigns the resistance value to the instance variable
         self.Current = i     # Assigns the current value to the instance variable
         self.Name = name     # Assigns the name to the instance variable
+        self.Nodes = nodes   # Assigns the node pair (None to take it from the name) to the instance variable
     # endregion
 
 
@@ -231,19 +719,34 @@ class Resistor():
         :return: the signed value of voltage drop.  Voltage drop > 0 in direction of positive current flow.
         """
         return self.Current*self.Resistance
+
+    def GetNodes(self):
+        """
+        The two nodes the resistor connects.
+        :return: a tuple of node names, from self.Nodes or else the two letters of self.Name
+        """
+        return tuple(self.Nodes) if self.Nodes is not None else (self.Name[0], self.Name[1:])
     #endregion
 
 class VoltageSource():
+    __slots__ = ('Voltage', 'Name', 'Nodes', 'Current', 'Type')
+
     #region constructor
-    def __init__(self, V=12.0, name='ab'):
+    def __init__(self, V=12.0, name='ab', nodes=None):
         """
         Define a voltage source with instance variables of self.Voltage = V, self.Name = name
         :param V: The voltage
         :param name: the name of voltage source.  The voltage source naming convention is to use the nodes such as 'ab'
         where the order of the nodes goes in the direction of positive voltage change as I traverse the loop from a to b.
+        :param nodes: pair of node names, for networks with node names longer than one letter (default: the two
+        letters of name)
         """
         self.Voltage = V
         self.Name=name
+        self.Nodes = nodes
+        self.Current = 0.0  # current through the source from its first to its second node, set by SolveMNA
+
+    GetNodes = Resistor.GetNodes
 
 #endregion
 
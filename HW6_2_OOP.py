@@ -3,6 +3,7 @@ import numpy as np
 import math
 from scipy.optimize import fsolve
 import random as rnd
+from cycle_basis import fundamental_cycles
 # endregion
 
 # region class definitions
@@ -221,8 +222,11 @@ class PipeNetwork():
         '''
         a method to analyze the pipe network and find the flow rates in each pipe
         given the constraints of: i) no net flow into a node and ii) no net pressure drops in the loops.
+        If no loops were added, they are found automatically (see buildLoops).
         :return: a list of flow rates in the pipes
         '''
+        if len(self.loops) == 0:
+            self.buildLoops()
         #see how many nodes and loops there are, this is how many equation results I will return
         N=len(self.nodes)+len(self.loops)
         # build an initial guess for flow rates in the pipes.
@@ -297,6 +301,13 @@ class PipeNetwork():
                 #instantiate a node object and append it to the list of nodes
                 self.nodes.append(Node(p.endNode,self.getNodePipes(p.endNode)))
 
+    def buildLoops(self):
+        #automatically create the loop objects from a fundamental cycle basis of the pipes (see cycle_basis.py)
+        #each loop starts at the start node of its first pipe and lists its pipes in order of traversal
+        edges=[(p.startNode, p.endNode) for p in self.pipes]
+        cycles=fundamental_cycles(edges)
+        self.loops=[Loop(str(n+1), [self.pipes[k] for k, s in c]) for n, c in enumerate(cycles)]
+
     def printPipeFlowRates(self):
         for p in self.pipes:
             p.printPipeFlowRate()
@@ -1,6 +1,7 @@
 import numpy as np
 import math
 from scipy.optimize import fsolve
+from cycle_basis import fundamental_cycles
 
 class Fluid:
     """Represents fluid properties."""
@@ -143,8 +144,17 @@ class PipeNetwork:
         """Add a loop to the network."""
         self.loops.append(loop)
 
+    def add_loops_from_pipes(self):
+        """Add a fundamental cycle basis of the pipes as the loops of the network (see cycle_basis.py)."""
+        pipes = list(self.pipes.values())
+        cycles = fundamental_cycles([(p.startNode, p.endNode) for p in pipes])
+        for cycle in cycles:
+            self.add_loop(Loop(str(len(self.loops) + 1), [pipes[k] for k, s in cycle]))
+
     def findFlowRates(self):
-        """Find flow rates in the network."""
+        """Find flow rates in the network, finding its loops first if none were added."""
+        if not self.loops:
+            self.add_loops_from_pipes()
         N = len(self.nodes) + len(self.loops)
         Q0 = np.full(N, 10)
 
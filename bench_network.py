@@ -0,0 +1,104 @@
+import time
+import numpy as np
+from bench_timing import rate
+from HW6_1_OOP import ResistorNetwork, Resistor, VoltageSource, Loop
+
+def grid_circuit(nx=71, ny=71):
+    """
+    Generates a grid of resistors with a voltage source across its corners and one loop per grid cell, plus the
+    loop closing through the source (the default has 9,941 elements and 4,901 loops).
+
+    Args:
+        nx (int, optional): Nodes along x. Defaults to 71.
+        ny (int, optional): Nodes along y. Defaults to 71.
+
+    Returns:
+        ResistorNetwork: The circuit, indexed and with its loops; node names are 'n<i>_<j>' and elements are named
+            by their two nodes.
+    """
+    Net = ResistorNetwork()
+    node = lambda i, j: 'n{}_{}'.format(i, j)
+    for i in range(nx):
+        for j in range(ny):
+            if i + 1 < nx:
+                a, b = node(i, j), node(i + 1, j)
+                Net.Resistors.append(Resistor(1.0, name=a + b, nodes=(a, b)))
+            if j + 1 < ny:
+                a, b = node(i, j), node(i, j + 1)
+                Net.Resistors.append(Resistor(2.0, name=a + b, nodes=(a, b)))
+    source = (node(0, 0), node(nx - 1, ny - 1))
+    Net.VSources.append(VoltageSource(10.0, name=source[0] + source[1], nodes=source))
+    for i in range(nx - 1):
+        for j in range(ny - 1):
+            L = Loop()
+            L.Name = 'cell {} {}'.format(i, j)
+            L.Nodes = [node(i, j), node(i + 1, j), node(i + 1, j + 1), node(i, j + 1)]
+            Net.Loops.append(L)
+    L = Loop()
+    L.Name = 'source'
+    L.Nodes = [node(i, 0) for i in range(nx)] + [node(nx - 1, j) for j in range(1, ny)]
+    Net.Loops.append(L)
+    Net.IndexElements()
+    return Net
+
+def scan_loop_voltage_drops(Net, loops):
+    """
+    Loop voltage drops by the linear scans of the element lists that GetElementDeltaV used before the element index
+    (kept only to measure them).
+
+    Args:
+        Net (ResistorNetwork): The circuit.
+        loops (list of Loop): The loops to evaluate.
+
+    Returns:
+        list of float: Net voltage drop of each loop.
+    """
+    def delta_v(p, q):
+        for r in Net.Resistors:
+            if r.Name == p + q or r.Name == q + p:
+                return -r.DeltaV()
+        for v in Net.VSources:
+            if v.Name == p + q or v.Name == q + p:
+                return v.Voltage
+    return [sum(delta_v(p, q) for p, q in zip(L.Nodes, L.Nodes[1:] + L.Nodes[:1])) for L in loops]
+
+def bench_residuals(nx=71, ny=71, sample=100):
+    """
+    Residual evaluations of a generated circuit of about 10^4 elements: the loop voltage drops by linear scans (as
+    before the element index), by the element index, and the full KCL/KVL residual as one sparse matrix-vector
+    product.
+
+    Args:
+        nx (int, optional): Grid nodes along x. Defaults to 71.
+        ny (int, optional): Grid nodes along y. Defaults to 71.
+        sample (int, optional): Loops timed with the linear scans, which are too slow to time over every loop; the
+            rate is scaled to all loops. Defaults to 100.
+
+    Returns:
+        dict: Elements, loops, residuals/s of each method and the speed up of the index over the scans.
+    """
+    Net = grid_circuit(nx, ny)
+    Net.SolveMNA()
+    i = np.array([e.Current for e in Net.Resistors + Net.VSources])
+    Net.BuildKirchoffMatrices()
+    loops = Net.Loops[::max(len(Net.Loops) // sample, 1)]  # spread over the element lists
+    results = {'elements': len(i), 'loops': len(Net.Loops),
+               'scan residuals/s': rate(lambda: scan_loop_voltage_drops(Net, loops), 1, repeat=1) * len(loops) /
+               len(Net.Loops),
+               'indexed residuals/s': rate(Net.GetLoopVoltageDrops, 1),
+               'matrix residuals/s': rate(lambda: Net.GetKirchoffVals(i), 1)}
+    results['index speed up'] = results['indexed residuals/s'] / results['scan residuals/s']
+    return results
+
+def main():
+    """
+    Runs the residual benchmark and prints the results.
+    """
+    start = time.perf_counter()
+    results = bench_residuals()
+    for metric, value in results.items():
+        print(f'{metric}: {value:,.4g}')
+    print(f'({time.perf_counter() - start:.1f} s)')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import numpy as np
+from bench_timing import rate
+from rankine import rankine, RankineSweep
+from steam import steam, STEAM_CACHE, get_backend
+from steam_tables import SteamTables, TABLES, convert_table, SAT_TABLE_FILE, SUPERHEATED_TABLE_FILE
+
+# Baselines are stored beside this file.  Throughput varies between machines, so record a baseline per machine
+# (python bench_rankine.py --save) before relying on the throughput checks.
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+# A run fails when a throughput metric (name ending in '/s') falls below (1 - THROUGHPUT_TOLERANCE) times its
+# baseline, or when an accuracy metric (any other name) rises above (1 + ACCURACY_TOLERANCE) times its baseline.
+THROUGHPUT_TOLERANCE = 0.5
+ACCURACY_TOLERANCE = 0.01
+
+def bench_steam(n=2000, seed=0):
+    """
+    Throughput of single steam objects in each region, and their accuracy against IF97 (h, or T for the inverse
+    lookup given h).
+
+    Args:
+        n (int, optional): States per timed run. Defaults to 2000.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: states/s and the largest difference from IF97 for saturated, superheated (given T) and
+            superheated (given h) states.
+    """
+    rng = np.random.default_rng(seed)
+    if97 = get_backend('if97')
+    p = rng.uniform(10, 10000, n)
+    x = rng.uniform(0, 1, n)
+    T = if97.saturation(p)[0] + rng.uniform(20, 150, n)
+    h_sup = if97.superheated(p, 'T', T)[0]
+    Tsat, hf, hg = if97.saturation(p)[:3]
+    # region: (given property, its values, the property checked, its IF97 value)
+    cases = {'saturated': ('x', x, 'h', hf + x * (hg - hf)), 'superheated': ('T', T, 'h', h_sup),
+             'superheated inverse': ('h', h_sup, 'T', T)}
+    results = {}
+    for region, (prop, values, check, reference) in cases.items():
+        def make():
+            return [steam(p[i], **{prop: values[i]}) for i in range(n)]
+        results[f'steam {region} states/s'] = rate(make, n)
+        error = np.abs(np.array([getattr(st, check) for st in make()], dtype=float) - reference)
+        results[f'steam {region} max {check} error'] = float(np.nanmax(error))
+    return results
+
+def bench_rankine(n=500, seed=0):
+    """
+    Throughput of single-point rankine objects, and the cycle efficiency against textbook values.
+
+    Args:
+        n (int, optional): Cycles per timed run. Defaults to 500.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: cycles/s with the steam state cache disabled and the efficiency error in percentage points.
+    """
+    rng = np.random.default_rng(seed)
+    p_high = rng.uniform(2000, 12000, n)
+    t_high = rng.uniform(400, 600, n)
+    STEAM_CACHE.enabled = False
+    try:
+        results = {'rankine cycles/s': rate(lambda: [rankine(8, p_high[i], t_high[i]) for i in range(n)], n)}
+    finally:
+        STEAM_CACHE.enabled = True
+    # Cengel & Boles, Example 10-1 (3 MPa, 350 °C, 75 kPa: 26.0 %) and 8 MPa saturated vapor to 8 kPa (37.1 %)
+    error = max(abs(rankine(75, 3000, 350).efficiency - 26.0), abs(rankine(8, 8000).efficiency - 37.1))
+    results['rankine textbook efficiency error'] = error
+    return results
+
+def bench_sweep(n=100000, seed=0):
+    """
+    Throughput of batched Rankine sweeps, and their agreement with the IF97 backend.
+
+    Args:
+        n (int, optional): Operating points per sweep. Defaults to 100000.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: operating points/s and the largest efficiency difference from IF97 in percentage points.
+    """
+    rng = np.random.default_rng(seed)
+    p_low, p_high, t_high = rng.uniform(5, 100, n), rng.uniform(2000, 12000, n), rng.uniform(400, 600, n)
+    results = {'sweep points/s': rate(lambda: RankineSweep(p_low, p_high, t_high), n)}
+    m = min(n, 10000)
+    table = RankineSweep(p_low[:m], p_high[:m], t_high[:m]).efficiency
+    analytic = RankineSweep(p_low[:m], p_high[:m], t_high[:m], backend='if97').efficiency
+    results['sweep max efficiency error vs IF97'] = float(np.nanmax(np.abs(table - analytic)))
+    return results
+
+def bench_tables():
+    """
+    Throughput of loading the steam tables from the text files and from the binary layout.
+
+    Returns:
+        dict: loads/s for each.
+    """
+    def load(sat_file, superheated_file):
+        tables = SteamTables(sat_file=sat_file, superheated_file=superheated_file)
+        tables.saturated()
+        tables.superheated()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sat_bin = convert_table(SAT_TABLE_FILE, os.path.join(tmp, 'sat.bin'))
+        sup_bin = convert_table(SUPERHEATED_TABLE_FILE, os.path.join(tmp, 'sup.bin'))
+        return {'text table loads/s': rate(lambda: load(SAT_TABLE_FILE, SUPERHEATED_TABLE_FILE), 1, repeat=5),
+                'binary table loads/s': rate(lambda: load(sat_bin, sup_bin), 1, repeat=5)}
+
+# The benchmark suite, by name.
+BENCHMARKS = {'steam': bench_steam, 'rankine': bench_rankine, 'sweep': bench_sweep, 'tables': bench_tables}
+
+def run(names=None):
+    """
+    Runs benchmarks.
+
+    Args:
+        names (iterable of str, optional): Benchmarks to run. Defaults to None (all of BENCHMARKS).
+
+    Returns:
+        dict: Benchmark name to dict of metrics.
+    """
+    TABLES.saturated()  # parse the shared tables outside the timed runs
+    return {name: BENCHMARKS[name]() for name in (names or BENCHMARKS)}
+
+def compare(results, baseline, throughput_tolerance=THROUGHPUT_TOLERANCE, accuracy_tolerance=ACCURACY_TOLERANCE):
+    """
+    Compares benchmark results with a baseline.
+
+    Args:
+        results (dict): As returned by run.
+        baseline (dict): Baseline results, in the same layout.
+        throughput_tolerance (float, optional): Allowed relative loss of throughput. Defaults to
+            THROUGHPUT_TOLERANCE.
+        accuracy_tolerance (float, optional): Allowed relative growth of errors. Defaults to ACCURACY_TOLERANCE.
+
+    Returns:
+        list of str: One message per regression; empty if there are none.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(name, {}).get(metric)
+            if base is None:
+                continue
+            if metric.endswith('/s'):
+                if value < base * (1 - throughput_tolerance):
+                    regressions.append(f'{name}: {metric} {value:,.4g} < baseline {base:,.4g}')
+            elif value > base * (1 + accuracy_tolerance) + 1e-9:
+                regressions.append(f'{name}: {metric} {value:.4g} > baseline {base:.4g}')
+    return regressions
+
+def load_baseline(filename=BASELINE_FILE):
+    """
+    Reads a baseline file.
+
+    Returns:
+        dict: The baseline results, or an empty dict if the file does not exist.
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)['results']
+
+def save_baseline(results, filename=BASELINE_FILE):
+    """
+    Writes benchmark results as a baseline, with the machine they were measured on.
+    """
+    with open(filename, 'w') as f:
+        machine = {'system': f'{platform.system()} {platform.machine()}', 'python': platform.python_version(),
+                   'numpy': np.__version__}
+        json.dump({'machine': machine, 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def main():
+    """
+    Command line entry point: runs the suite, prints the results and fails (exit status 1) on a regression
+    against the baseline.  With --save the results become the new baseline.
+    """
+    parser = argparse.ArgumentParser(description='Steam and Rankine benchmark suite')
+    parser.add_argument('names', nargs='*', help=f'benchmarks to run, of {", ".join(BENCHMARKS)} (default all)')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline JSON file')
+    parser.add_argument('--save', action='store_true', help='save the results as the baseline')
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f'unknown benchmarks: {", ".join(sorted(unknown))}')
+
+    results = run(args.names)
+    for name, metrics in results.items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f'\t{metric}: {value:,.4g}')
+    if args.save:
+        baseline = load_baseline(args.baseline)
+        baseline.update(results)
+        save_baseline(baseline, args.baseline)
+        print(f'Baseline saved to {args.baseline}')
+        return
+    regressions = compare(results, load_baseline(args.baseline))
+    for message in regressions:
+        print('REGRESSION', message)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import time
+import tracemalloc
+import numpy as np
+from steam import steam, SteamState, SteamStateArray, get_backend
+from steam_tables import TABLES
+
+class DictSteam:
+    """
+    The steam class as it was before __slots__: the same methods, but every instance keeps its attributes in a
+    __dict__.  (A subclass of steam would not do, as it would keep them in the inherited slots.)
+    """
+    __init__ = steam.__init__
+    calc = steam.calc
+    _set_superheated = steam._set_superheated
+
+def bytes_per_state(make, n=20000):
+    """
+    Measures the memory held per state while n states are alive.
+
+    Args:
+        make (callable): Called with an index, returns one state.
+        n (int, optional): Number of states to keep alive. Defaults to 20000.
+
+    Returns:
+        float: Bytes allocated per state (object plus the floats it references).
+    """
+    tracemalloc.start()
+    states = [make(i) for i in range(n)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del states
+    return size / n
+
+def memory_budget():
+    """
+    Compares bytes per state for a dict-based steam object, the slotted steam object and the SteamState snapshot.
+
+    Returns:
+        dict: Bytes per state for each representation.
+    """
+    props = SteamState.from_steam(steam(8000, T=500, name='Turbine Inlet'))
+
+    def fill(st):
+        st.T, st.x, st.v, st.h, st.s, st.region, st.hf = props.T, None, props.v, props.h, props.s, props.region, 0.0
+        return st
+
+    # each state gets its own pressure float, as states in a cycle history would
+    return {
+        'steam with __dict__': bytes_per_state(lambda i: fill(DictSteam(8000.0 + i, name=props.name))),
+        'steam with __slots__': bytes_per_state(lambda i: fill(steam(8000.0 + i, name=props.name))),
+        'SteamState snapshot': bytes_per_state(lambda i: props._replace(p=8000.0 + i)),
+    }
+
+def states_per_second(backend, prop, p, values, repeat=3):
+    """
+    Measures batch throughput of a property backend.
+
+    Args:
+        backend (str): The backend name.
+        prop (str): The property given with pressure.
+        p (ndarray): Pressures in kPa.
+        values (ndarray): Values of the given property.
+        repeat (int, optional): Number of timed runs; the fastest is used. Defaults to 3.
+
+    Returns:
+        float: States evaluated per second.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        SteamStateArray(p, backend=backend, **{prop: values})
+        best = min(best, time.perf_counter() - start)
+    return len(p) / best
+
+def backend_comparison(n=100000, seed=0):
+    """
+    Compares the table, spline and IF97 backends over the full pressure range of sat_water_table.txt.
+
+    Throughput is measured on n random two-phase (p, x) and superheated (p, T) states.  Accuracy is reported as
+    the absolute difference in h and s, taking IF97 as the reference: at the midpoints between saturated
+    table rows, and at the midpoints between temperatures of each superheated isobar, which is where linear
+    interpolation is least accurate.  Points outside the validity range of the IF97 regions implemented are
+    skipped.
+
+    Args:
+        n (int, optional): Number of random states for the throughput runs. Defaults to 100000.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Throughput per backend and accuracy per region.
+    """
+    rng = np.random.default_rng(seed)
+    ps = TABLES.saturated()[1] * 100  # kPa
+    p = rng.uniform(ps.min(), ps.max(), n)
+    x = rng.uniform(0, 1, n)
+    T = get_backend('if97').saturation(p)[0] + rng.uniform(10, 200, n)
+    results = {}
+    for name in ('table', 'spline', 'if97'):
+        results[name] = {'two-phase states/s': states_per_second(name, 'x', p, x),
+                         'superheated states/s': states_per_second(name, 'T', p, T)}
+
+    table, if97 = get_backend('table'), get_backend('if97')
+    pm = (ps[1:] + ps[:-1]) / 2
+    for name in ('table', 'spline'):
+        _, hf, hg, sf, sg, _, _ = np.abs(get_backend(name).saturation(pm) - if97.saturation(pm))
+        results[f'{name} saturation error'] = {'max h': np.nanmax([hf, hg]), 'median h': np.nanmedian([hf, hg]),
+                                               'max s': np.nanmax([sf, sg]), 'median s': np.nanmedian([sf, sg])}
+
+    tcol, hcol, scol, pcol = TABLES.superheated()
+    same = (pcol[1:] == pcol[:-1]) & (tcol[1:] > tcol[:-1] + 1)  # neighbouring rows of one isobar
+    pm, Tm = pcol[1:][same], ((tcol[1:] + tcol[:-1]) / 2)[same]
+    h, s, _ = table.superheated(pm, 'T', Tm) - if97.superheated(pm, 'T', Tm)
+    results['table superheated error'] = {'h': np.nanmax(np.abs(h)), 's': np.nanmax(np.abs(s))}
+    return results
+
+def main():
+    """
+    Prints the memory budget of the steam state representations and the backend comparison.
+    """
+    print('Memory per steam state')
+    for name, size in memory_budget().items():
+        print(f'\t{name}: {size:.0f} bytes')
+    print('Property backends (accuracy is |backend - IF97|)')
+    for name, values in backend_comparison().items():
+        print(f'\t{name}: ' + ', '.join(f'{k} = {v:,.4g}' for k, v in values.items()))
+
+if __name__ == "__main__":
+    main()
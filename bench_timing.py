@@ -0,0 +1,20 @@
+import time
+
+def rate(func, n, repeat=3):
+    """
+    Measures the throughput of a function.
+
+    Args:
+        func (callable): Called with no arguments; does n operations.
+        n (int): Number of operations per call.
+        repeat (int, optional): Number of timed calls; the fastest is used. Defaults to 3.
+
+    Returns:
+        float: Operations per second.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return n / best
@@ -0,0 +1,133 @@
+#region imports
+import numpy as np
+#endregion
+
+#region function definitions
+def spanning_tree(first, second, nodes):
+    """
+    Grows a breadth first spanning tree (a forest, if the network is not connected) over the edges of a network
+    in O(N + E).
+    :param first: integer array of the first node index of each edge
+    :param second: integer array of the second node index of each edge
+    :param nodes: the number of nodes
+    :return: (depth of each node, index of the edge to its parent (-1 for roots), direction of traversal of that
+    edge from the node to its parent (+1 from the edge's first to its second node), boolean array marking tree edges)
+    """
+    E = len(first)
+    # adjacency lists in compressed form: the neighbours of node n are neighbour[start[n]:start[n + 1]]
+    ends = np.concatenate([first, second])
+    order = np.argsort(ends, kind='stable')
+    start = np.searchsorted(ends[order], np.arange(nodes + 1)).tolist()
+    neighbour = np.concatenate([second, first])[order].tolist()
+    edge = (order % E).tolist() if E else []
+    first_list = first.tolist()
+
+    depth = [-1] * nodes
+    up_edge = [-1] * nodes
+    up_sign = [0] * nodes
+    for root in range(nodes):
+        if depth[root] >= 0:
+            continue
+        depth[root] = 0
+        queue = [root]
+        for n in queue:  # the queue grows while it is walked
+            for j in range(start[n], start[n + 1]):
+                m = neighbour[j]
+                if depth[m] < 0:
+                    depth[m] = depth[n] + 1
+                    k = edge[j]
+                    up_edge[m] = k
+                    up_sign[m] = 1 if first_list[k] == m else -1
+                    queue.append(m)
+    up_edge = np.array(up_edge, dtype=int)
+    tree = np.zeros(E, dtype=bool)
+    tree[up_edge[up_edge >= 0]] = True
+    return np.array(depth, dtype=int), up_edge, np.array(up_sign, dtype=int), tree
+
+def fundamental_cycle_arrays(edges):
+    """
+    Finds a fundamental cycle basis of a network from its list of edges, in compressed array form.
+    A breadth first spanning tree is grown over the edges; every edge left out of the tree closes exactly one cycle
+    with the tree path between its ends, and these E - N + C cycles (N nodes, C connected parts) are independent and
+    span all cycles of the network.  Growing the tree costs O(N + E); the tree paths of all cycles are then walked
+    together with array operations, at a cost proportional to the total length of the cycles.
+    :param edges: a list of (first node, second node) pairs; nodes are any hashable names and parallel edges and
+    self loops are allowed
+    :return: (start, edge, direction) integer arrays: the edges of cycle c in order of traversal are
+    edge[start[c]:start[c + 1]], with direction +1 where an edge is traversed from its first to its second node and
+    -1 against.  Each cycle starts by traversing an edge from its first node.
+    """
+    index = {}  # node name -> index in order of first appearance
+    ends = np.array([index.setdefault(n, len(index)) for e in edges for n in e], dtype=int).reshape(-1, 2)
+    first, second = ends[:, 0], ends[:, 1]
+    depth, up_edge, up_sign, tree = spanning_tree(first, second, len(index))
+    parent = np.where(up_sign > 0, second[up_edge], first[up_edge])  # (meaningless for roots, never climbed from)
+
+    # each cycle traverses its edge from a to b, climbs the tree from b to the common ancestor of a and b and
+    # descends from there to a; the two tree paths are found by moving the deeper of the two ends up one step
+    # at a time, for all cycles at once
+    closing = np.flatnonzero(~tree)
+    cycle = np.arange(len(closing))
+    a, b = first[closing], second[closing]
+    climbs, descents = [], []  # per step: (cycles, edges, directions)
+    climb_step, descent_step = [], []  # per step: the position of the step along each cycle's path
+    climbed = np.zeros(len(closing), dtype=int)
+    descended = np.zeros(len(closing), dtype=int)
+    active = a != b
+    cycle, a, b = cycle[active], a[active], b[active]
+    while len(cycle):
+        move_b = depth[b] >= depth[a]
+        c, n = cycle[move_b], b[move_b]
+        climbs.append((c, up_edge[n], up_sign[n]))
+        climb_step.append(climbed[c])
+        climbed[c] += 1
+        b[move_b] = parent[n]
+        c, n = cycle[~move_b], a[~move_b]
+        descents.append((c, up_edge[n], -up_sign[n]))
+        descent_step.append(descended[c])
+        descended[c] += 1
+        a[~move_b] = parent[n]
+        active = a != b
+        cycle, a, b = cycle[active], a[active], b[active]
+
+    length = 1 + climbed + descended
+    start = np.concatenate([[0], np.cumsum(length)])
+    edge = np.empty(start[-1], dtype=int)
+    direction = np.empty(start[-1], dtype=int)
+    edge[start[:-1]] = closing
+    direction[start[:-1]] = 1
+    if climbs:
+        c, k, d = (np.concatenate(x) for x in zip(*climbs))
+        position = start[c] + 1 + np.concatenate(climb_step)
+        edge[position] = k
+        direction[position] = d
+    if descents:
+        c, k, d = (np.concatenate(x) for x in zip(*descents))
+        position = start[c + 1] - 1 - np.concatenate(descent_step)  # recorded from a upwards, so stored reversed
+        edge[position] = k
+        direction[position] = d
+    return start, edge, direction
+
+def fundamental_cycles(edges):
+    """
+    Finds a fundamental cycle basis of a network from its list of edges, so no loops have to be listed by hand
+    (see fundamental_cycle_arrays).
+    :param edges: a list of (first node, second node) pairs
+    :return: a list of cycles, each a list of (edge index, direction) pairs in order of traversal, where direction
+    is +1 when the edge is traversed from its first to its second node and -1 against
+    """
+    start, edge, direction = fundamental_cycle_arrays(edges)
+    pairs = list(zip(edge.tolist(), direction.tolist()))
+    start = start.tolist()
+    return [pairs[i:j] for i, j in zip(start[:-1], start[1:])]
+
+def cycle_nodes(edges, cycle):
+    """
+    Lists the nodes visited by a cycle from fundamental_cycles.
+    :param edges: the list of (first node, second node) pairs the cycle was found in
+    :param cycle: a list of (edge index, direction) pairs
+    :return: a list of node names in order of traversal, starting at the first node of the first edge (the cycle
+    closes back to it)
+    """
+    return [edges[k][0] if s > 0 else edges[k][1] for k, s in cycle]
+#endregion
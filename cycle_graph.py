@@ -0,0 +1,510 @@
+from abc import ABC, abstractmethod
+import numpy as np
+from rankine import is_isentropic, pump_exit_state, turbine_exit_enthalpy
+from steam import SteamStateArray
+
+class Component(ABC):
+    """
+    A base class for the components of a cycle graph.
+
+    A component is a node of the graph and streams (named by strings) are its edges: every stream is the outlet
+    of exactly one component and the inlet of exactly one other.  A component computes the states of its outlet
+    streams from its parameters and the states of the inlets it requires, and contributes linear balances on
+    the mass flows of its streams.  Parameters may be arrays; all states are SteamStateArray batches, so a whole
+    sweep is evaluated in one pass over the components.
+
+    Attributes:
+        name (str): A useful identifier for the component.
+        inlets (tuple of str): The inlet streams.
+        outlets (tuple of str): The outlet streams.
+        requires (tuple of str): The inlets whose states are needed to compute the outlet states.
+
+    Methods:
+        calc: Computes the outlet states.
+        balances: Returns the mass and energy balances of the component.
+        work: Returns the work produced by the component.
+        heat: Returns the heat added to the component.
+    """
+    requires = ()
+
+    def __init__(self, name, inlets, outlets):
+        self.name = name
+        self.inlets = tuple(inlets)
+        self.outlets = tuple(outlets)
+
+    @abstractmethod
+    def calc(self, states, backend=None):
+        """
+        Computes the outlet states.
+
+        Args:
+            states (dict): The states computed so far, by stream; includes every stream in requires.
+            backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+
+        Returns:
+            dict: The SteamStateArray of every outlet stream.
+        """
+
+    def balances(self, h):
+        """
+        Returns the balances of the component, each a dict mapping streams to the coefficients c of sum(c*m) = 0,
+        where m is the mass flow of the stream.  The first balance must be the mass balance.
+
+        Args:
+            h (dict): Enthalpy of every stream in kJ/kg.
+        """
+        return [self._mass_balance()]
+
+    def _mass_balance(self):
+        balance = dict.fromkeys(self.inlets, -1.0)
+        balance.update(dict.fromkeys(self.outlets, 1.0))
+        return balance
+
+    def work(self, m, h):
+        """
+        Returns the work produced by the component in kJ per kg of boiler flow (negative for work consumed).
+
+        Args:
+            m (dict): Mass flow of every stream per kg of boiler flow.
+            h (dict): Enthalpy of every stream in kJ/kg.
+        """
+        return 0.0
+
+    def heat(self, m, h):
+        """
+        Returns the heat added to the working fluid in kJ per kg of boiler flow (negative for heat rejected).
+
+        Args:
+            m (dict): Mass flow of every stream per kg of boiler flow.
+            h (dict): Enthalpy of every stream in kJ/kg.
+        """
+        return sum(m[k] * h[k] for k in self.outlets) - sum(m[k] * h[k] for k in self.inlets)
+
+class Boiler(Component):
+    """
+    A boiler producing saturated vapor, or superheated steam at T, at pressure p.  The mass flow through the
+    boiler is the unit all other flows are scaled to.
+    """
+
+    def __init__(self, inlet, outlet, p, T=None, name='Boiler'):
+        super().__init__(name, (inlet,), (outlet,))
+        self.p, self.T = p, T
+
+    def calc(self, states, backend=None):
+        if self.T is None:
+            return {self.outlets[0]: SteamStateArray(self.p, x=1, name=self.outlets[0], backend=backend)}
+        return {self.outlets[0]: SteamStateArray(self.p, T=self.T, name=self.outlets[0], backend=backend)}
+
+class Reheater(Component):
+    """
+    A reheater heating steam to T at its inlet pressure.
+    """
+
+    def __init__(self, inlet, outlet, T, name='Reheater'):
+        super().__init__(name, (inlet,), (outlet,))
+        self.T = T
+        self.requires = (inlet,)
+
+    def calc(self, states, backend=None):
+        p = states[self.inlets[0]].p
+        return {self.outlets[0]: SteamStateArray(p, T=self.T, name=self.outlets[0], backend=backend)}
+
+class Turbine(Component):
+    """
+    A turbine stage expanding its inlet to pressure p with an isentropic efficiency (a float, or an array
+    such as a PerformanceMap evaluated at the load of every operating point), optionally with a bleed stream
+    extracted at the exit pressure (the bleed has the same state as the exit).
+    """
+
+    def __init__(self, inlet, outlet, p, bleed=None, efficiency=1.0, name='Turbine'):
+        super().__init__(name, (inlet,), (outlet,) if bleed is None else (outlet, bleed))
+        self.p = p
+        self.efficiency = efficiency
+        self.requires = (inlet,)
+
+    def calc(self, states, backend=None):
+        inlet = states[self.inlets[0]]
+        state = SteamStateArray(self.p, s=inlet.s, name=self.outlets[0], backend=backend)
+        if not is_isentropic(self.efficiency):
+            h = turbine_exit_enthalpy(inlet.h, state.h, self.efficiency)
+            state = SteamStateArray(self.p, h=h, name=self.outlets[0], backend=backend)
+        return dict.fromkeys(self.outlets, state)
+
+    def work(self, m, h):
+        return -Component.heat(self, m, h)
+
+    def heat(self, m, h):
+        return 0.0
+
+class Pump(Component):
+    """
+    A pump raising liquid at its inlet to pressure p, with the incompressible-liquid pump model of
+    rankine.pump_exit_state and an isentropic efficiency (a float or an array, as for Turbine).
+    """
+
+    def __init__(self, inlet, outlet, p, efficiency=1.0, name='Pump'):
+        super().__init__(name, (inlet,), (outlet,))
+        self.p = p
+        self.efficiency = efficiency
+        self.requires = (inlet,)
+
+    def calc(self, states, backend=None):
+        st = states[self.inlets[0]]
+        T, v, h, s = pump_exit_state(st.T, st.v, st.h, st.s, st.p, self.p, self.efficiency)
+        return {self.outlets[0]: SteamStateArray.from_properties(self.p, T, np.nan, v, h, s, SteamStateArray.COMPRESSED,
+                                                                 name=self.outlets[0], backend=backend)}
+
+    def work(self, m, h):
+        return -Component.heat(self, m, h)
+
+    def heat(self, m, h):
+        return 0.0
+
+class Condenser(Component):
+    """
+    A condenser collecting one or more inlets and discharging saturated liquid at pressure p.
+    """
+
+    def __init__(self, inlets, outlet, p, name='Condenser'):
+        super().__init__(name, (inlets,) if isinstance(inlets, str) else inlets, (outlet,))
+        self.p = p
+
+    def calc(self, states, backend=None):
+        return {self.outlets[0]: SteamStateArray(self.p, x=0, name=self.outlets[0], backend=backend)}
+
+class Trap(Component):
+    """
+    A steam trap throttling a heater drain to pressure p at constant enthalpy.
+    """
+
+    def __init__(self, inlet, outlet, p, name='Trap'):
+        super().__init__(name, (inlet,), (outlet,))
+        self.p = p
+        self.requires = (inlet,)
+
+    def calc(self, states, backend=None):
+        h = states[self.inlets[0]].h
+        return {self.outlets[0]: SteamStateArray(self.p, h=h, name=self.outlets[0], backend=backend)}
+
+class OpenFeedwaterHeater(Component):
+    """
+    An open (direct contact) feedwater heater mixing its inlets into saturated liquid at pressure p.
+    """
+
+    def __init__(self, inlets, outlet, p, name='Open Feedwater Heater'):
+        super().__init__(name, inlets, (outlet,))
+        self.p = p
+
+    def calc(self, states, backend=None):
+        return {self.outlets[0]: SteamStateArray(self.p, x=0, name=self.outlets[0], backend=backend)}
+
+    def balances(self, h):
+        energy = {k: h[k] for k in self.inlets}
+        energy.update({k: -h[k] for k in self.outlets})
+        return [self._mass_balance(), energy]
+
+class ClosedFeedwaterHeater(Component):
+    """
+    A closed feedwater heater condensing its bleed (and any drains cascaded from higher pressure heaters) at
+    pressure p into a saturated liquid drain.  The feedwater leaves at the saturation temperature of the bleed as
+    compressed liquid at its own pressure, with h, s and v approximated by those of the saturated liquid at p.
+    """
+
+    def __init__(self, bleed, feed_in, feed_out, drain, p, name='Closed Feedwater Heater'):
+        self.shell = (bleed,) if isinstance(bleed, str) else tuple(bleed)
+        super().__init__(name, self.shell + (feed_in,), (drain, feed_out))
+        self.p = p
+        self.requires = (feed_in,)
+
+    def calc(self, states, backend=None):
+        drain = SteamStateArray(self.p, x=0, name=self.outlets[0], backend=backend)
+        feed = SteamStateArray.from_properties(states[self.inlets[-1]].p, drain.T, np.nan, drain.v, drain.h, drain.s,
+                                               SteamStateArray.COMPRESSED, name=self.outlets[1], backend=backend)
+        return {self.outlets[0]: drain, self.outlets[1]: feed}
+
+    def balances(self, h):
+        feed_in, (drain, feed_out) = self.inlets[-1], self.outlets
+        shell = dict.fromkeys(self.shell, -1.0)
+        shell[drain] = 1.0
+        energy = {k: h[k] for k in self.inlets}
+        energy.update({drain: -h[drain], feed_out: -h[feed_out]})
+        return [shell, {feed_in: -1.0, feed_out: 1.0}, energy]
+
+    def heat(self, m, h):
+        return 0.0
+
+class CycleGraph:
+    """
+    A class representing a general steam power cycle as a graph of components.
+
+    The states are evaluated in one pass over the components in dependency order, each as a SteamStateArray, so
+    array parameters sweep the whole cycle at once.  The mass flow of every stream (per kg through the boiler,
+    so bleed fractions included) then follows from the linear mass and energy balances, which are assembled as
+    one stacked matrix per operating point and solved with a single batched np.linalg.solve.
+
+    Attributes:
+        components (list): The components, in the order added.
+        name (str): A useful identifier for the cycle.
+        states (dict): The SteamStateArray of every stream.
+        mass (dict): The mass flow of every stream per kg through the boiler.
+        turbine_work (ndarray): Turbine work in kJ per kg of boiler flow.
+        pump_work (ndarray): Pump work in kJ per kg of boiler flow.
+        heat_added (ndarray): Heat added in the boiler and reheaters in kJ per kg of boiler flow.
+        net_work (ndarray): Turbine work less pump work.
+        efficiency (ndarray): Cycle efficiency in percent.
+
+    Methods:
+        add: Adds a component.
+        order: Returns the components in dependency order.
+        calc_states: Calculates the state of every stream.
+        calc_flows: Solves the mass flows of every stream.
+        calc_efficiency: Calculates the work, heat and efficiency.
+    """
+
+    def __init__(self, components=(), name='Cycle', backend=None):
+        """
+        Initializes a cycle graph.
+
+        Args:
+            components (iterable, optional): Components to add. Defaults to ().
+            name (str, optional): A useful identifier for the cycle. Defaults to 'Cycle'.
+            backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+        """
+        self.components = []
+        self.name = name
+        self.backend = backend
+        for component in components:
+            self.add(component)
+
+    def add(self, component):
+        """
+        Adds a component to the cycle.
+
+        Args:
+            component (Component): The component.
+
+        Returns:
+            Component: The component added.
+        """
+        self.components.append(component)
+        return component
+
+    def streams(self):
+        """
+        Returns every stream, in the order the components produce them.
+
+        Raises:
+            ValueError: If a stream is not the outlet of exactly one component and the inlet of exactly one.
+        """
+        outlets = [k for c in self.components for k in c.outlets]
+        inlets = [k for c in self.components for k in c.inlets]
+        if len(set(outlets)) != len(outlets) or sorted(outlets) != sorted(inlets):
+            raise ValueError(f'{self.name}: every stream must leave one component and enter one component')
+        return outlets
+
+    def order(self):
+        """
+        Returns the components in dependency order: each after the components producing the streams it requires.
+
+        Raises:
+            ValueError: If the required streams form a cycle.
+        """
+        producer = {k: c for c in self.components for k in c.outlets}
+        ordered, done = [], set()
+        pending = list(self.components)
+        while pending:
+            ready = [c for c in pending if all(producer[k] in done for k in c.requires)]
+            if not ready:
+                raise ValueError(f'{self.name}: the states of {[c.name for c in pending]} depend on each other')
+            for c in ready:
+                ordered.append(c)
+                done.add(c)
+            pending = [c for c in pending if c not in done]
+        return ordered
+
+    def solve(self):
+        """
+        Calculates the states, mass flows and efficiency of the cycle.
+
+        Returns:
+            CycleGraph: The cycle itself, for chaining.
+        """
+        self.calc_states()
+        self.calc_flows()
+        self.calc_efficiency()
+        return self
+
+    def calc_states(self):
+        """
+        Calculates the state of every stream in dependency order.
+        """
+        self.streams()
+        self.states = {}
+        for component in self.order():
+            self.states.update(component.calc(self.states, self.backend))
+
+    def calc_flows(self):
+        """
+        Solves the mass flow of every stream per kg through the boiler.
+
+        Every component contributes its balances; the mass balances of a closed cycle are dependent, so the
+        boiler's is replaced by fixing the boiler flow at 1.  Operating points with unresolved states get nan.
+
+        Raises:
+            ValueError: If the cycle does not have exactly one boiler.
+        """
+        streams = self.streams()
+        index = {k: i for i, k in enumerate(streams)}
+        boilers = [c for c in self.components if isinstance(c, Boiler)]
+        if len(boilers) != 1:
+            raise ValueError(f'{self.name}: a cycle graph needs exactly one boiler')
+        h = {k: st.h for k, st in self.states.items()}
+        shape = np.broadcast_shapes(*(np.shape(v) for v in h.values()))
+
+        rows = []
+        for component in self.components:
+            balances = component.balances(h)
+            if component is boilers[0]:
+                boiler_row = len(rows)
+                balances = [{component.outlets[0]: 1.0}] + balances[1:]
+            rows.extend(balances)
+        if len(rows) != len(streams):
+            raise ValueError(f'{self.name}: {len(rows)} balances for {len(streams)} mass flows')
+        A = np.zeros(shape + (len(rows), len(streams)))
+        for i, row in enumerate(rows):
+            for k, coef in row.items():
+                A[..., i, index[k]] += coef
+        b = np.zeros(len(rows))
+        b[boiler_row] = 1.0
+
+        # solve every operating point at once; points with nan enthalpies get an identity system, then nan
+        bad = ~np.isfinite(A).all(axis=(-2, -1))
+        A[bad] = np.eye(len(streams))
+        m = np.linalg.solve(A, np.broadcast_to(b, shape + b.shape)[..., None])[..., 0]
+        m[bad] = np.nan
+        self.mass = {k: m[..., i] for k, i in index.items()}
+
+    def calc_efficiency(self):
+        """
+        Calculates the work, heat and efficiency arrays from the states and mass flows.
+        """
+        h = {k: st.h for k, st in self.states.items()}
+        work = {c: c.work(self.mass, h) for c in self.components}
+        self.turbine_work = sum((w for c, w in work.items() if isinstance(c, Turbine)), np.zeros(()))
+        self.pump_work = -sum((w for c, w in work.items() if isinstance(c, Pump)), np.zeros(()))
+        self.heat_added = sum((c.heat(self.mass, h) for c in self.components if isinstance(c, (Boiler, Reheater))),
+                              np.zeros(()))
+        self.net_work = self.turbine_work - self.pump_work
+        self.efficiency = self.net_work / self.heat_added * 100
+
+def simple_cycle(p_low=8, p_high=8000, t_high=None, name='Simple Rankine Cycle', backend=None,
+                 turbine_efficiency=1.0, pump_efficiency=1.0):
+    """
+    Builds the four-state Rankine cycle of the rankine class as a cycle graph.
+
+    Args:
+        p_low, p_high, t_high: As for RankineSweep (arrays are broadcast).
+        name (str, optional): A useful identifier for the cycle. Defaults to 'Simple Rankine Cycle'.
+        backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+        turbine_efficiency (array_like, optional): Isentropic efficiency of every turbine stage. Defaults to 1.0.
+        pump_efficiency (array_like, optional): Isentropic efficiency of every pump. Defaults to 1.0.
+
+    Returns:
+        CycleGraph: The solved cycle.
+    """
+    return CycleGraph([Boiler('feed', 'steam', p_high, t_high),
+                       Turbine('steam', 'exhaust', p_low, efficiency=turbine_efficiency),
+                       Condenser('exhaust', 'condensate', p_low),
+                       Pump('condensate', 'feed', p_high, efficiency=pump_efficiency)], name, backend).solve()
+
+def reheat_cycle(p_low=8, p_reheat=1000, p_high=8000, t_high=500, t_reheat=500, name='Reheat Rankine Cycle',
+                 backend=None, turbine_efficiency=1.0, pump_efficiency=1.0):
+    """
+    Builds a Rankine cycle with one reheat stage.
+
+    Args:
+        p_low (array_like, optional): Condenser pressure in kPa. Defaults to 8.
+        p_reheat (array_like, optional): Reheat pressure in kPa. Defaults to 1000.
+        p_high (array_like, optional): Boiler pressure in kPa. Defaults to 8000.
+        t_high (array_like, optional): Turbine inlet temperature in °C. Defaults to 500.
+        t_reheat (array_like, optional): Reheat temperature in °C. Defaults to 500.
+        name (str, optional): A useful identifier for the cycle. Defaults to 'Reheat Rankine Cycle'.
+        backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+        turbine_efficiency (array_like, optional): Isentropic efficiency of every turbine stage. Defaults to 1.0.
+        pump_efficiency (array_like, optional): Isentropic efficiency of every pump. Defaults to 1.0.
+
+    Returns:
+        CycleGraph: The solved cycle.
+    """
+    return CycleGraph([Boiler('feed', 'steam', p_high, t_high),
+                       Turbine('steam', 'cold reheat', p_reheat, efficiency=turbine_efficiency,
+                               name='High Pressure Turbine'),
+                       Reheater('cold reheat', 'hot reheat', t_reheat),
+                       Turbine('hot reheat', 'exhaust', p_low, efficiency=turbine_efficiency,
+                               name='Low Pressure Turbine'),
+                       Condenser('exhaust', 'condensate', p_low),
+                       Pump('condensate', 'feed', p_high, efficiency=pump_efficiency)], name, backend).solve()
+
+def regenerative_cycle(p_low=8, p_bleed=(700,), p_high=8000, t_high=500, heaters='open',
+                       name='Regenerative Rankine Cycle', backend=None, turbine_efficiency=1.0, pump_efficiency=1.0):
+    """
+    Builds a regenerative Rankine cycle with one feedwater heater per bleed pressure.
+
+    With open heaters every heater is followed by a pump to the next heater (or the boiler).  With closed
+    heaters a single condensate pump raises the feedwater to p_high, and each heater drain is trapped to the
+    next lower heater (or the condenser).
+
+    Args:
+        p_low (array_like, optional): Condenser pressure in kPa. Defaults to 8.
+        p_bleed (sequence, optional): Bleed pressures in kPa, highest first; each may be an array. Defaults to
+            (700,).
+        p_high (array_like, optional): Boiler pressure in kPa. Defaults to 8000.
+        t_high (array_like, optional): Turbine inlet temperature in °C. Defaults to 500.
+        heaters (str, optional): 'open' or 'closed'. Defaults to 'open'.
+        name (str, optional): A useful identifier for the cycle. Defaults to 'Regenerative Rankine Cycle'.
+        backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+        turbine_efficiency (array_like, optional): Isentropic efficiency of every turbine stage. Defaults to 1.0.
+        pump_efficiency (array_like, optional): Isentropic efficiency of every pump. Defaults to 1.0.
+
+    Returns:
+        CycleGraph: The solved cycle.
+    """
+    n = len(p_bleed)
+    cycle = CycleGraph(name=name, backend=backend)
+    cycle.add(Boiler('feed 0', 'steam 0', p_high, t_high))
+    for i, p in enumerate(p_bleed):
+        cycle.add(Turbine(f'steam {i}', f'steam {i + 1}', p, bleed=f'bleed {i}', efficiency=turbine_efficiency,
+                          name=f'Turbine Stage {i}'))
+    cycle.add(Turbine(f'steam {n}', 'exhaust', p_low, efficiency=turbine_efficiency, name=f'Turbine Stage {n}'))
+    if heaters == 'open':
+        cycle.add(Condenser('exhaust', f'liquid {n}', p_low))
+        for i in reversed(range(n)):
+            cycle.add(Pump(f'liquid {i + 1}', f'feed {i + 1}', p_bleed[i], efficiency=pump_efficiency,
+                           name=f'Pump {i + 1}'))
+            cycle.add(OpenFeedwaterHeater((f'bleed {i}', f'feed {i + 1}'), f'liquid {i}', p_bleed[i],
+                                          name=f'Open Feedwater Heater {i}'))
+        cycle.add(Pump('liquid 0', 'feed 0', p_high, efficiency=pump_efficiency, name='Pump 0'))
+    elif heaters == 'closed':
+        cycle.add(Condenser(['exhaust', f'trapped {n - 1}'] if n else 'exhaust', 'condensate', p_low))
+        cycle.add(Pump('condensate', f'feed {n}', p_high, efficiency=pump_efficiency))
+        for i in reversed(range(n)):
+            shell = [f'bleed {i}'] + ([f'trapped {i - 1}'] if i else [])
+            cycle.add(ClosedFeedwaterHeater(shell, f'feed {i + 1}', f'feed {i}', f'drain {i}', p_bleed[i],
+                                            name=f'Closed Feedwater Heater {i}'))
+            lower = p_bleed[i + 1] if i + 1 < n else p_low
+            cycle.add(Trap(f'drain {i}', f'trapped {i}', lower, name=f'Trap {i}'))
+    else:
+        raise ValueError(f"Unknown heater type {heaters!r}; expected 'open' or 'closed'")
+    return cycle.solve()
+
+def main():
+    """
+    Compares the simple, reheat and regenerative cycles at the same boiler conditions.
+    """
+    for cycle in (simple_cycle(8, 8000, 500), reheat_cycle(8, 1000, 8000, 500, 500),
+                  regenerative_cycle(8, [2000, 700], 8000, 500, heaters='open'),
+                  regenerative_cycle(8, [2000, 700], 8000, 500, heaters='closed')):
+        print(f'{cycle.name}: efficiency {float(cycle.efficiency):.2f}%, net work {float(cycle.net_work):.1f} kJ/kg')
+
+if __name__ == "__main__":
+    main()
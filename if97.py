@@ -0,0 +1,256 @@
+import numpy as np
+
+# Specific gas constant of water used by IAPWS-IF97, kJ/(kg K)
+R = 0.461526
+
+# region IAPWS-IF97 coefficients
+# Region 1 (compressed/saturated liquid): gamma(pi, tau) = sum n (7.1 - pi)^I (tau - 1.222)^J
+I1 = np.array([0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 8, 8, 21, 23, 29, 30,
+               31, 32])
+J1 = np.array([-2, -1, 0, 1, 2, 3, 4, 5, -9, -7, -1, 0, 1, 3, -3, 0, 1, 3, 17, -4, 0, 6, -5, -2, 10, -8, -11, -6,
+               -29, -31, -38, -39, -40, -41])
+N1 = np.array([0.14632971213167, -0.84548187169114, -0.37563603672040e1, 0.33855169168385e1, -0.95791963387872,
+               0.15772038513228, -0.16616417199501e-1, 0.81214629983568e-3, 0.28319080123804e-3,
+               -0.60706301565874e-3, -0.18990068218419e-1, -0.32529748770505e-1, -0.21841717175414e-1,
+               -0.52838357969930e-4, -0.47184321073267e-3, -0.30001780793026e-3, 0.47661393906987e-4,
+               -0.44141845330846e-5, -0.72694996297594e-15, -0.31679644845054e-4, -0.28270797985312e-5,
+               -0.85205128120103e-9, -0.22425281908000e-5, -0.65171222895601e-6, -0.14341729937924e-12,
+               -0.40516996860117e-6, -0.12734301741641e-8, -0.17424871230634e-9, -0.68762131295531e-18,
+               0.14478307828521e-19, 0.26335781662795e-22, -0.11947622640071e-22, 0.18228094581404e-23,
+               -0.93537087292458e-25])
+
+# Region 2 (vapor), ideal gas part: gamma0 = ln(pi) + sum n0 tau^J0
+J0 = np.array([0, 1, -5, -4, -3, -2, -1, 2, 3])
+N0 = np.array([-0.96927686500217e1, 0.10086655968018e2, -0.56087911283020e-2, 0.71452738081455e-1,
+               -0.40710498223928, 0.14240819171444e1, -0.43839511319450e1, -0.28408632460772,
+               0.21268463753307e-1])
+# Region 2, residual part: gammar = sum n pi^I (tau - 0.5)^J
+IR = np.array([1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3, 3, 3, 3, 3, 4, 4, 4, 5, 6, 6, 6, 7, 7, 7, 8, 8, 9, 10, 10, 10, 16,
+               16, 18, 20, 20, 20, 21, 22, 23, 24, 24, 24])
+JR = np.array([0, 1, 2, 3, 6, 1, 2, 4, 7, 36, 0, 1, 3, 6, 35, 1, 2, 3, 7, 3, 16, 35, 0, 11, 25, 8, 36, 13, 4, 10, 14,
+               29, 50, 57, 20, 35, 48, 21, 53, 39, 26, 40, 58])
+NR = np.array([-0.17731742473213e-2, -0.17834862292358e-1, -0.45996013696365e-1, -0.57581259083432e-1,
+               -0.50325278727930e-1, -0.33032641670203e-4, -0.18948987516315e-3, -0.39392777243355e-2,
+               -0.43797295650573e-1, -0.26674547914087e-4, 0.20481737692309e-7, 0.43870667284435e-6,
+               -0.32277677238570e-4, -0.15033924542148e-2, -0.40668253562649e-1, -0.78847309559367e-9,
+               0.12790717852285e-7, 0.48225372718507e-6, 0.22922076337661e-5, -0.16714766451061e-10,
+               -0.21171472321355e-2, -0.23895741934104e2, -0.59059564324270e-17, -0.12621808899101e-5,
+               -0.38946842435739e-1, 0.11256211360459e-10, -0.82311340897998e1, 0.19809712802088e-7,
+               0.10406965210174e-18, -0.10234747095929e-12, -0.10018179379511e-8, -0.80882908646985e-10,
+               0.10693031879409, -0.33662250574171, 0.89185845355421e-24, 0.30629316876232e-12,
+               -0.42002467698208e-5, -0.59056029685639e-25, 0.37826947613457e-5, -0.12768608934681e-14,
+               0.73087610595061e-28, 0.55414715350778e-16, -0.94369707241210e-6])
+
+# Region 4 (saturation line)
+N4 = np.array([0.11670521452767e4, -0.72421316703206e6, -0.17073846940092e2, 0.12020824702470e5,
+               -0.32325550322333e7, 0.14915108613530e2, -0.48232657361591e4, 0.40511340542057e6,
+               -0.23855557567849, 0.65017534844798e3])
+
+# Boundary between regions 2 and 3 (B23 equation), p in MPa as a function of T in K
+N23 = np.array([0.34805185628969e3, -0.11671859879975e1, 0.10192970039326e-2])
+# endregion
+
+# Validity limits used here: regions 1 and 2 meet the saturation line only up to 623.15 K (region 3 is not
+# implemented), and region 2 is valid up to 1073.15 K.
+T_SAT_MAX = 623.15
+T_MAX = 1073.15
+
+# region region 4 (saturation line)
+def psat(T):
+    """
+    Saturation pressure from the IF97 region 4 equation.
+
+    Args:
+        T (float or ndarray): Temperature(s) in K.
+
+    Returns:
+        float or ndarray: Saturation pressure in MPa.
+    """
+    n = N4
+    theta = T + n[8] / (T - n[9])
+    A = theta**2 + n[0] * theta + n[1]
+    B = n[2] * theta**2 + n[3] * theta + n[4]
+    C = n[5] * theta**2 + n[6] * theta + n[7]
+    return (2 * C / (-B + np.sqrt(B**2 - 4 * A * C)))**4
+
+def Tsat(p):
+    """
+    Saturation temperature from the IF97 region 4 backward equation.
+
+    Args:
+        p (float or ndarray): Pressure(s) in MPa.
+
+    Returns:
+        float or ndarray: Saturation temperature in K.
+    """
+    n = N4
+    beta = p**0.25
+    E = beta**2 + n[2] * beta + n[5]
+    F = n[0] * beta**2 + n[3] * beta + n[6]
+    G = n[1] * beta**2 + n[4] * beta + n[7]
+    D = 2 * G / (-F - np.sqrt(F**2 - 4 * E * G))
+    return (n[9] + D - np.sqrt((n[9] + D)**2 - 4 * (n[8] + n[9] * D))) / 2
+
+def pB23(T):
+    """
+    Pressure on the boundary between regions 2 and 3 (valid for 623.15 K <= T <= 863.15 K).
+
+    Args:
+        T (float or ndarray): Temperature(s) in K.
+
+    Returns:
+        float or ndarray: Pressure in MPa.
+    """
+    return N23[0] + N23[1] * T + N23[2] * T**2
+# endregion
+
+# region regions 1 and 2
+def region1(p, T):
+    """
+    Liquid properties from the IF97 region 1 Gibbs free energy equation.
+
+    Args:
+        p (ndarray): Pressures in MPa.
+        T (ndarray): Temperatures in K, broadcast against p.
+
+    Returns:
+        tuple: (h in kJ/kg, s in kJ/(kg K), v in m^3/kg, cp in kJ/(kg K)) as arrays.
+    """
+    pi = (np.asarray(p, dtype=float) / 16.53)[..., None]
+    tau = (1386.0 / np.asarray(T, dtype=float))[..., None]
+    a, b = 7.1 - pi, tau - 1.222
+    g = N1 * a**I1 * b**J1
+    gamma = g.sum(-1)
+    gamma_pi = (-N1 * I1 * a**(I1 - 1) * b**J1).sum(-1)
+    gamma_tau = (N1 * a**I1 * J1 * b**(J1 - 1)).sum(-1)
+    gamma_tt = (N1 * a**I1 * J1 * (J1 - 1) * b**(J1 - 2)).sum(-1)
+    pi, tau = pi[..., 0], tau[..., 0]
+    RT = R * 1386.0 / tau
+    return RT * tau * gamma_tau, R * (tau * gamma_tau - gamma), RT * pi * gamma_pi / (pi * 16.53e3), \
+        -R * tau**2 * gamma_tt
+
+def region2(p, T):
+    """
+    Vapor properties from the IF97 region 2 Gibbs free energy equation.
+
+    Args:
+        p (ndarray): Pressures in MPa.
+        T (ndarray): Temperatures in K, broadcast against p.
+
+    Returns:
+        tuple: (h in kJ/kg, s in kJ/(kg K), v in m^3/kg, cp in kJ/(kg K)) as arrays.
+    """
+    pi = np.asarray(p, dtype=float)[..., None]
+    tau = (540.0 / np.asarray(T, dtype=float))[..., None]
+    b = tau - 0.5
+    # ideal gas part
+    g0 = np.log(pi[..., 0]) + (N0 * tau**J0).sum(-1)
+    g0_tau = (N0 * J0 * tau**(J0 - 1)).sum(-1)
+    g0_tt = (N0 * J0 * (J0 - 1) * tau**(J0 - 2)).sum(-1)
+    # residual part
+    gr = (NR * pi**IR * b**JR).sum(-1)
+    gr_pi = (NR * IR * pi**(IR - 1) * b**JR).sum(-1)
+    gr_tau = (NR * pi**IR * JR * b**(JR - 1)).sum(-1)
+    gr_tt = (NR * pi**IR * JR * (JR - 1) * b**(JR - 2)).sum(-1)
+    pi, tau = pi[..., 0], tau[..., 0]
+    RT = R * 540.0 / tau
+    return RT * tau * (g0_tau + gr_tau), R * (tau * (g0_tau + gr_tau) - (g0 + gr)), \
+        RT * pi * (1 / pi + gr_pi) / (pi * 1e3), -R * tau**2 * (g0_tt + gr_tt)
+
+def in_region2(p, T):
+    """
+    Mask of the (p, T) points that lie in region 2.
+
+    Args:
+        p (ndarray): Pressures in MPa.
+        T (ndarray): Temperatures in K, broadcast against p.
+
+    Returns:
+        ndarray: True where (p, T) is in region 2.
+    """
+    with np.errstate(invalid='ignore'):
+        below_sat = (T <= T_SAT_MAX) & (p <= psat(np.minimum(T, T_SAT_MAX)) * (1 + 1e-9))
+        below_b23 = (T > T_SAT_MAX) & (p <= pB23(T))
+        return (below_sat | below_b23 | (T > 863.15)) & (T <= T_MAX)
+
+def region2_T(p, value, given, iterations=50, tol=1e-9):
+    """
+    Inverts region 2 for temperature given (p, h) or (p, s) with a vectorized Newton iteration.
+
+    All points are iterated together; only the iteration count is a Python loop.
+
+    Args:
+        p (ndarray): Pressures in MPa.
+        value (ndarray): h in kJ/kg or s in kJ/(kg K), broadcast against p.
+        given (str): 'h' or 's'.
+        iterations (int, optional): Maximum number of Newton steps. Defaults to 50.
+        tol (float, optional): Convergence tolerance on temperature in K. Defaults to 1e-9.
+
+    Returns:
+        ndarray: Temperatures in K.
+    """
+    p, value = np.broadcast_arrays(np.asarray(p, dtype=float), np.asarray(value, dtype=float))
+    T = np.minimum(Tsat(np.minimum(p, 22.064)), T_SAT_MAX) + 50.0
+    for _ in range(iterations):
+        h, s, v, cp = region2(p, T)
+        # dh/dT = cp and ds/dT = cp/T along an isobar
+        dT = (h - value) / cp if given == 'h' else (s - value) * T / cp
+        T = np.maximum(T - dT, 273.15)
+        if not np.nanmax(np.abs(dT), initial=0.0) > tol:
+            break
+    return T
+# endregion
+
+class IF97Backend:
+    """
+    Steam property backend that evaluates the IAPWS-IF97 equations (regions 1, 2 and 4) in closed form.
+
+    It offers the same interface as steam_tables.TableBackend, with pressures in kPa and temperatures in °C,
+    so steam and SteamStateArray can use either backend.  Saturation properties are returned only up to
+    623.15 K, where region 3 would be needed; above that, and outside region 2 for superheated states, nan is
+    returned.
+    """
+    name = 'if97'
+
+    def saturation(self, p):
+        """
+        Saturation properties at pressure p.
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+
+        Returns:
+            ndarray: Shape (7,) + shape of p, unpackable as Tsat, hf, hg, sf, sg, vf, vg.
+        """
+        pMPa = np.asarray(p, dtype=float) / 1000
+        with np.errstate(invalid='ignore'):
+            T = Tsat(pMPa)
+            T = np.where((pMPa >= psat(273.16)) & (T <= T_SAT_MAX), T, np.nan)
+        hf, sf, vf, _ = region1(pMPa, T)
+        hg, sg, vg, _ = region2(pMPa, T)
+        return np.stack((T - 273.15, hf, hg, sf, sg, vf, vg))
+
+    def superheated(self, p, given, value):
+        """
+        Region 2 properties at (p, value).
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+            given (str): The property paired with pressure: 'T' (°C), 'h' or 's'.
+            value (float or ndarray): The given property, broadcast against p.
+
+        Returns:
+            ndarray: Shape (3,) + broadcast shape, unpackable as (h, s, v) for given='T', (T, s, v) for
+                given='h' and (T, h, v) for given='s'.
+        """
+        pMPa = np.asarray(p, dtype=float) / 1000
+        if given == 'T':
+            T = np.asarray(value, dtype=float) + 273.15
+        else:
+            with np.errstate(invalid='ignore', over='ignore'):
+                T = region2_T(pMPa, value, given)
+        T = np.where(in_region2(pMPa, T), T, np.nan)
+        h, s, v, _ = region2(pMPa, T)
+        if given == 'T':
+            return np.stack((h, s, v))
+        return np.stack((T - 273.15, s if given == 'h' else h, v))
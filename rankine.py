@@ -1,4 +1,146 @@
-from steam import steam
+import numpy as np
+from steam import cached_steam, SteamState, SteamStateArray
+
+# Cycle results of every operating point, and the states of the cycle in order.
+RESULT_FIELDS = ('efficiency', 'turbine_work', 'pump_work', 'heat_added')
+STATES = ('state1', 'state2', 'state3', 'state4')
+
+# Specific heat of liquid water in kJ/(kg K), for the temperature rise caused by pump losses.
+LIQUID_CP = 4.18
+
+def pump_exit_enthalpy(h3, v3, p_low, p_high, efficiency=1.0):
+    """
+    Enthalpy at the pump exit from the incompressible-liquid pump work v*(p_high - p_low), in kJ/kg since
+    1 kPa m^3/kg = 1 kJ/kg.
+
+    Works on floats or arrays, so the single-point rankine class and RankineSweep share it.
+
+    Args:
+        h3: Pump inlet enthalpy in kJ/kg.
+        v3: Pump inlet specific volume in m^3/kg.
+        p_low: Pump inlet pressure in kPa.
+        p_high: Pump exit pressure in kPa.
+        efficiency: Pump isentropic efficiency; the actual work is the isentropic work divided by it.
+            Defaults to 1.0.
+
+    Returns:
+        Pump exit enthalpy in kJ/kg.
+    """
+    return h3 + (v3 * (p_high - p_low)) / efficiency
+
+def pump_exit_state(T3, v3, h3, s3, p_low, p_high, efficiency=1.0):
+    """
+    Compressed liquid state at the pump exit, treating the liquid as incompressible.
+
+    Isentropic compression of an incompressible liquid leaves T, v and s unchanged and adds v*(p_high - p_low)
+    to h.  The pump losses, the work beyond that, heat the liquid at the constant specific heat LIQUID_CP.  The
+    state follows in closed form from the pump inlet, so no table lookup is needed; works on floats or arrays.
+
+    Args:
+        T3: Pump inlet temperature in °C.
+        v3: Pump inlet specific volume in m^3/kg.
+        h3: Pump inlet enthalpy in kJ/kg.
+        s3: Pump inlet entropy in kJ/(kg K).
+        p_low: Pump inlet pressure in kPa.
+        p_high: Pump exit pressure in kPa.
+        efficiency: Pump isentropic efficiency. Defaults to 1.0.
+
+    Returns:
+        tuple: Pump exit (T, v, h, s).
+    """
+    h4 = pump_exit_enthalpy(h3, v3, p_low, p_high, efficiency)
+    T4 = T3 + (h4 - pump_exit_enthalpy(h3, v3, p_low, p_high)) / LIQUID_CP
+    s4 = s3 + LIQUID_CP * np.log((T4 + 273.15) / (T3 + 273.15))
+    return T4, v3, h4, s4
+
+def turbine_exit_enthalpy(h1, h2s, efficiency=1.0):
+    """
+    Enthalpy at the turbine exit from the isentropic exit enthalpy and the turbine isentropic efficiency.
+
+    Works on floats or arrays.
+
+    Args:
+        h1: Turbine inlet enthalpy in kJ/kg.
+        h2s: Enthalpy at the turbine exit pressure and the inlet entropy in kJ/kg.
+        efficiency: Turbine isentropic efficiency; the actual work is the isentropic work times it.
+            Defaults to 1.0.
+
+    Returns:
+        Turbine exit enthalpy in kJ/kg.
+    """
+    return h1 - efficiency * (h1 - h2s)
+
+def is_isentropic(efficiency):
+    """
+    True if an efficiency (a float or an array) is exactly 1 everywhere, so the ideal state can be used as is.
+    """
+    return bool(np.all(np.asarray(efficiency) == 1))
+
+def sweep_axes(p_low, p_high, t_high=None, grid=False):
+    """
+    Converts sweep parameters to arrays, as open grid axes if grid is True.
+
+    Args:
+        p_low, p_high (array_like): Low and high pressures in kPa.
+        t_high (array_like, optional): Turbine inlet temperatures in °C. Defaults to None (saturated vapor), which
+            adds no axis to the grid.
+        grid (bool, optional): If True, the parameters are 1-D axes of a p_low x p_high (x t_high) grid.
+            Defaults to False.
+
+    Returns:
+        tuple: (p_low, p_high, t_high or None), broadcastable against each other.
+    """
+    axes = [np.asarray(a, dtype=float) for a in ((p_low, p_high) if t_high is None else (p_low, p_high, t_high))]
+    if grid:
+        axes = list(np.ix_(*(np.ravel(a) for a in axes)))  # open grid; broadcasting fills in the rest
+    return axes[0], axes[1], None if t_high is None else axes[2]
+
+class PerformanceMap:
+    """
+    A class representing the off-design performance map of a turbine or pump.
+
+    The isentropic efficiency is tabulated against the load fraction (flow over design flow) and linearly
+    interpolated, clamped to the end points.  Calling a map with an array of loads gives an array of
+    efficiencies, which the rankine, RankineSweep and cycle graph models accept wherever they take an
+    efficiency, so off-design sweeps run through the same batched property path as ideal ones.
+
+    Attributes:
+        load (ndarray): Load fractions, increasing.
+        efficiency (ndarray): Isentropic efficiencies at those loads.
+        name (str): A useful identifier for the map.
+    """
+
+    def __init__(self, load, efficiency, name=None):
+        """
+        Initializes a performance map.
+
+        Args:
+            load (array_like): Load fractions, increasing.
+            efficiency (array_like): Isentropic efficiencies at those loads, between 0 and 1.
+            name (str, optional): A useful identifier for the map. Defaults to None.
+
+        Raises:
+            ValueError: If the loads are not increasing or an efficiency is not in (0, 1].
+        """
+        self.load = np.asarray(load, dtype=float)
+        self.efficiency = np.asarray(efficiency, dtype=float)
+        if self.load.shape != self.efficiency.shape or (np.diff(self.load) <= 0).any():
+            raise ValueError('A performance map needs increasing loads, one efficiency per load')
+        if ((self.efficiency <= 0) | (self.efficiency > 1)).any():
+            raise ValueError('Isentropic efficiencies must be in (0, 1]')
+        self.name = name
+
+    def __call__(self, load):
+        """
+        Returns the isentropic efficiency at the given load fractions.
+
+        Args:
+            load (array_like): Load fractions.
+
+        Returns:
+            float or ndarray: The efficiencies.
+        """
+        return np.interp(load, self.load, self.efficiency)
 
 class rankine:
     """
@@ -12,7 +154,10 @@ class rankine:
         p_high (float): The high-pressure value of the Rankine cycle.
         t_high (float, optional): The high-temperature value of the Rankine cycle (if superheated).
             Defaults to None.
+        turbine_efficiency (float): The turbine isentropic efficiency. Defaults to 1.0.
+        pump_efficiency (float): The pump isentropic efficiency. Defaults to 1.0.
         name (str, optional): A useful identifier for the Rankine cycle instance. Defaults to 'Rankine Cycle'.
+        state2s (SteamState): The isentropic turbine exit state (state2 itself when turbine_efficiency is 1).
         efficiency (float): The efficiency of the Rankine cycle.
         turbine_work (float): The work done by the turbine in the Rankine cycle.
         pump_work (float): The work done by the pump in the Rankine cycle.
@@ -20,12 +165,22 @@ class rankine:
 
     Methods:
         __init__: Initializes a Rankine cycle instance with specified parameters.
+        update: Changes cycle parameters and recomputes only the affected states.
         calc_states: Calculates the steam properties at various states of the Rankine cycle.
         calc_efficiency: Calculates the efficiency of the Rankine cycle.
         print_summary: Prints a summary of the Rankine cycle.
+        to_dict: Returns the parameters, results and states as a dict.
     """
 
-    def __init__(self, p_low=8, p_high=8000, t_high=None, name='Rankine Cycle'):
+    # The cycle parameters each state depends on.  Changing a parameter recomputes only the states listed for it.
+    DEPENDENCIES = {'state1': ('p_high', 't_high'),
+                    'state2': ('p_low', 'p_high', 't_high', 'turbine_efficiency'),
+                    'state3': ('p_low',),
+                    'state4': ('p_low', 'p_high', 'pump_efficiency')}
+    PARAMETERS = ('p_low', 'p_high', 't_high', 'turbine_efficiency', 'pump_efficiency')
+
+    def __init__(self, p_low=8, p_high=8000, t_high=None, name='Rankine Cycle', turbine_efficiency=1.0,
+                 pump_efficiency=1.0):
         """
         Initializes a Rankine cycle instance with specified parameters.
 
@@ -35,11 +190,16 @@ class rankine:
             t_high (float, optional): The high-temperature value of the Rankine cycle (if superheated).
                 Defaults to None.
             name (str, optional): A useful identifier for the Rankine cycle instance. Defaults to 'Rankine Cycle'.
+            turbine_efficiency (float, optional): The turbine isentropic efficiency. Defaults to 1.0.
+            pump_efficiency (float, optional): The pump isentropic efficiency. Defaults to 1.0.
         """
         # Initialize the cycle with specified pressures, optional temperature, and name.
-        self.p_low = p_low  # Low pressure of the cycle, in kPa.
-        self.p_high = p_high  # High pressure of the cycle, in kPa.
-        self.t_high = t_high  # Optional high temperature for superheat, in °C.
+        # The parameters are stored privately; the public properties recompute affected states when set.
+        self._p_low = p_low  # Low pressure of the cycle, in kPa.
+        self._p_high = p_high  # High pressure of the cycle, in kPa.
+        self._t_high = t_high  # Optional high temperature for superheat, in °C.
+        self._turbine_efficiency = turbine_efficiency  # Isentropic efficiencies of the turbine and pump.
+        self._pump_efficiency = pump_efficiency
         self.name = name  # Name of the cycle for identification.
         # Properties that will be calculated later.
         self.efficiency = None
@@ -48,34 +208,117 @@ class rankine:
         self.heat_added = None
         self.calc_states()  # Start calculations of the cycle states upon initialization.
 
-    def calc_states(self):
+    @property
+    def p_low(self):
+        """The low pressure of the cycle in kPa.  Setting it recomputes states 2, 3 and 4."""
+        return self._p_low
+
+    @p_low.setter
+    def p_low(self, value):
+        self.update(p_low=value)
+
+    @property
+    def p_high(self):
+        """The high pressure of the cycle in kPa.  Setting it recomputes states 1, 2 and 4."""
+        return self._p_high
+
+    @p_high.setter
+    def p_high(self, value):
+        self.update(p_high=value)
+
+    @property
+    def t_high(self):
+        """The turbine inlet temperature in °C (None for saturated vapor).  Setting it recomputes states 1 and 2."""
+        return self._t_high
+
+    @t_high.setter
+    def t_high(self, value):
+        self.update(t_high=value)
+
+    @property
+    def turbine_efficiency(self):
+        """The turbine isentropic efficiency.  Setting it recomputes state 2."""
+        return self._turbine_efficiency
+
+    @turbine_efficiency.setter
+    def turbine_efficiency(self, value):
+        self.update(turbine_efficiency=value)
+
+    @property
+    def pump_efficiency(self):
+        """The pump isentropic efficiency.  Setting it recomputes state 4."""
+        return self._pump_efficiency
+
+    @pump_efficiency.setter
+    def pump_efficiency(self, value):
+        self.update(pump_efficiency=value)
+
+    def update(self, **params):
         """
-        Calculates the steam properties at various states of the Rankine cycle.
+        Changes one or more cycle parameters and recomputes only the states that depend on them.
+
+        Args:
+            **params: New values for any of PARAMETERS.
+
+        Returns:
+            list: The names of the states that were recomputed, in evaluation order.
+
+        Raises:
+            TypeError: If a parameter not in PARAMETERS is given.
         """
-        # Determine the state of steam at the turbine inlet, considering if it's superheated or not.
-        if self.t_high is None:
-            # Saturated steam at high pressure if t_high is not specified.
-            self.state1 = steam(self.p_high, x=1, name='Turbine Inlet')
-        else:
-            # Superheated steam if t_high is provided.
-            self.state1 = steam(self.p_high, T=self.t_high, name='Turbine Inlet')
-        # Calculate properties for state 1.
-        self.state1.calc()
+        for key in params:
+            if key not in self.PARAMETERS:
+                raise TypeError(f'rankine.update() got an unexpected parameter {key!r}')
+        changed = set()  # checked first, so a bad parameter leaves the cycle untouched
+        for key, value in params.items():
+            if getattr(self, '_' + key) != value:
+                setattr(self, '_' + key, value)
+                changed.add(key)
+        stale = [state for state, deps in self.DEPENDENCIES.items() if changed.intersection(deps)]
+        if stale:
+            self.calc_states(stale)
+        return stale
 
-        # Calculate state 2 properties assuming isentropic expansion to low pressure.
-        self.state2 = steam(self.p_low, s=self.state1.s, name='Turbine Exit')
-        self.state2.calc()
+    def calc_states(self, states=None):
+        """
+        Calculates the steam properties at various states of the Rankine cycle.
+
+        Args:
+            states (iterable, optional): Names of the states to recompute (see DEPENDENCIES). Defaults to None
+                (all four states).
+        """
+        states = set(self.DEPENDENCIES if states is None else states)
+        # States 1-3 are immutable snapshots shared through the steam state cache, so sweeps that revisit the
+        # same pressures (e.g., the pump inlet) skip the table lookups.
+        if 'state1' in states:
+            # Determine the state of steam at the turbine inlet, considering if it's superheated or not.
+            if self.t_high is None:
+                # Saturated steam at high pressure if t_high is not specified.
+                self.state1 = cached_steam(self.p_high, x=1, name='Turbine Inlet')
+            else:
+                # Superheated steam if t_high is provided.
+                self.state1 = cached_steam(self.p_high, T=self.t_high, name='Turbine Inlet')
 
-        # State 3 is the saturated liquid at the pump inlet.
-        self.state3 = steam(self.p_low, x=0, name='Pump Inlet')
-        self.state3.calc()
+        if 'state2' in states:
+            # Calculate state 2 properties assuming isentropic expansion to low pressure, then correct the exit
+            # enthalpy for the turbine efficiency.
+            self.state2s = cached_steam(self.p_low, s=self.state1.s, name='Turbine Exit')
+            if is_isentropic(self.turbine_efficiency):
+                self.state2 = self.state2s
+            else:
+                h2 = turbine_exit_enthalpy(self.state1.h, self.state2s.h, self.turbine_efficiency)
+                self.state2 = cached_steam(self.p_low, h=h2, name='Turbine Exit')
 
-        # Assume isentropic compression for state 4 calculations.
-        self.state4 = steam(self.p_high, s=self.state3.s, name='Pump Exit')
-        self.state4.calc()
+        if 'state3' in states:
+            # State 3 is the saturated liquid at the pump inlet.
+            self.state3 = cached_steam(self.p_low, x=0, name='Pump Inlet')
 
-        # Correct pump work using specific volume and pressure difference.
-        self.state4.h = self.state3.h + (self.state3.v * (self.p_high - self.p_low) * 1e3)  # Pump work, in kJ/kg.
+        if 'state4' in states:
+            # State 4 is the compressed liquid at the pump exit, from the incompressible-liquid pump model.
+            st = self.state3
+            T4, v4, h4, s4 = (float(prop) for prop in pump_exit_state(st.T, st.v, st.h, st.s, self.p_low,
+                                                                      self.p_high, self.pump_efficiency))
+            self.state4 = SteamState(self.p_high, T4, None, v4, h4, s4, 'Compressed Liquid', 'Pump Exit')
 
         # With states defined, calculate cycle efficiency.
         self.calc_efficiency()
@@ -113,6 +356,142 @@ class rankine:
         self.state3.print()
         self.state4.print()
 
+    def to_dict(self):
+        """
+        Returns the cycle as a dict, for machine-readable output instead of print_summary().
+
+        Returns:
+            dict: name, the PARAMETERS, the RESULT_FIELDS and states, which maps each of STATES to the
+                state's to_dict().
+        """
+        out = {'name': self.name}
+        out.update({k: getattr(self, k) for k in self.PARAMETERS + RESULT_FIELDS})
+        out['states'] = {k: getattr(self, k).to_dict() for k in STATES}
+        return out
+
+class RankineSweep:
+    """
+    A class representing many Rankine cycles evaluated together.
+
+    This is the batch counterpart of the rankine class.  The cycle parameters are arrays (or, with grid=True,
+    the axes of a p_low x p_high x t_high grid) and every state, work and heat term is an array computed with
+    SteamStateArray in one batched pass, instead of one rankine and four steam objects per operating point.
+    Each state is evaluated only over the parameters it depends on (e.g., the pump inlet over p_low alone) and
+    the results are broadcast, so grids repeat no table lookups.  Operating points the tables cannot resolve
+    give nan.
+
+    Attributes:
+        p_low (ndarray): The low pressures in kPa.
+        p_high (ndarray): The high pressures in kPa.
+        t_high (ndarray or None): The turbine inlet temperatures in °C, or None for saturated vapor.
+        turbine_efficiency (float or ndarray): Turbine isentropic efficiencies, broadcast against the sweep.
+        pump_efficiency (float or ndarray): Pump isentropic efficiencies, broadcast against the sweep.
+        state1, state2, state3, state4 (SteamStateArray): Turbine inlet, turbine exit, pump inlet, pump exit.
+        state2s (SteamStateArray): The isentropic turbine exit (state2 itself when turbine_efficiency is 1).
+        turbine_work (ndarray): Turbine work in kJ/kg.
+        pump_work (ndarray): Pump work in kJ/kg.
+        heat_added (ndarray): Heat added in kJ/kg.
+        efficiency (ndarray): Cycle efficiency in percent.
+        name (str): A useful identifier for the sweep.
+    """
+
+    def __init__(self, p_low=8, p_high=8000, t_high=None, grid=False, name='Rankine Sweep', backend=None,
+                 turbine_efficiency=1.0, pump_efficiency=1.0):
+        """
+        Initializes and evaluates a sweep of Rankine cycles.
+
+        Args:
+            p_low (array_like, optional): Low pressures in kPa. Defaults to 8.
+            p_high (array_like, optional): High pressures in kPa. Defaults to 8000.
+            t_high (array_like, optional): Turbine inlet temperatures in °C. Defaults to None (saturated vapor).
+            grid (bool, optional): If True, p_low, p_high and t_high are 1-D axes and the sweep covers every
+                combination, with shape (len(p_low), len(p_high), len(t_high)), or (len(p_low), len(p_high))
+                for saturated vapor. Otherwise they are broadcast against each other. Defaults to False.
+            name (str, optional): A useful identifier for the sweep. Defaults to 'Rankine Sweep'.
+            backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+            turbine_efficiency (array_like, optional): Turbine isentropic efficiencies, broadcast against the
+                sweep (e.g., a PerformanceMap evaluated at the load fraction of every point). Defaults to 1.0.
+            pump_efficiency (array_like, optional): Pump isentropic efficiencies, broadcast the same way.
+                Defaults to 1.0.
+        """
+        self.p_low, self.p_high, self.t_high = sweep_axes(p_low, p_high, t_high, grid)
+        self.turbine_efficiency = turbine_efficiency
+        self.pump_efficiency = pump_efficiency
+        self.name = name
+        self.backend = backend
+        self.calc_states()
+
+    def calc_states(self):
+        """
+        Calculates every state of every cycle, then the cycle efficiencies.
+        """
+        if self.t_high is None:
+            self.state1 = SteamStateArray(self.p_high, x=1, name='Turbine Inlet', backend=self.backend)
+        else:
+            self.state1 = SteamStateArray(self.p_high, T=self.t_high, name='Turbine Inlet', backend=self.backend)
+        self.state2s = SteamStateArray(self.p_low, s=self.state1.s, name='Turbine Exit', backend=self.backend)
+        if is_isentropic(self.turbine_efficiency):
+            self.state2 = self.state2s
+        else:
+            h2 = turbine_exit_enthalpy(self.state1.h, self.state2s.h, self.turbine_efficiency)
+            self.state2 = SteamStateArray(self.p_low, h=h2, name='Turbine Exit', backend=self.backend)
+        self.state3 = SteamStateArray(self.p_low, x=0, name='Pump Inlet', backend=self.backend)
+        st = self.state3
+        T4, v4, h4, s4 = pump_exit_state(st.T, st.v, st.h, st.s, self.p_low, self.p_high, self.pump_efficiency)
+        self.state4 = SteamStateArray.from_properties(self.p_high, T4, np.nan, v4, h4, s4, SteamStateArray.COMPRESSED,
+                                                      name='Pump Exit', backend=self.backend)
+        self.calc_efficiency()
+
+    def calc_efficiency(self):
+        """
+        Calculates the work, heat and efficiency arrays from the states.
+        """
+        shape = np.broadcast_shapes(self.state1.h.shape, self.state2.h.shape, self.state4.h.shape)
+        self.heat_added = np.broadcast_to(self.state1.h - self.state4.h, shape)
+        self.turbine_work = np.broadcast_to(self.state1.h - self.state2.h, shape)
+        self.pump_work = np.broadcast_to(self.state4.h - self.state3.h, shape)
+        self.efficiency = (self.turbine_work - self.pump_work) / self.heat_added * 100
+
+    def __len__(self):
+        return self.efficiency.size
+
+    def to_columns(self, states=True):
+        """
+        Returns the sweep as flat columns, one element per operating point, for the exporters in rankine_results.
+
+        Args:
+            states (bool, optional): If True, include the properties of every state as columns named after the
+                state (e.g., state1_h; see SteamStateArray.to_columns). Defaults to True.
+
+        Returns:
+            dict: p_low, p_high, t_high (nan for saturated vapor), the efficiencies, the RESULT_FIELDS and the
+                state columns, as float arrays (int8 for the region codes).
+        """
+        shape = self.efficiency.shape
+        columns = {k: np.broadcast_to(np.asarray(v, dtype=float), shape).ravel() for k, v in
+                   (('p_low', self.p_low), ('p_high', self.p_high),
+                    ('t_high', np.nan if self.t_high is None else self.t_high),
+                    ('turbine_efficiency', self.turbine_efficiency), ('pump_efficiency', self.pump_efficiency))}
+        columns.update((k, np.ravel(getattr(self, k))) for k in RESULT_FIELDS)
+        if states:
+            for name in STATES:
+                for k, v in getattr(self, name).to_columns().items():
+                    columns[f'{name}_{k}'] = np.broadcast_to(v.reshape(getattr(self, name).p.shape), shape).ravel()
+        return columns
+
+    def to_records(self, states=True):
+        """
+        Returns the sweep as a NumPy record array, one record per operating point.
+
+        Args:
+            states (bool, optional): As for to_columns. Defaults to True.
+
+        Returns:
+            np.recarray: One field per column of to_columns.
+        """
+        columns = self.to_columns(states)
+        return np.rec.fromarrays(list(columns.values()), names=list(columns))
+
 def main():
     """
     Main function to demonstrate Rankine cycle usage.
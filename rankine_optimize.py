@@ -0,0 +1,163 @@
+import time
+from collections import namedtuple
+import numpy as np
+from rankine import rankine, RankineSweep
+from steam import SteamStateArray
+
+# Cycle parameters the optimizer can vary.  Pressures are searched on a logarithmic scale, temperatures linearly.
+PARAMETERS = ('p_low', 'p_high', 't_high')
+LOG_PARAMETERS = ('p_low', 'p_high')
+
+# Objectives the optimizer can maximize: the name of a RankineSweep attribute, or 'net_work'.
+OBJECTIVES = ('efficiency', 'net_work', 'turbine_work')
+
+RankineOptimum = namedtuple('RankineOptimum', ('params', 'value', 'cycle', 'evaluations', 'iterations', 'seconds'))
+RankineOptimum.__doc__ = """
+The result of optimize_rankine.
+
+Attributes:
+    params (dict): The optimal p_low, p_high (kPa) and t_high (°C, or None for saturated vapor).
+    value (float): The objective at the optimum.
+    cycle (rankine): A rankine object built at the optimum.
+    evaluations (int): Number of operating points evaluated.
+    iterations (int): Number of batched search iterations.
+    seconds (float): Wall time of the search.
+"""
+
+def objective_values(sweep, objective='efficiency'):
+    """
+    Extracts the objective to maximize from a sweep.
+
+    Args:
+        sweep (RankineSweep): The evaluated cycles.
+        objective (str, optional): One of OBJECTIVES. Defaults to 'efficiency'.
+
+    Returns:
+        ndarray: The objective of every operating point.
+    """
+    if objective == 'net_work':
+        return sweep.turbine_work - sweep.pump_work
+    if objective not in OBJECTIVES:
+        raise ValueError(f'Unknown objective {objective!r}; expected one of {OBJECTIVES}')
+    return getattr(sweep, objective)
+
+def turbine_exit_quality(sweep):
+    """
+    The turbine exit quality of every cycle of a sweep, with superheated exits counted as quality 1.
+
+    Args:
+        sweep (RankineSweep): The evaluated cycles.
+
+    Returns:
+        ndarray: Quality in the shape of the sweep (nan where the exit state is unresolved).
+    """
+    state2 = sweep.state2
+    x = np.where(state2.region_code == SteamStateArray.SUPERHEATED, 1.0, state2.x)
+    return np.broadcast_to(x, sweep.efficiency.shape)
+
+def _axis(name, low, high, n):
+    """
+    Samples n points of one parameter between low and high (geometrically for pressures).
+    """
+    if low == high:
+        return np.array([low], dtype=float)
+    if name in LOG_PARAMETERS:
+        return np.geomspace(low, high, n)
+    return np.linspace(low, high, n)
+
+def optimize_rankine(bounds, fixed=None, objective='efficiency', min_quality=None, points=9, tol=1e-4,
+                     max_iterations=50, backend=None):
+    """
+    Maximizes a Rankine cycle objective over box bounds with a batched, gradient-free grid refinement search.
+
+    Each iteration evaluates a points x points x ... grid over the current search box in one RankineSweep,
+    discards infeasible cycles (unresolved states, no heat added or net work, or a turbine exit quality below
+    min_quality) and shrinks the
+    box to one grid spacing either side of the best point.  The search stops when every box edge is narrower
+    than tol relative to its bounds.  Like any local refinement it finds the global optimum of objectives that
+    are unimodal over the bounds; for others, raise points.
+
+    Args:
+        bounds (dict): Maps each parameter to optimize (see PARAMETERS) to its (low, high) bounds.
+        fixed (dict, optional): Values of the parameters not optimized. Defaults to None (p_low=8, p_high=8000,
+            t_high=None, as for rankine).
+        objective (str, optional): One of OBJECTIVES. Defaults to 'efficiency'.
+        min_quality (float, optional): The minimum turbine exit quality. Defaults to None (unconstrained).
+        points (int, optional): Grid points per optimized parameter and iteration. Defaults to 9.
+        tol (float, optional): Relative size of the final search box. Defaults to 1e-4.
+        max_iterations (int, optional): The maximum number of iterations. Defaults to 50.
+        backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+
+    Returns:
+        RankineOptimum: The optimum and the cost of finding it.
+
+    Raises:
+        ValueError: If a parameter is unknown, bounded and fixed, or no cycle in the bounds is feasible.
+    """
+    start = time.perf_counter()
+    params = {'p_low': 8, 'p_high': 8000, 't_high': None}
+    params.update(fixed or {})
+    for name in set(bounds) | set(params):
+        if name not in PARAMETERS:
+            raise ValueError(f'Unknown Rankine parameter {name!r}; expected one of {PARAMETERS}')
+    if fixed and set(bounds) & set(fixed):
+        raise ValueError(f'Parameters both bounded and fixed: {sorted(set(bounds) & set(fixed))}')
+    if not bounds:
+        raise ValueError('No parameters to optimize')
+    if points < 3:
+        raise ValueError('At least 3 points per parameter are needed')
+
+    bounds = {k: (float(min(b)), float(max(b))) for k, b in bounds.items()}
+    box = dict(bounds)
+    best_value, best = -np.inf, None
+    evaluations = iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        axes = {k: _axis(k, *box[k], points) if k in box else params[k] for k in PARAMETERS}
+        sweep = RankineSweep(axes['p_low'], axes['p_high'], axes['t_high'], grid=True, backend=backend)
+        values = np.array(objective_values(sweep, objective), dtype=float)
+        # a cycle must take in heat and give out net work; near heat_added = 0 the efficiency is meaningless
+        feasible = np.isfinite(values) & (sweep.heat_added > 0) & (sweep.turbine_work > sweep.pump_work)
+        if min_quality is not None:
+            feasible &= turbine_exit_quality(sweep) >= min_quality
+        values[~feasible] = -np.inf
+        evaluations += values.size
+
+        index = np.unravel_index(np.argmax(values), values.shape)
+        if values[index] > best_value:
+            best_value = values[index]
+            best = {k: float(np.ravel(axes[k])[i]) for k, i in zip(PARAMETERS, index) if k in box}
+        if best is None:
+            raise ValueError('No feasible Rankine cycle within the bounds')
+
+        # shrink the box to one grid spacing either side of the best point
+        done = True
+        for k, (low, high) in box.items():
+            axis = axes[k]
+            i = np.searchsorted(axis, best[k])
+            low, high = axis[max(i - 1, 0)], axis[min(i + 1, len(axis) - 1)]
+            box[k] = (low, high)
+            full = bounds[k][1] - bounds[k][0]
+            if full > 0 and high - low > tol * full:
+                done = False
+        if done:
+            break
+
+    result = dict(params)
+    result.update({k: best[k] for k in bounds})
+    cycle = rankine(p_low=result['p_low'], p_high=result['p_high'], t_high=result['t_high'],
+                    name='Optimal Rankine Cycle')
+    return RankineOptimum(result, float(best_value), cycle, evaluations, iterations, time.perf_counter() - start)
+
+def main():
+    """
+    Finds the most efficient superheated cycle with a dry enough turbine exit and prints the search cost.
+    """
+    optimum = optimize_rankine({'p_high': (1000, 16000), 't_high': (400, 600)}, min_quality=0.88)
+    print(f'{optimum.evaluations} cycles evaluated in {optimum.iterations} iterations '
+          f'({optimum.seconds * 1000:.1f} ms)')
+    print(', '.join(f'{k} = {v}' for k, v in optimum.params.items()))
+    optimum.cycle.print_summary()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from rankine import RankineSweep, RESULT_FIELDS, sweep_axes
+from steam import get_backend
+from steam_tables import TABLES, TableBackend, saturation_line, spline_saturation_line, superheated_table
+
+def _init_worker(sat_file, superheated_file, backend):
+    """
+    Process pool initializer: points the worker's table registry at the parent's tables and, for backends that
+    interpolate the tables, builds the interpolators once, so no chunk pays for parsing or triangulating.  With
+    binary (.bin) tables every worker memory-maps the same file, so the table pages are shared between processes
+    through the page cache.
+    """
+    TABLES.load(sat_file, superheated_file)
+    backend = get_backend(backend)
+    if not isinstance(backend, TableBackend):
+        return  # e.g. IF97, which evaluates closed-form equations
+    if backend.saturation_model == 'linear':
+        saturation_line(backend.tables)
+    else:
+        spline_saturation_line(backend.tables, backend.saturation_model)
+    for given in ('T', 'h', 's'):
+        superheated_table(backend.tables, given=given)
+
+def _run_chunk(start, p_low, p_high, t_high, backend, turbine_efficiency, pump_efficiency):
+    """
+    Evaluates one chunk of operating points in a worker.
+
+    Returns:
+        tuple: (start index, dict of result arrays, worker pid, seconds spent)
+    """
+    t0 = time.perf_counter()
+    sweep = RankineSweep(p_low, p_high, t_high, backend=backend, turbine_efficiency=turbine_efficiency,
+                         pump_efficiency=pump_efficiency)
+    results = {k: np.ascontiguousarray(getattr(sweep, k)) for k in RESULT_FIELDS}
+    return start, results, os.getpid(), time.perf_counter() - t0
+
+def flatten_sweep(p_low, p_high, t_high=None, grid=False):
+    """
+    Expands sweep parameters to flat arrays, one element per operating point.
+
+    Args:
+        p_low, p_high, t_high: As for RankineSweep.
+        grid (bool, optional): As for RankineSweep. Defaults to False.
+
+    Returns:
+        tuple: (p_low, p_high, t_high or None, shape of the sweep)
+    """
+    axes = np.broadcast_arrays(*(a for a in sweep_axes(p_low, p_high, t_high, grid) if a is not None))
+    flat = [a.ravel() for a in axes]
+    return flat[0], flat[1], None if t_high is None else flat[2], axes[0].shape
+
+def iter_parallel_sweep(p_low, p_high, t_high=None, grid=False, chunk_size=100000, max_workers=None,
+                        backend=None, turbine_efficiency=1.0, pump_efficiency=1.0):
+    """
+    Shards a Rankine sweep across a process pool and yields the results chunk by chunk as workers finish.
+
+    Args:
+        p_low, p_high, t_high, grid: As for RankineSweep.
+        chunk_size (int, optional): Operating points per chunk. Defaults to 100000.
+        max_workers (int, optional): Number of worker processes. Defaults to None (one per CPU).
+        backend (str, optional): Steam property backend name. Defaults to None (DEFAULT_BACKEND).
+        turbine_efficiency, pump_efficiency: As for RankineSweep; arrays are broadcast against the sweep and
+            sharded with the operating points.
+
+    Yields:
+        tuple: (start, results, pid, seconds), where results maps each of RESULT_FIELDS to the values of the
+            operating points start:start + len, in the flattened order of flatten_sweep.
+    """
+    if backend is not None:
+        backend = get_backend(backend).name  # workers resolve the backend by name
+    pl, ph, th, shape = flatten_sweep(p_low, p_high, t_high, grid)
+    # efficiencies that vary over the sweep are flattened like the parameters; constants go to every chunk as is
+    te, pe = (e if np.ndim(e) == 0 else np.broadcast_to(e, shape).ravel()
+              for e in (turbine_efficiency, pump_efficiency))
+    chunk = lambda a, i: a if a is None or np.ndim(a) == 0 else a[i:i + chunk_size]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(TABLES.sat_file, TABLES.superheated_file, backend)) as pool:
+        futures = [pool.submit(_run_chunk, i, pl[i:i + chunk_size], ph[i:i + chunk_size], chunk(th, i), backend,
+                               chunk(te, i), chunk(pe, i))
+                   for i in range(0, len(pl), chunk_size)]
+        for future in as_completed(futures):
+            yield future.result()
+
+def parallel_sweep(p_low, p_high, t_high=None, grid=False, chunk_size=100000, max_workers=None, backend=None,
+                   turbine_efficiency=1.0, pump_efficiency=1.0):
+    """
+    Runs a Rankine sweep on a process pool and assembles the results.
+
+    Gives the same values as RankineSweep (and as rankine.calc_states() point by point), in the sweep's shape.
+
+    Args:
+        p_low, p_high, t_high, grid: As for RankineSweep.
+        chunk_size (int, optional): Operating points per chunk. Defaults to 100000.
+        max_workers (int, optional): Number of worker processes. Defaults to None (one per CPU).
+        backend (str, optional): Steam property backend name. Defaults to None (DEFAULT_BACKEND).
+        turbine_efficiency, pump_efficiency: As for RankineSweep. Default to 1.0.
+
+    Returns:
+        tuple: (results, stats) where results maps each of RESULT_FIELDS to an array and stats maps each worker
+            pid to a dict of points, seconds and points_per_second.
+    """
+    shape = flatten_sweep(p_low, p_high, t_high, grid)[3]
+    n = int(np.prod(shape))
+    results = {k: np.empty(n) for k in RESULT_FIELDS}
+    stats = {}
+    for start, chunk, pid, seconds in iter_parallel_sweep(p_low, p_high, t_high, grid, chunk_size, max_workers,
+                                                          backend, turbine_efficiency, pump_efficiency):
+        for k in RESULT_FIELDS:
+            results[k][start:start + len(chunk[k])] = chunk[k]
+        worker = stats.setdefault(pid, {'points': 0, 'seconds': 0.0})
+        worker['points'] += len(chunk[RESULT_FIELDS[0]])
+        worker['seconds'] += seconds
+    for worker in stats.values():
+        worker['points_per_second'] = worker['points'] / worker['seconds'] if worker['seconds'] else np.inf
+    return {k: v.reshape(shape) for k, v in results.items()}, stats
+
+def main():
+    """
+    Runs a demonstration sweep of 10^6 operating points and prints per-worker throughput.
+    """
+    p_low = np.linspace(5, 100, 100)
+    p_high = np.linspace(2000, 12000, 100)
+    t_high = np.linspace(400, 700, 100)
+    start = time.perf_counter()
+    results, stats = parallel_sweep(p_low, p_high, t_high, grid=True)
+    print(f'{results["efficiency"].size} operating points in {time.perf_counter() - start:.2f} s')
+    for pid, worker in sorted(stats.items()):
+        print(f'\tworker {pid}: {worker["points"]} points, {worker["points_per_second"]:,.0f} points/s')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import csv
+import json
+import os
+import struct
+import numpy as np
+
+# Columnar binary layout: a fixed header, a JSON description of the columns, then every column as one contiguous
+# little-endian array, each starting on an 8-byte boundary so read_columnar can memory-map it in place.
+COLUMNAR_SUFFIX = '.rcol'
+COLUMNAR_MAGIC = b'RANKCOLS'
+COLUMNAR_VERSION = 1
+COLUMNAR_HEADER = struct.Struct('<8sIIQQ')  # magic, format version, columns, rows, schema bytes (32 bytes)
+
+# File extensions recognised by export().
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', COLUMNAR_SUFFIX: 'columnar'}
+
+def as_columns(results, states=True):
+    """
+    Converts results to flat columns.
+
+    Args:
+        results: A RankineSweep (or anything else with to_columns), a rankine (or anything else with to_dict,
+            giving a single row without the nested states), or a dict of equal length arrays.
+        states (bool, optional): Passed to to_columns. Defaults to True.
+
+    Returns:
+        dict: Column name to 1-D array.
+    """
+    if hasattr(results, 'to_columns'):
+        return results.to_columns(states)
+    if hasattr(results, 'to_dict'):
+        row = {k: v for k, v in results.to_dict().items() if not isinstance(v, dict)}
+        return {k: np.array([np.nan if v is None else v]) for k, v in row.items()}
+    columns = {k: np.ravel(v) for k, v in results.items()}
+    if len({len(v) for v in columns.values()}) > 1:
+        raise ValueError('All columns must have the same length')
+    return columns
+
+def write_csv(columns, filename):
+    """
+    Writes columns as a CSV file with a header row, in one call.
+
+    Floats are written as their shortest exact representation, so they read back unchanged; nan is written as
+    'nan'.
+
+    Args:
+        columns (dict): Column name to 1-D array.
+        filename (str): The output file.
+    """
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(zip(*(v.tolist() for v in columns.values())))
+
+def write_jsonl(columns, filename):
+    """
+    Writes columns as JSON lines, one object per row.  NaN is not valid JSON, so it is written as null.
+
+    Args:
+        columns (dict): Column name to 1-D array.
+        filename (str): The output file.
+    """
+    names = list(columns)
+    values = [np.where(np.isnan(v), None, v).tolist() if v.dtype.kind == 'f' else v.tolist()
+              for v in columns.values()]
+    with open(filename, 'w') as f:
+        f.writelines(json.dumps(dict(zip(names, row))) + '\n' for row in zip(*values))
+
+def write_columnar(columns, filename):
+    """
+    Writes columns in the columnar binary layout read by read_columnar.
+
+    Args:
+        columns (dict): Column name to 1-D numeric array.
+        filename (str): The output file.
+    """
+    arrays = [np.ascontiguousarray(v, dtype=np.asarray(v).dtype.newbyteorder('<')) for v in columns.values()]
+    nrows = len(arrays[0]) if arrays else 0
+    schema = json.dumps([[k, a.dtype.str] for k, a in zip(columns, arrays)]).encode()
+    with open(filename, 'wb') as f:
+        f.write(COLUMNAR_HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, len(arrays), nrows, len(schema)))
+        f.write(schema)
+        for a in arrays:
+            f.write(b'\0' * (-f.tell() % 8))
+            a.tofile(f)
+
+def read_columnar(filename):
+    """
+    Memory-maps the columns of a columnar binary file.  Nothing is parsed but the column names.
+
+    Args:
+        filename (str): The columnar binary file.
+
+    Returns:
+        dict: Column name to read-only ndarray view.
+
+    Raises:
+        ValueError: If the file is not a columnar results file of a supported version.
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(COLUMNAR_HEADER.size)
+        if len(header) < COLUMNAR_HEADER.size:
+            raise ValueError(f'{filename} is not a columnar results file')
+        magic, version, ncols, nrows, schema_size = COLUMNAR_HEADER.unpack(header)
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f'{filename} is not a columnar results file')
+        if version != COLUMNAR_VERSION:
+            raise ValueError(f'{filename} has columnar version {version}, expected {COLUMNAR_VERSION}')
+        schema = json.loads(f.read(schema_size))
+    columns = {}
+    offset = COLUMNAR_HEADER.size + schema_size
+    for name, dtype in schema:
+        offset += -offset % 8
+        columns[name] = np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=(nrows,))
+        offset += nrows * np.dtype(dtype).itemsize
+    return columns
+
+def export(results, filename, fmt=None, states=True):
+    """
+    Writes Rankine results to a file in one call.
+
+    Args:
+        results: A rankine, a RankineSweep or a dict of columns (see as_columns).
+        filename (str): The output file.
+        fmt (str, optional): 'csv', 'jsonl' or 'columnar'. Defaults to None (from the file extension, see
+            FORMATS).
+        states (bool, optional): Include the state properties of a sweep. Defaults to True.
+
+    Returns:
+        int: Number of rows written.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    if fmt is None:
+        fmt = FORMATS.get(os.path.splitext(filename)[1].lower())
+    writers = {'csv': write_csv, 'jsonl': write_jsonl, 'columnar': write_columnar}
+    if fmt not in writers:
+        raise ValueError(f'Unknown results format {fmt!r}; expected one of {sorted(writers)}')
+    columns = as_columns(results, states)
+    writers[fmt](columns, filename)
+    return len(next(iter(columns.values()))) if columns else 0
@@ -0,0 +1,155 @@
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from itertools import islice
+import numpy as np
+from rankine import RankineSweep, RESULT_FIELDS
+
+# Input columns read from every row.  A missing or empty pressure is treated as nan, giving nan results for that row;
+# a missing or empty t_high means a saturated vapor turbine inlet, as t_high=None does in rankine.
+INPUT_FIELDS = ('p_low', 'p_high', 't_high')
+
+def detect_format(filename, fmt=None):
+    """
+    Picks the record format from an explicit value or the file extension.
+
+    Args:
+        filename (str): File name, or '-' for stdin/stdout.
+        fmt (str, optional): 'csv', 'ndjson' or None to guess from the extension (stdin/stdout default to csv).
+            Defaults to None.
+
+    Returns:
+        str: 'csv' or 'ndjson'.
+    """
+    if fmt is not None:
+        return fmt
+    return 'ndjson' if filename.lower().endswith(('.ndjson', '.jsonl', '.json')) else 'csv'
+
+@contextmanager
+def open_stream(filename, mode):
+    """
+    Opens a file for streaming, or yields stdin/stdout for '-'.
+
+    Args:
+        filename (str): File name, or '-'.
+        mode (str): 'r' or 'w'.
+    """
+    if filename == '-':
+        yield sys.stdin if mode == 'r' else sys.stdout
+    else:
+        with open(filename, mode, newline='') as f:
+            yield f
+
+def read_rows(f, fmt='csv'):
+    """
+    Lazily reads telemetry records, one dict per row; only the current row is held in memory.
+
+    Args:
+        f (file): An open text file.
+        fmt (str, optional): 'csv' (with a header row) or 'ndjson' (one JSON object per line). Defaults to 'csv'.
+
+    Yields:
+        dict: One record per row.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def iter_batches(rows, batch_size=10000):
+    """
+    Groups rows into fixed-size batches.
+
+    Args:
+        rows (iterable of dict): The records.
+        batch_size (int, optional): Rows per batch (the last batch may be shorter). Defaults to 10000.
+
+    Yields:
+        list of dict: One batch of records.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _column(batch, field):
+    """
+    Extracts one numeric column of a batch as a float array, with nan for missing or empty values.
+    """
+    return np.array([float(row.get(field) or 'nan') for row in batch])
+
+def evaluate_batch(batch, backend=None):
+    """
+    Evaluates the Rankine cycle of every row of a batch in one RankineSweep.
+
+    Args:
+        batch (list of dict): Records with p_low and p_high (kPa) and t_high (°C, missing or empty for saturated
+            vapor).
+        backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+
+    Returns:
+        dict: Maps each of RESULT_FIELDS to an array.
+    """
+    p_low, p_high, t_high = (_column(batch, k) for k in INPUT_FIELDS)
+    results = {k: np.empty(len(batch)) for k in RESULT_FIELDS}
+    saturated = np.isnan(t_high)
+    # rows with a turbine inlet temperature and saturated vapor rows are evaluated as one sweep each
+    for rows, t in ((~saturated, t_high[~saturated]), (saturated, None)):
+        if rows.any():
+            sweep = RankineSweep(p_low[rows], p_high[rows], t, backend=backend)
+            for k in RESULT_FIELDS:
+                results[k][rows] = getattr(sweep, k)
+    return results
+
+def stream_rankine(source='-', dest='-', fmt=None, batch_size=10000, backend=None):
+    """
+    Streams telemetry through the Rankine model with bounded memory: rows are read lazily, evaluated in batches
+    of batch_size and written out (input columns followed by RESULT_FIELDS) before the next batch is read.
+
+    Args:
+        source (str, optional): Input file name, or '-' for stdin. Defaults to '-'.
+        dest (str, optional): Output file name, or '-' for stdout. Defaults to '-'.
+        fmt (str, optional): 'csv' or 'ndjson' for both input and output. Defaults to None (guess from the
+            source file extension).
+        batch_size (int, optional): Rows evaluated per batch. Defaults to 10000.
+        backend (str or object, optional): The steam property backend. Defaults to None (DEFAULT_BACKEND).
+
+    Returns:
+        int: Number of rows processed.
+    """
+    fmt = detect_format(source, fmt)
+    count = 0
+    with open_stream(source, 'r') as fin, open_stream(dest, 'w') as fout:
+        writer = None
+        for batch in iter_batches(read_rows(fin, fmt), batch_size):
+            results = evaluate_batch(batch, backend)
+            for i, row in enumerate(batch):
+                for k in RESULT_FIELDS:
+                    row[k] = float(results[k][i])
+            if fmt == 'csv':
+                if writer is None:
+                    writer = csv.DictWriter(fout, fieldnames=list(batch[0]), extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerows(batch)
+            else:
+                # NaN is not valid JSON, so unresolved results are written as null
+                fout.writelines(json.dumps({k: (None if isinstance(v, float) and v != v else v)
+                                            for k, v in row.items()}) + '\n' for row in batch)
+            fout.flush()
+            count += len(batch)
+    return count
+
+def main():
+    """
+    Command line entry point: python rankine_stream.py [input] [output], where '-' (the default) is stdin/stdout.
+    """
+    args = sys.argv[1:] + ['-'] * (2 - len(sys.argv[1:]))
+    stream_rankine(args[0], args[1])
+
+if __name__ == "__main__":
+    main()
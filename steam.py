@@ -1,5 +1,36 @@
+from collections import OrderedDict, namedtuple
 import numpy as np
-from scipy.interpolate import griddata
+from if97 import IF97Backend
+from steam_tables import TABLES, SuperheatedTable, TableBackend
+
+# Property backends selectable by name with the backend argument of steam, SteamStateArray and cached_steam.
+BACKENDS = {'table': TableBackend(), 'spline': TableBackend(saturation_model='pchip', name='spline'),
+            'if97': IF97Backend()}
+DEFAULT_BACKEND = 'table'
+
+def get_backend(backend=None):
+    """
+    Resolves a backend argument to a property backend object.
+
+    Args:
+        backend (str or object, optional): A name in BACKENDS, a backend object, or None for DEFAULT_BACKEND.
+
+    Returns:
+        object: The property backend.
+
+    Raises:
+        ValueError: If the name is not in BACKENDS.
+    """
+    if backend is None:
+        backend = DEFAULT_BACKEND
+    if isinstance(backend, str):
+        if backend not in BACKENDS:
+            raise ValueError(f'unknown steam property backend {backend!r}, expected one of {sorted(BACKENDS)}')
+        return BACKENDS[backend]
+    return backend
+
+# Fields of a steam state in structured output (steam.to_dict, SteamStateArray.to_records).
+STATE_FIELDS = ('name', 'region', 'p', 'T', 'x', 'v', 'h', 's')
 
 class steam:
     """
@@ -24,7 +55,10 @@ class steam:
         calc: Calculates the steam properties based on provided data.
         print: Prints the steam properties.
     """
-    def __init__(self, pressure, T=None, x=None, v=None, h=None, s=None, name=None):
+    # Fixed attribute slots instead of a per-instance __dict__ keep each state small when many are kept alive.
+    __slots__ = ('p', 'T', 'x', 'v', 'h', 's', 'name', 'region', 'hf', 'backend')
+
+    def __init__(self, pressure, T=None, x=None, v=None, h=None, s=None, name=None, backend=None):
         """
         Initializes a steam object with specified properties.
 
@@ -39,6 +73,8 @@ class steam:
             s (float, optional): The specific entropy of the steam in kilojoules per kilogram per Kelvin
                 (kJ/(kg*K)). Defaults to None.
             name (str, optional): A useful identifier for the steam instance. Defaults to None.
+            backend (str or object, optional): The property backend, 'table', 'spline' or 'if97' (see BACKENDS).
+                Defaults to None (DEFAULT_BACKEND).
         """
         # Initialize steam object with given properties and default values. Calculation is deferred to `calc` method if any property is provided.
         self.p = pressure  # Pressure in kilopascals
@@ -49,6 +85,7 @@ class steam:
         self.s = s  # Specific entropy in kilojoules per kilogram per Kelvin
         self.name = name  # Identifier for the steam instance
         self.region = None  # The region will be determined based on property values
+        self.backend = get_backend(backend)  # Source of the saturated and superheated properties
         if T is None and x is None and v is None and h is None and s is None:
             return  # Early return if no properties other than pressure are specified
         else:
@@ -62,23 +99,9 @@ class steam:
         quality, specific volume, specific enthalpy, and specific entropy. It utilizes interpolation techniques
         to determine the properties depending on the region of the steam (superheated or saturated).
         """
-        # Load steam tables and calculate properties based on the given state or input parameters.
-        # Load saturated steam properties from a text file
-        ts, ps, hfs, hgs, sfs, sgs, vfs, vgs = np.loadtxt('sat_water_table.txt', skiprows=1, unpack=True)
-        # Load superheated steam properties from a text file
-        tcol, hcol, scol, pcol = np.loadtxt('superheated_water_table.txt', skiprows=1, unpack=True)
-
-        R = 8.314 / (18 / 1000)  # Specific gas constant for steam
-        Pbar = self.p / 100  # Convert pressure from kPa to bar for table lookup
-
-        # Interpolate to find saturated properties at the given pressure
-        Tsat = float(griddata(ps, ts, (Pbar), method='linear'))
-        hf = float(griddata(ps, hfs, (Pbar), method='linear'))
-        hg = float(griddata(ps, hgs, (Pbar), method='linear'))
-        sf = float(griddata(ps, sfs, (Pbar), method='linear'))
-        sg = float(griddata(ps, sgs, (Pbar), method='linear'))
-        vf = float(griddata(ps, vfs, (Pbar), method='linear'))
-        vg = float(griddata(ps, vgs, (Pbar), method='linear'))
+        # Properties come from the property backend (by default, interpolators built once from the steam tables).
+        # Find all saturated properties at the given pressure in one lookup
+        Tsat, hf, hg, sf, sg, vf, vg = (float(prop) for prop in self.backend.saturation(self.p))
 
         self.hf = hf  # Store saturated liquid enthalpy for potential future use
 
@@ -86,13 +109,9 @@ class steam:
         if self.T is not None and self.T > Tsat:
             # If temperature is specified and above saturation, treat as superheated steam
             self.region = 'Superheated'
-            # Interpolate superheated properties from table
-            superheated_properties = griddata((pcol, tcol), hcol, (Pbar, self.T), method='linear')
-            self.h = superheated_properties
-            self.s = float(griddata((pcol, tcol), scol, (Pbar, self.T), method='linear'))
+            # Find h, s and v from the superheated region in one query
+            self.h, self.s, self.v = (float(prop) for prop in self.backend.superheated(self.p, 'T', self.T))
             self.x = None  # Quality is not defined for superheated steam
-            TK = self.T + 273.15  # Convert to Kelvin for specific volume calculation
-            self.v = R * TK / (self.p * 1000)  # Calculate specific volume using ideal gas law approximation
         elif self.x is not None:
             # If quality is specified, treat as saturated mixture
             self.region = 'Saturated'
@@ -110,7 +129,9 @@ class steam:
                 self.s = sf + self.x * (sg - sf)
                 self.v = vf + self.x * (vg - vf)
             else:
-                self.region = 'Superheated'
+                # Resolve T, s and v from the superheated region (inverse table lookup by default)
+                T, s, v = self.backend.superheated(self.p, 'h', self.h) if self.x > 1 else (np.nan,) * 3
+                self._set_superheated(float(T), self.h, float(s), float(v))
         elif self.s is not None:
             # If specific entropy is specified, determine region and calculate quality
             self.x = (self.s - sf) / (sg - sf)
@@ -120,7 +141,26 @@ class steam:
                 self.h = hf + self.x * (hg - hf)
                 self.v = vf + self.x * (vg - vf)
             else:
-                self.region = 'Superheated'
+                # Resolve T, h and v from the superheated region (inverse table lookup by default)
+                T, h, v = self.backend.superheated(self.p, 's', self.s) if self.x > 1 else (np.nan,) * 3
+                self._set_superheated(float(T), float(h), self.s, float(v))
+
+    def _set_superheated(self, T, h, s, v):
+        """
+        Stores the properties of a state given h or s outside the two-phase region.
+
+        States below saturated liquid (x < 0) or off the superheated table come in as nan and are left with
+        region and x None and their other properties unresolved, like UNKNOWN elements of SteamStateArray.
+
+        Args:
+            T, h, s, v (float): The superheated properties, nan where they could not be determined.
+        """
+        self.x = None  # Quality is not defined outside the two-phase region
+        if np.isnan([T, h, s, v]).any():
+            self.region = None
+            return
+        self.region = 'Superheated'
+        self.T, self.h, self.s, self.v = T, h, s, v
 
     def print(self):
         """
@@ -145,6 +185,336 @@ class steam:
             print(f'Quality: {self.x:.4f}')
         print()
 
+    def to_dict(self):
+        """
+        Returns the steam properties as a dict, for machine-readable output instead of print().
+
+        Returns:
+            dict: name, region and the properties in STATE_FIELDS order (None where not defined).
+        """
+        return {k: getattr(self, k) for k in STATE_FIELDS}
+
+class SteamStateArray:
+    """
+    A class representing many steam states at once, stored as a struct of arrays.
+
+    This is the batch counterpart of the steam class.  It takes arrays of pressure and of exactly one other
+    property (T, x, v, h or s), determines the region of every element with array masks, and fills the
+    remaining properties with vectorized table lookups instead of per-object Python.  Elements whose
+    properties cannot be determined from the tables (e.g., off the superheated table or compressed liquid)
+    are left as nan with region code UNKNOWN.  Batches of states computed by a model rather than looked up (such
+    as the compressed liquid at a pump exit) are built with from_properties.
+
+    Attributes:
+        p (ndarray): Pressures in kilopascals (kPa).
+        T (ndarray): Temperatures in degrees Celsius (°C).
+        x (ndarray): Qualities (nan outside the two-phase region).
+        v (ndarray): Specific volumes in cubic meters per kilogram (m^3/kg).
+        h (ndarray): Specific enthalpies in kilojoules per kilogram (kJ/kg).
+        s (ndarray): Specific entropies in kilojoules per kilogram per Kelvin (kJ/(kg*K)).
+        region_code (ndarray): UNKNOWN, SATURATED, SUPERHEATED or COMPRESSED for each element.
+        region (ndarray): Region names of every element ('Saturated', 'Superheated', 'Compressed Liquid' or None).
+        name (str): A useful identifier for the batch.
+
+    Methods:
+        __init__: Initializes the batch with pressures and one other property.
+        from_properties: Builds a batch from properties that are already known.
+        calc: Calculates the remaining properties of every element.
+        __getitem__: Returns one element as a steam object.
+    """
+    UNKNOWN, SATURATED, SUPERHEATED, COMPRESSED = 0, 1, 2, 3
+    REGION_NAMES = (None, 'Saturated', 'Superheated', 'Compressed Liquid')
+    PROPERTIES = ('T', 'x', 'v', 'h', 's')
+
+    def __init__(self, pressure, T=None, x=None, v=None, h=None, s=None, name=None, backend=None):
+        """
+        Initializes a batch of steam states.
+
+        Args:
+            pressure (array_like): Pressures in kilopascals (kPa).
+            T (array_like, optional): Temperatures in degrees Celsius (°C). Defaults to None.
+            x (array_like, optional): Qualities. Defaults to None.
+            v (array_like, optional): Specific volumes in m^3/kg. Defaults to None.
+            h (array_like, optional): Specific enthalpies in kJ/kg. Defaults to None.
+            s (array_like, optional): Specific entropies in kJ/(kg*K). Defaults to None.
+            name (str, optional): A useful identifier for the batch. Defaults to None.
+            backend (str or object, optional): The property backend, 'table', 'spline' or 'if97' (see BACKENDS).
+                Defaults to None (DEFAULT_BACKEND).
+
+        Raises:
+            ValueError: If not exactly one of T, x, v, h or s is given.
+        """
+        given = {k: val for k, val in zip(self.PROPERTIES, (T, x, v, h, s)) if val is not None}
+        if len(given) != 1:
+            raise ValueError('SteamStateArray needs pressure and exactly one of T, x, v, h or s')
+        (self.given, value), = given.items()
+        self.p, value = (np.array(a, dtype=float) for a in np.broadcast_arrays(pressure, value))
+        for k in self.PROPERTIES:
+            setattr(self, k, np.full(self.p.shape, np.nan))
+        setattr(self, self.given, value)
+        self.region_code = np.zeros(self.p.shape, dtype=np.int8)
+        self.name = name
+        self.backend = get_backend(backend)
+        self.calc()
+
+    @classmethod
+    def from_properties(cls, pressure, T, x, v, h, s, region_code, name=None, backend=None):
+        """
+        Builds a batch from properties that are already known, without any table lookups.
+
+        Args:
+            pressure, T, x, v, h, s (array_like): The properties, in the units of the attributes; broadcast
+                against each other.
+            region_code (int or array_like): The region code of every element.
+            name (str, optional): A useful identifier for the batch. Defaults to None.
+            backend (str or object, optional): The property backend. Defaults to None (DEFAULT_BACKEND).
+
+        Returns:
+            SteamStateArray: The batch.
+        """
+        self = cls.__new__(cls)
+        arrays = np.broadcast_arrays(pressure, T, x, v, h, s, region_code)
+        self.p, self.T, self.x, self.v, self.h, self.s = (np.array(a, dtype=float) for a in arrays[:-1])
+        self.region_code = np.array(arrays[-1], dtype=np.int8)
+        self.given = None
+        self.name = name
+        self.backend = get_backend(backend)
+        return self
+
+    def calc(self):
+        """
+        Calculates the remaining properties of every element from the pressure and the given property.
+        """
+        Tsat, hf, hg, sf, sg, vf, vg = self.backend.saturation(self.p)
+        if self.given == 'T':
+            sup = self.T > Tsat
+            self._set_superheated(sup, *self.backend.superheated(self.p[sup], 'T', self.T[sup]))
+            return
+        if self.given == 'x':
+            self.x = np.where((self.x >= 0) & (self.x <= 1), self.x, np.nan)
+        else:
+            # the given property fixes the quality along the isobar; 0 <= x <= 1 means two-phase
+            f, g = {'v': (vf, vg), 'h': (hf, hg), 's': (sf, sg)}[self.given]
+            x = (getattr(self, self.given) - f) / (g - f)
+            self.x = np.where((x >= 0) & (x <= 1), x, np.nan)
+            sup = x > 1
+            if self.given == 'v':
+                # invert the ideal gas approximation for temperature, then look up h and s
+                T = self.v[sup] * self.p[sup] * 1000 / SuperheatedTable.R - 273.15
+                h, s, v = self.backend.superheated(self.p[sup], 'T', T)
+                self._set_superheated(sup, h, s, self.v[sup], T)
+            elif self.given == 'h':
+                T, s, v = self.backend.superheated(self.p[sup], 'h', self.h[sup])
+                self._set_superheated(sup, self.h[sup], s, v, T)
+            else:
+                T, h, v = self.backend.superheated(self.p[sup], 's', self.s[sup])
+                self._set_superheated(sup, h, self.s[sup], v, T)
+        sat = ~np.isnan(self.x)
+        self.region_code[sat] = self.SATURATED
+        x = self.x[sat]
+        self.T[sat] = Tsat[sat]
+        for k, f, g in (('h', hf, hg), ('s', sf, sg), ('v', vf, vg)):
+            getattr(self, k)[sat] = f[sat] + x * (g[sat] - f[sat])
+
+    def _set_superheated(self, mask, h, s, v, T=None):
+        """
+        Stores superheated properties for the elements selected by mask.
+        """
+        self.region_code[mask] = np.where(np.isnan(h) | np.isnan(s), self.UNKNOWN, self.SUPERHEATED)
+        self.h[mask], self.s[mask], self.v[mask] = h, s, v
+        if T is not None:
+            self.T[mask] = T
+
+    @property
+    def region(self):
+        """
+        The region name of every element.
+
+        Returns:
+            ndarray: Object array of 'Saturated', 'Superheated' or None.
+        """
+        return np.array(self.REGION_NAMES, dtype=object)[self.region_code]
+
+    def __len__(self):
+        return len(self.p)
+
+    def to_columns(self, prefix=''):
+        """
+        Returns the properties as flat columns, one element per state.
+
+        Args:
+            prefix (str, optional): Prepended to every column name (e.g., 'state1_'). Defaults to ''.
+
+        Returns:
+            dict: p, T, x, v, h and s as float arrays and region as the int8 region codes (see REGION_NAMES).
+        """
+        columns = {prefix + k: getattr(self, k).ravel() for k in ('p',) + self.PROPERTIES}
+        columns[prefix + 'region'] = self.region_code.ravel()
+        return columns
+
+    def to_records(self):
+        """
+        Returns the states as a NumPy record array in the shape of the batch.
+
+        Returns:
+            np.recarray: Fields p, T, x, v, h, s (float) and region (the region name, '' where unknown).
+        """
+        records = np.rec.array(np.empty(self.p.shape, dtype=[(k, 'f8') for k in ('p',) + self.PROPERTIES] +
+                                                             [('region', 'U17')]))
+        for k in ('p',) + self.PROPERTIES:
+            records[k] = getattr(self, k)
+        records['region'] = np.array([''] + list(self.REGION_NAMES[1:]))[self.region_code]
+        return records
+
+    def __getitem__(self, i):
+        """
+        Returns element i as a steam object (no table lookups are repeated).
+
+        Args:
+            i (int): Index of the element.
+
+        Returns:
+            steam: The state of element i.
+        """
+        st = steam(float(self.p[i]), name=self.name, backend=self.backend)
+        for k in self.PROPERTIES:
+            val = float(getattr(self, k)[i])
+            setattr(st, k, None if np.isnan(val) else val)
+        st.region = self.REGION_NAMES[self.region_code[i]]
+        return st
+
+class SteamState(namedtuple('SteamState', ('p', 'T', 'x', 'v', 'h', 's', 'region', 'name'))):
+    """
+    An immutable snapshot of a steam state, as returned by cached_steam.
+
+    The fields have the same meaning and units as the attributes of the steam class.  Being a tuple, a
+    snapshot cannot be modified, so a state shared through the cache cannot be corrupted by a caller.
+    Use _replace to derive a modified copy.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_steam(cls, st):
+        """
+        Takes a snapshot of a steam object.
+
+        Args:
+            st (steam): The steam object.
+
+        Returns:
+            SteamState: The snapshot.
+        """
+        return cls(st.p, st.T, st.x, st.v, st.h, st.s, st.region, st.name)
+
+    print = steam.print
+    to_dict = steam.to_dict
+
+class SteamCache:
+    """
+    A bounded least-recently-used cache of steam state snapshots.
+
+    States are keyed on (pressure, given property, value, table version, backend name), so reloading or
+    invalidating the steam tables never returns a state computed from the old tables.
+
+    Attributes:
+        maxsize (int): The largest number of states kept.  The least recently used state is evicted first.
+        enabled (bool): When False every lookup computes a new state and nothing is stored.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that computed a new state.
+
+    Methods:
+        get: Returns the snapshot for a state, computing it on a miss.
+        clear: Empties the cache and resets the counters.
+        info: Returns the counters and current size.
+    """
+    def __init__(self, maxsize=1024, enabled=True):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int, optional): The largest number of states kept. Defaults to 1024.
+            enabled (bool, optional): Whether states are cached. Defaults to True.
+        """
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._states = OrderedDict()
+
+    def get(self, pressure, given, value, backend=None):
+        """
+        Returns the snapshot for a state, computing it on a miss.
+
+        Args:
+            pressure (float): The pressure in kPa.
+            given (str): The second property: 'T', 'x', 'v', 'h' or 's'.
+            value (float): The value of the second property.
+            backend (str or object, optional): The property backend. Defaults to None (DEFAULT_BACKEND).
+
+        Returns:
+            SteamState: The (unnamed) snapshot.
+        """
+        backend = get_backend(backend)
+        if not self.enabled:
+            return SteamState.from_steam(steam(pressure, **{given: value}, backend=backend))
+        key = (float(pressure), given, float(value), TABLES.version, backend.name)
+        state = self._states.get(key)
+        if state is not None:
+            self.hits += 1
+            self._states.move_to_end(key)
+            return state
+        self.misses += 1
+        state = SteamState.from_steam(steam(pressure, **{given: value}, backend=backend))
+        self._states[key] = state
+        while len(self._states) > self.maxsize:
+            self._states.popitem(last=False)
+        return state
+
+    def clear(self):
+        """
+        Empties the cache and resets the hit and miss counters.
+        """
+        self._states.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: hits, misses, size and maxsize.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._states), 'maxsize': self.maxsize}
+
+# The shared cache used by cached_steam.
+STEAM_CACHE = SteamCache()
+
+def cached_steam(pressure, T=None, x=None, v=None, h=None, s=None, name=None, backend=None):
+    """
+    Memoized counterpart of the steam constructor.
+
+    Takes the same arguments as steam, but returns an immutable SteamState snapshot shared through
+    STEAM_CACHE.  Resize the cache with STEAM_CACHE.maxsize or switch it off with STEAM_CACHE.enabled.
+
+    Args:
+        pressure (float): The pressure of the steam in kilopascals (kPa).
+        T, x, v, h, s (float, optional): Exactly one second property, as for steam.
+        name (str, optional): A useful identifier for the returned snapshot. Defaults to None.
+        backend (str or object, optional): The property backend. Defaults to None (DEFAULT_BACKEND).
+
+    Returns:
+        SteamState: The snapshot.
+
+    Raises:
+        ValueError: If not exactly one of T, x, v, h or s is given.
+    """
+    given = [(k, val) for k, val in zip(SteamStateArray.PROPERTIES, (T, x, v, h, s)) if val is not None]
+    if len(given) != 1:
+        raise ValueError('cached_steam needs pressure and exactly one of T, x, v, h or s')
+    state = STEAM_CACHE.get(pressure, *given[0], backend=backend)
+    return state if name is None else state._replace(name=name)
+
 def main():
     """
     Main function to demonstrate steam class usage.
@@ -0,0 +1,573 @@
+import os
+import struct
+import sys
+import threading
+import numpy as np
+from scipy.interpolate import CubicSpline, LinearNDInterpolator, PchipInterpolator
+
+# Default table files live next to this module so lookups do not depend on the working directory.
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+SAT_TABLE_FILE = os.path.join(TABLE_DIR, 'sat_water_table.txt')
+SUPERHEATED_TABLE_FILE = os.path.join(TABLE_DIR, 'superheated_water_table.txt')
+
+# Binary table layout: a fixed header followed by little-endian float64 columns, each column contiguous.
+BINARY_SUFFIX = '.bin'
+BINARY_MAGIC = b'STEAMTBL'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sIIQ8x')  # magic, format version, columns, rows, padding (32 bytes)
+
+class SteamTables:
+    """
+    A process-wide registry for the saturated and superheated steam tables.
+
+    The text tables are parsed once, lazily, the first time a property lookup needs them.  The parsed
+    columns are stored as read-only NumPy arrays so every steam object (and every rankine cycle) can share
+    them without copying.  Objects derived from the tables (interpolators, inverse tables, etc.) are cached
+    alongside the raw columns and are discarded whenever the tables are invalidated or reloaded.
+
+    Table files ending in BINARY_SUFFIX (see convert_table) are memory-mapped instead of parsed.
+
+    Attributes:
+        sat_file (str): Path of the saturated water table.
+        superheated_file (str): Path of the superheated water table.
+        version (int): Incremented every time the cache is invalidated, so it identifies the table contents
+            in use.  Useful as part of a cache key.
+
+    Methods:
+        saturated: Returns the saturated table columns.
+        superheated: Returns the superheated table columns.
+        derived: Returns (building on first use) an object computed from the tables.
+        load: Points the registry at alternative table files.
+        invalidate: Drops every cached array so the files are re-read on next use.
+        refresh: Invalidates the cache only if a table file changed on disk.
+    """
+    def __init__(self, sat_file=SAT_TABLE_FILE, superheated_file=SUPERHEATED_TABLE_FILE):
+        """
+        Initializes an (unloaded) steam table registry.
+
+        Args:
+            sat_file (str, optional): Path of the saturated water table. Defaults to SAT_TABLE_FILE.
+            superheated_file (str, optional): Path of the superheated water table.
+                Defaults to SUPERHEATED_TABLE_FILE.
+        """
+        self.sat_file = sat_file
+        self.superheated_file = superheated_file
+        self.version = 0
+        self._lock = threading.RLock()
+        self._sat = None  # tuple of columns: ts, ps, hfs, hgs, sfs, sgs, vfs, vgs
+        self._superheated = None  # tuple of columns: tcol, hcol, scol, pcol
+        self._derived = {}  # interpolators and other objects built from the columns
+        self._stamps = {}  # file name -> (mtime, size) at the time it was parsed
+
+    def saturated(self):
+        """
+        Returns the saturated table as read-only columns.
+
+        Returns:
+            tuple: (ts, ps, hfs, hgs, sfs, sgs, vfs, vgs) with T in °C and p in bar.
+        """
+        if self._sat is None:
+            with self._lock:
+                if self._sat is None:
+                    self._sat = self._read(self.sat_file)
+        return self._sat
+
+    def superheated(self):
+        """
+        Returns the superheated table as read-only columns.
+
+        Returns:
+            tuple: (tcol, hcol, scol, pcol) with T in °C and p in kPa.
+        """
+        if self._superheated is None:
+            with self._lock:
+                if self._superheated is None:
+                    self._superheated = self._read(self.superheated_file)
+        return self._superheated
+
+    def derived(self, key, builder):
+        """
+        Returns an object computed from the tables, building it on first use.
+
+        Args:
+            key (str): Name of the cached object.
+            builder (callable): Called with this registry to build the object when it is not cached.
+
+        Returns:
+            object: The cached object.
+        """
+        obj = self._derived.get(key)
+        if obj is None:
+            with self._lock:
+                obj = self._derived.get(key)
+                if obj is None:
+                    obj = builder(self)
+                    self._derived[key] = obj
+        return obj
+
+    def load(self, sat_file=None, superheated_file=None):
+        """
+        Points the registry at alternative table files.  The files are parsed lazily on next use.
+
+        Args:
+            sat_file (str, optional): New saturated table file. Defaults to None (keep current file).
+            superheated_file (str, optional): New superheated table file. Defaults to None (keep current file).
+        """
+        with self._lock:
+            if sat_file is not None:
+                self.sat_file = sat_file
+            if superheated_file is not None:
+                self.superheated_file = superheated_file
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Drops the cached columns and everything derived from them.
+        """
+        with self._lock:
+            self.version += 1
+            self._sat = None
+            self._superheated = None
+            self._derived = {}
+            self._stamps = {}
+
+    def refresh(self):
+        """
+        Invalidates the cache if either table file changed on disk since it was parsed.
+
+        Returns:
+            bool: True if the cache was invalidated.
+        """
+        with self._lock:
+            for filename, stamp in self._stamps.items():
+                if self._stamp(filename) != stamp:
+                    self.invalidate()
+                    return True
+        return False
+
+    def _read(self, filename):
+        """
+        Reads a table into read-only columns.  Binary tables are memory-mapped; anything else is parsed as a
+        whitespace delimited text table with one header row.
+        """
+        self._stamps[filename] = self._stamp(filename)
+        if filename.endswith(BINARY_SUFFIX):
+            return read_binary_table(filename)
+        cols = tuple(np.ascontiguousarray(c) for c in np.loadtxt(filename, skiprows=1, unpack=True))
+        for c in cols:
+            c.flags.writeable = False
+        return cols
+
+    @staticmethod
+    def _stamp(filename):
+        """
+        Returns a (modification time, size) pair used to detect changes to a table file.
+        """
+        st = os.stat(filename)
+        return st.st_mtime_ns, st.st_size
+
+def write_binary_table(cols, filename):
+    """
+    Writes table columns in the binary layout read by read_binary_table.
+
+    Args:
+        cols (sequence of ndarray): The table columns, all of the same length.
+        filename (str): The output file.
+    """
+    data = np.ascontiguousarray(np.vstack(cols), dtype='<f8')
+    with open(filename, 'wb') as f:
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, data.shape[0], data.shape[1]))
+        data.tofile(f)
+
+def read_binary_table(filename):
+    """
+    Memory-maps a binary table.  Nothing is parsed; the pages are read on demand by the operating system.
+
+    Args:
+        filename (str): The binary table file.
+
+    Returns:
+        tuple: Read-only ndarray views, one per column.
+
+    Raises:
+        ValueError: If the file is not a binary steam table of a supported version.
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(BINARY_HEADER.size)
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError(f'{filename} is not a binary steam table')
+    magic, version, ncols, nrows = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f'{filename} is not a binary steam table')
+    if version != BINARY_VERSION:
+        raise ValueError(f'{filename} has binary table version {version}, expected {BINARY_VERSION}')
+    data = np.memmap(filename, dtype='<f8', mode='r', offset=BINARY_HEADER.size, shape=(ncols, nrows))
+    return tuple(data)
+
+def convert_table(filename, out_file=None):
+    """
+    Converts a whitespace delimited text table (one header row) to the binary layout.
+
+    Args:
+        filename (str): The text table.
+        out_file (str, optional): The binary file to write. Defaults to None (filename with BINARY_SUFFIX).
+
+    Returns:
+        str: The binary file written.
+    """
+    if out_file is None:
+        out_file = os.path.splitext(filename)[0] + BINARY_SUFFIX
+    write_binary_table(np.loadtxt(filename, skiprows=1, unpack=True), out_file)
+    return out_file
+
+class SaturationLine:
+    """
+    Linear interpolator along the saturation line, built once from the saturated table.
+
+    The pressure column is sorted once and the seven saturation properties are stacked into a single
+    array, so one searchsorted call returns Tsat, hf, hg, sf, sg, vf and vg together.  Pressures outside
+    the table return nan, the same as griddata did.
+
+    Attributes:
+        p (ndarray): Sorted saturation pressures in kPa.
+        props (ndarray): Saturation properties, one row per pressure, in PROPERTIES order.
+    """
+    PROPERTIES = ('Tsat', 'hf', 'hg', 'sf', 'sg', 'vf', 'vg')
+
+    def __init__(self, p, props):
+        """
+        Initializes the saturation line.
+
+        Args:
+            p (ndarray): Saturation pressures in kPa.
+            props (ndarray): Properties at each pressure, shape (len(p), 7), in PROPERTIES order.
+        """
+        order = np.argsort(p)
+        self.p = np.ascontiguousarray(p[order])
+        self.props = np.ascontiguousarray(props[order])
+        self.dprops = np.diff(self.props, axis=0) / np.diff(self.p)[:, None]  # slope of each segment
+
+    @classmethod
+    def from_tables(cls, tables):
+        """
+        Builds the saturation line from a SteamTables registry.
+
+        Args:
+            tables (SteamTables): The table registry.
+
+        Returns:
+            SaturationLine: The interpolator.
+        """
+        ts, ps, hfs, hgs, sfs, sgs, vfs, vgs = tables.saturated()
+        return cls(ps * 100, np.column_stack((ts, hfs, hgs, sfs, sgs, vfs, vgs)))  # bar -> kPa
+
+    def __call__(self, p):
+        """
+        Interpolates all saturation properties at once.
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+
+        Returns:
+            ndarray: Shape (7,) + shape of p, unpackable as Tsat, hf, hg, sf, sg, vf, vg.
+        """
+        p = np.asarray(p, dtype=float)
+        i = np.clip(np.searchsorted(self.p, p, side='right') - 1, 0, len(self.p) - 2)
+        out = self.props[i] + (p - self.p[i])[..., None] * self.dprops[i]
+        out[(p < self.p[0]) | (p > self.p[-1]) | np.isnan(p)] = np.nan
+        return np.moveaxis(out, -1, 0)
+
+def saturation_line(tables=None):
+    """
+    Returns the shared saturation line interpolator, building it on first use.
+
+    Args:
+        tables (SteamTables, optional): The table registry. Defaults to None (use TABLES).
+
+    Returns:
+        SaturationLine: The interpolator.
+    """
+    return (tables or TABLES).derived('saturation_line', SaturationLine.from_tables)
+
+class SplineSaturationLine:
+    """
+    Piecewise cubic interpolator along the saturation line.
+
+    Splines through the rows of the saturated table reach, with the current file, an accuracy that linear
+    interpolation only reaches with a much denser table.  The splines are fit in ln p, and vg is fit as ln vg
+    because it spans five decades.  The piecewise polynomial coefficients are computed once and cached on disk
+    next to the table (see spline_cache_file), and each evaluation is a searchsorted plus a cubic Horner step.
+    Pressures outside the table return nan.
+
+    Attributes:
+        method (str): 'pchip' (monotone, no overshoot) or 'cubic' (not-a-knot cubic spline).
+        lnp (ndarray): Breakpoints, ln of the sorted saturation pressures in kPa.
+        coefs (ndarray): Polynomial coefficients, shape (4, len(lnp) - 1, 7), highest power first.
+    """
+    METHODS = {'pchip': PchipInterpolator, 'cubic': CubicSpline}
+    LOG_COLUMNS = (6,)  # vg
+
+    def __init__(self, lnp, coefs, method='pchip'):
+        """
+        Initializes the spline saturation line from precomputed coefficients.
+
+        Args:
+            lnp (ndarray): Breakpoints, ln of the sorted saturation pressures in kPa.
+            coefs (ndarray): Polynomial coefficients, shape (4, len(lnp) - 1, 7), highest power first.
+            method (str, optional): The spline method the coefficients came from. Defaults to 'pchip'.
+        """
+        self.method = method
+        self.lnp = np.ascontiguousarray(lnp)
+        self.coefs = np.ascontiguousarray(coefs)
+
+    @classmethod
+    def fit(cls, p, props, method='pchip'):
+        """
+        Fits the spline coefficients.
+
+        Args:
+            p (ndarray): Saturation pressures in kPa.
+            props (ndarray): Properties at each pressure, shape (len(p), 7), in SaturationLine.PROPERTIES order.
+            method (str, optional): 'pchip' or 'cubic'. Defaults to 'pchip'.
+
+        Returns:
+            SplineSaturationLine: The interpolator.
+        """
+        order = np.argsort(p)
+        props = np.array(props[order], dtype=float)
+        props[:, cls.LOG_COLUMNS] = np.log(props[:, cls.LOG_COLUMNS])
+        spline = cls.METHODS[method](np.log(p[order]), props, axis=0)
+        return cls(spline.x, spline.c, method)
+
+    @classmethod
+    def from_tables(cls, tables, method='pchip'):
+        """
+        Loads the spline coefficients cached beside the saturated table, fitting and caching them if the cache
+        is missing or older than the table.
+
+        Args:
+            tables (SteamTables): The table registry.
+            method (str, optional): 'pchip' or 'cubic'. Defaults to 'pchip'.
+
+        Returns:
+            SplineSaturationLine: The interpolator.
+        """
+        cache_file = spline_cache_file(tables.sat_file, method)
+        stamp = np.array(SteamTables._stamp(tables.sat_file))
+        try:
+            with np.load(cache_file) as cached:
+                if np.array_equal(cached['stamp'], stamp):
+                    return cls(cached['lnp'], cached['coefs'], method)
+        except (OSError, KeyError, ValueError):
+            pass  # no usable cache, fit below
+        ts, ps, hfs, hgs, sfs, sgs, vfs, vgs = tables.saturated()
+        spline = cls.fit(ps * 100, np.column_stack((ts, hfs, hgs, sfs, sgs, vfs, vgs)), method)  # bar -> kPa
+        try:
+            np.savez(cache_file, lnp=spline.lnp, coefs=spline.coefs, stamp=stamp)
+        except OSError:
+            pass  # read-only table directory; the coefficients are still cached in memory
+        return spline
+
+    def __call__(self, p):
+        """
+        Interpolates all saturation properties at once.
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+
+        Returns:
+            ndarray: Shape (7,) + shape of p, unpackable as Tsat, hf, hg, sf, sg, vf, vg.
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lnp = np.log(np.asarray(p, dtype=float))
+        i = np.clip(np.searchsorted(self.lnp, lnp, side='right') - 1, 0, len(self.lnp) - 2)
+        dx = (lnp - self.lnp[i])[..., None]
+        c = self.coefs[:, i]
+        out = ((c[0] * dx + c[1]) * dx + c[2]) * dx + c[3]
+        out[..., self.LOG_COLUMNS] = np.exp(out[..., self.LOG_COLUMNS])
+        out[(lnp < self.lnp[0]) | (lnp > self.lnp[-1]) | np.isnan(lnp)] = np.nan
+        return np.moveaxis(out, -1, 0)
+
+def spline_cache_file(sat_file, method='pchip'):
+    """
+    Returns the file the spline coefficients of a saturated table are cached in.
+
+    Args:
+        sat_file (str): The saturated table file.
+        method (str, optional): The spline method. Defaults to 'pchip'.
+
+    Returns:
+        str: The cache file, beside the table.
+    """
+    return os.path.splitext(sat_file)[0] + f'.{method}-spline.npz'
+
+def spline_saturation_line(tables=None, method='pchip'):
+    """
+    Returns the shared spline saturation line, loading or fitting it on first use.
+
+    Args:
+        tables (SteamTables, optional): The table registry. Defaults to None (use TABLES).
+        method (str, optional): 'pchip' or 'cubic'. Defaults to 'pchip'.
+
+    Returns:
+        SplineSaturationLine: The interpolator.
+    """
+    return (tables or TABLES).derived('spline_saturation_line_' + method,
+                                      lambda t: SplineSaturationLine.from_tables(t, method))
+
+class SuperheatedTable:
+    """
+    Interpolator for the superheated region, built once from the scattered (p, T) superheated table.
+
+    The table points are triangulated a single time in (ln p, given property) coordinates, with the axes
+    rescaled, and the other two of T, h and s are interpolated together from that triangulation.  With
+    given='T' this is the forward lookup; given='h' or given='s' gives inverse tables, so (p, h) and (p, s)
+    states are answered by interpolation instead of an iterative solve.  This works because h and s both
+    increase with T along every isobar.  Specific volume uses the same ideal gas approximation as
+    steam.calc().  Points outside the table return nan, as griddata did.
+
+    Attributes:
+        given (str): The property paired with pressure: 'T', 'h' or 's'.
+        outputs (tuple): The two interpolated properties, in the order they are returned.
+        interp (LinearNDInterpolator): Linear interpolator of the outputs over the triangulated table.
+    """
+    PROPERTIES = ('T', 'h', 's')
+    R = 8.314 / (18 / 1000)  # Specific gas constant for steam, J/(kg K)
+
+    def __init__(self, p, T, h, s, given='T'):
+        """
+        Initializes the superheated table interpolator.
+
+        Args:
+            p (ndarray): Pressure of each table point in kPa.
+            T (ndarray): Temperature of each table point in °C.
+            h (ndarray): Specific enthalpy of each table point in kJ/kg.
+            s (ndarray): Specific entropy of each table point in kJ/(kg K).
+            given (str, optional): The property paired with pressure: 'T', 'h' or 's'. Defaults to 'T'.
+        """
+        cols = dict(zip(self.PROPERTIES, (T, h, s)))
+        self.given = given
+        self.outputs = tuple(k for k in self.PROPERTIES if k != given)
+        # properties vary roughly with ln p across the four decades of pressure in the table
+        self.interp = LinearNDInterpolator(np.column_stack((np.log(p), cols[given])),
+                                           np.column_stack([cols[k] for k in self.outputs]), rescale=True)
+
+    @classmethod
+    def from_tables(cls, tables, given='T'):
+        """
+        Builds the superheated interpolator from a SteamTables registry.
+
+        Args:
+            tables (SteamTables): The table registry.
+            given (str, optional): The property paired with pressure: 'T', 'h' or 's'. Defaults to 'T'.
+
+        Returns:
+            SuperheatedTable: The interpolator.
+        """
+        tcol, hcol, scol, pcol = tables.superheated()
+        return cls(pcol, tcol, hcol, scol, given)
+
+    def __call__(self, p, value):
+        """
+        Interpolates the superheated properties at (p, value).
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+            value (float or ndarray): The given property (T in °C, h in kJ/kg or s in kJ/(kg K)),
+                broadcast against p.
+
+        Returns:
+            ndarray: Shape (3,) + broadcast shape of p and value, unpackable as (h, s, v) for given='T',
+                (T, s, v) for given='h' and (T, h, v) for given='s'.
+        """
+        p, value = np.broadcast_arrays(np.asarray(p, dtype=float), np.asarray(value, dtype=float))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = np.moveaxis(self.interp(np.log(p), value), -1, 0)
+        T = value if self.given == 'T' else out[0]
+        v = self.R * (T + 273.15) / (p * 1000)  # ideal gas approximation for volume
+        return np.concatenate((out, v[None]))
+
+def superheated_table(tables=None, given='T'):
+    """
+    Returns a shared superheated region interpolator, building it on first use.
+
+    Args:
+        tables (SteamTables, optional): The table registry. Defaults to None (use TABLES).
+        given (str, optional): The property paired with pressure: 'T' for the forward table, 'h' or 's'
+            for the inverse tables. Defaults to 'T'.
+
+    Returns:
+        SuperheatedTable: The interpolator.
+    """
+    return (tables or TABLES).derived('superheated_table_' + given,
+                                      lambda t: SuperheatedTable.from_tables(t, given))
+
+class TableBackend:
+    """
+    Steam property backend that interpolates the steam tables.
+
+    A property backend answers two questions for steam and SteamStateArray: the saturation properties at a
+    pressure, and the superheated properties at a pressure and one other property.  This one uses the shared
+    SaturationLine (or SplineSaturationLine) and SuperheatedTable interpolators; if97.IF97Backend evaluates
+    closed-form equations instead.
+
+    Attributes:
+        name (str): The backend name.
+        tables (SteamTables): The table registry used, or None for TABLES.
+        saturation_model (str): 'linear', or a SplineSaturationLine method ('pchip' or 'cubic').
+    """
+    def __init__(self, tables=None, saturation_model='linear', name='table'):
+        """
+        Initializes the backend.
+
+        Args:
+            tables (SteamTables, optional): The table registry. Defaults to None (use TABLES).
+            saturation_model (str, optional): 'linear', 'pchip' or 'cubic'. Defaults to 'linear'.
+            name (str, optional): The backend name. Defaults to 'table'.
+        """
+        self.tables = tables
+        self.saturation_model = saturation_model
+        self.name = name
+
+    def saturation(self, p):
+        """
+        Saturation properties at pressure p.
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+
+        Returns:
+            ndarray: Shape (7,) + shape of p, unpackable as Tsat, hf, hg, sf, sg, vf, vg.
+        """
+        if self.saturation_model == 'linear':
+            return saturation_line(self.tables)(p)
+        return spline_saturation_line(self.tables, self.saturation_model)(p)
+
+    def superheated(self, p, given, value):
+        """
+        Superheated properties at pressure p and one other property.
+
+        Args:
+            p (float or ndarray): Pressure(s) in kPa.
+            given (str): The property paired with pressure: 'T', 'h' or 's'.
+            value (float or ndarray): The given property, broadcast against p.
+
+        Returns:
+            ndarray: Shape (3,) + broadcast shape, unpackable as (h, s, v) for given='T', (T, s, v) for
+                given='h' and (T, h, v) for given='s'.
+        """
+        return superheated_table(self.tables, given)(p, value)
+
+# The shared registry used by steam and rankine.
+TABLES = SteamTables()
+
+def main():
+    """
+    Converts text steam tables to the binary layout.  With no arguments the two default tables are converted;
+    otherwise each argument is converted to a binary file beside it.
+    """
+    for filename in sys.argv[1:] or (SAT_TABLE_FILE, SUPERHEATED_TABLE_FILE):
+        print(f'{filename} -> {convert_table(filename)}')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import numpy as np
+import HW6_2_OOP
+import Pipe_Nodes
+from cycle_basis import fundamental_cycles, cycle_nodes
+
+def incidence(edges, cycles):
+    """
+    Node and loop incidence matrices of a network and a set of its cycles.
+    """
+    nodes = {n: k for k, n in enumerate(dict.fromkeys(n for e in edges for n in e))}
+    B = np.zeros((len(nodes), len(edges)))
+    for k, (a, b) in enumerate(edges):
+        B[nodes[a], k] -= 1
+        B[nodes[b], k] += 1
+    C = np.zeros((len(cycles), len(edges)))
+    for l, cycle in enumerate(cycles):
+        for k, s in cycle:
+            C[l, k] += s
+    return B, C
+
+def test_fundamental_cycles():
+    """
+    The cycles of a grid with a parallel edge, a self loop and a second part are closed, independent and as many
+    as E - N + C.
+    """
+    edges = [((i, j), (i + 1, j)) for i in range(5) for j in range(6)] + \
+            [((i, j), (i, j + 1)) for i in range(6) for j in range(5)]
+    edges += [((0, 0), (1, 0)), ((2, 2), (2, 2)), ('x', 'y'), ('y', 'z'), ('z', 'x')]
+    cycles = fundamental_cycles(edges)
+    B, C = incidence(edges, cycles)
+    assert len(cycles) == len(edges) - B.shape[0] + 2
+    assert np.all(B @ C.T == 0)  # every cycle closes
+    assert np.linalg.matrix_rank(C) == len(cycles)
+    for cycle in cycles:
+        assert cycle[0][1] == 1
+        nodes = cycle_nodes(edges, cycle)
+        ends = [edges[k][1] if s > 0 else edges[k][0] for k, s in cycle]
+        assert ends == nodes[1:] + nodes[:1]  # each element ends where the next starts
+
+def test_pipe_network_loops():
+    """
+    Both pipe networks find the independent loops of the homework network themselves.
+    """
+    names = ['a-b', 'a-c', 'b-e', 'c-d', 'c-f', 'd-e', 'd-g', 'e-h', 'f-g', 'g-h']
+    PN = HW6_2_OOP.PipeNetwork(Pipes=[HW6_2_OOP.Pipe(*n.split('-')) for n in names], Loops=[], Nodes=[])
+    PN.buildLoops()
+    PN2 = Pipe_Nodes.PipeNetwork()
+    for n in names:
+        PN2.add_pipe(Pipe_Nodes.Pipe(*n.split('-')))
+    PN2.add_loops_from_pipes()
+    for loops in (PN.loops, PN2.loops):
+        assert len(loops) == 3  # 10 pipes, 8 nodes
+        for L in loops:
+            # traversing the pipes in order from the start node of the first returns to it
+            node = L.pipes[0].startNode
+            for p in L.pipes:
+                assert node in (p.startNode, p.endNode)
+                node = p.endNode if node != p.endNode else p.startNode
+            assert node == L.pipes[0].startNode
@@ -1,4 +1,16 @@
-from rankine import rankine
+import csv
+import json
+import numpy as np
+import pytest
+import if97
+from bench_rankine import bench_rankine, compare, load_baseline
+from cycle_graph import Component, simple_cycle, reheat_cycle, regenerative_cycle
+from rankine import rankine, RankineSweep, PerformanceMap
+from rankine_optimize import optimize_rankine, objective_values, turbine_exit_quality
+from rankine_parallel import flatten_sweep, parallel_sweep
+from rankine_results import export, read_columnar
+from rankine_stream import stream_rankine
+from steam import SteamStateArray
 
 def test_rankine_cycle():
     """
@@ -26,5 +38,237 @@ def test_rankine_cycle():
     superheated_rankine = rankine(p_low=8, p_high=8000, t_high=superheated_temp, name="Superheated Rankine Cycle")
     superheated_rankine.print_summary()
 
+def test_pump_model():
+    """
+    Test function for the compressed liquid pump model.
+
+    The pump work should be v*(p_high - p_low) in kJ/kg, and agree with isentropic compression of the table's pump
+    inlet state evaluated with the IF97 compressed liquid equations (region 1).
+    """
+    cycle = rankine(p_low=8, p_high=8000)
+    assert np.isclose(cycle.pump_work, cycle.state3.v * (8000 - 8))
+    assert cycle.state4.region == 'Compressed Liquid' and cycle.state4.s == cycle.state3.s
+
+    p_low, p_high = np.array([8.0, 20.0, 100.0]), np.array([4000.0, 8000.0, 15000.0])
+    sweep = RankineSweep(p_low, p_high, 500)
+    assert (sweep.state4.region == 'Compressed Liquid').all()
+    T3 = sweep.state3.T + 273.15
+    h3, s3, _, _ = if97.region1(p_low / 1000, T3)
+    low, high = T3 - 5, T3 + 5  # bisect for the temperature with the inlet entropy at p_high
+    for _ in range(60):
+        mid = (low + high) / 2
+        below = if97.region1(p_high / 1000, mid)[1] < s3
+        low, high = np.where(below, mid, low), np.where(below, high, mid)
+    h4 = if97.region1(p_high / 1000, low)[0]
+    assert np.allclose(sweep.pump_work, h4 - h3, rtol=5e-3)
+
+    real = rankine(p_low=8, p_high=8000, pump_efficiency=0.8)
+    assert real.state4.T > cycle.state4.T and real.state4.s > cycle.state4.s
+
+def test_rankine_incremental_update():
+    """
+    Test function for incremental Rankine recomputation.
+
+    Changing t_high should recompute only the turbine states, and the result should match a fresh rankine object.
+    """
+    cycle = rankine(p_low=8, p_high=8000, t_high=500)
+    state3, state4 = cycle.state3, cycle.state4
+    cycle.t_high = 600
+    assert cycle.state3 is state3 and cycle.state4 is state4
+    fresh = rankine(p_low=8, p_high=8000, t_high=600)
+    assert np.isclose(cycle.efficiency, fresh.efficiency) and np.isclose(cycle.state2.h, fresh.state2.h)
+    assert cycle.update(t_high=600) == []
+    assert cycle.update(p_low=20, p_high=4000) == ['state1', 'state2', 'state3', 'state4']
+    assert np.isclose(cycle.efficiency, rankine(p_low=20, p_high=4000, t_high=600).efficiency)
+    with pytest.raises(TypeError):
+        cycle.update(p_low=8, bogus=1)
+    assert cycle.p_low == 20 and cycle.state3.p == 20
+
+def test_component_efficiencies():
+    """
+    Test function for turbine and pump isentropic efficiencies and performance maps.
+
+    The actual turbine work should be the isentropic work times the efficiency, and an off-design sweep over load
+    fractions should match rankine and cycle graph objects built point by point.
+    """
+    ideal = rankine(p_low=8, p_high=8000, t_high=500)
+    real = rankine(p_low=8, p_high=8000, t_high=500, turbine_efficiency=0.85, pump_efficiency=0.8)
+    assert np.isclose(real.turbine_work, 0.85 * ideal.turbine_work)
+    assert np.isclose(real.pump_work, ideal.pump_work / 0.8)
+    assert real.state2s.h == ideal.state2.h and real.state2.s > ideal.state2.s
+
+    turbine_map = PerformanceMap([0.3, 0.7, 1.0, 1.1], [0.70, 0.84, 0.88, 0.86])
+    load = np.linspace(0.2, 1.2, 6)
+    sweep = RankineSweep(8, 8000 * np.clip(load, 0.3, 1.0), 500, turbine_efficiency=turbine_map(load),
+                         pump_efficiency=0.8)
+    cycles = simple_cycle(8, 8000 * np.clip(load, 0.3, 1.0), 500, turbine_efficiency=turbine_map(load),
+                          pump_efficiency=0.8)
+    for i, f in enumerate(load):
+        cycle = rankine(p_low=8, p_high=8000 * min(max(f, 0.3), 1.0), t_high=500,
+                        turbine_efficiency=float(turbine_map(f)), pump_efficiency=0.8)
+        assert np.isclose(sweep.efficiency[i], cycle.efficiency) and np.isclose(sweep.state2.T[i], cycle.state2.T)
+        assert np.isclose(cycles.efficiency[i], cycle.efficiency)
+    assert turbine_map(0.1) == 0.70 and turbine_map(2.0) == 0.86
+
+def test_rankine_sweep():
+    """
+    Test function for the vectorized Rankine sweep.
+
+    Every operating point of a grid sweep should match a rankine object built for that point.
+    """
+    p_low, p_high, t_high = [8, 20, 100], [4000, 8000], [450, 500, 600]
+    sweep = RankineSweep(p_low, p_high, t_high, grid=True)
+    assert sweep.efficiency.shape == (3, 2, 3)
+    for i, pl in enumerate(p_low):
+        for j, ph in enumerate(p_high):
+            for k, th in enumerate(t_high):
+                cycle = rankine(p_low=pl, p_high=ph, t_high=th)
+                assert np.isclose(sweep.efficiency[i, j, k], cycle.efficiency)
+                assert np.isclose(sweep.turbine_work[i, j, k], cycle.turbine_work)
+    saturated = RankineSweep(p_low, 8000)
+    assert np.isclose(saturated.efficiency[0], rankine(p_low=8, p_high=8000).efficiency)
+    saturated = RankineSweep(p_low, p_high, grid=True)  # no t_high axis for saturated vapor
+    assert saturated.efficiency.shape == (3, 2) and flatten_sweep(p_low, p_high, grid=True)[3] == (3, 2)
+    assert np.isclose(saturated.efficiency[1, 0], rankine(p_low=20, p_high=4000).efficiency)
+
+def test_parallel_sweep():
+    """
+    Test function for the process-pool Rankine sweep.
+
+    Sharding a sweep across workers should give the same results as the serial sweep and as rankine objects.
+    """
+    p_low, p_high, t_high = [8, 20, 100], [4000, 8000], [450, 500, 600]
+    results, stats = parallel_sweep(p_low, p_high, t_high, grid=True, chunk_size=5, max_workers=2)
+    serial = RankineSweep(p_low, p_high, t_high, grid=True)
+    assert np.allclose(results['efficiency'], serial.efficiency)
+    assert np.isclose(results['pump_work'][1, 0, 2], rankine(p_low=20, p_high=4000, t_high=600).pump_work)
+    assert sum(worker['points'] for worker in stats.values()) == 18
+    # off-design efficiencies varying over the sweep are sharded with it, also on the IF97 backend
+    turbine = np.linspace(0.7, 0.9, 3)
+    results, stats = parallel_sweep(p_low, p_high, t_high, grid=True, chunk_size=5, max_workers=2, backend='if97',
+                                    turbine_efficiency=turbine, pump_efficiency=0.8)
+    serial = RankineSweep(p_low, p_high, t_high, grid=True, backend='if97', turbine_efficiency=turbine,
+                          pump_efficiency=0.8)
+    assert np.allclose(results['efficiency'], serial.efficiency) and np.allclose(results['pump_work'], serial.pump_work)
+
+def test_stream_rankine(tmp_path):
+    """
+    Test function for streaming Rankine evaluation.
+
+    Rows streamed through in small batches should keep their input columns and match rankine objects; a row
+    without t_high is a saturated vapor cycle.
+    """
+    source, dest = tmp_path / 'telemetry.csv', tmp_path / 'results.csv'
+    source.write_text('timestamp,p_low,p_high,t_high\n1,8,8000,500\n2,20,4000,450\n3,100,8000,600\n4,8,8000,\n')
+    assert stream_rankine(str(source), str(dest), batch_size=2) == 4
+    rows = list(csv.DictReader(open(dest)))
+    assert [row['timestamp'] for row in rows] == ['1', '2', '3', '4']
+    for row in rows:
+        cycle = rankine(p_low=float(row['p_low']), p_high=float(row['p_high']),
+                        t_high=float(row['t_high']) if row['t_high'] else None)
+        assert np.isclose(float(row['efficiency']), cycle.efficiency)
+
+def test_optimize_rankine():
+    """
+    Test function for the Rankine cycle optimizer.
+
+    The batched search should find at least the best feasible cycle of a fine brute-force grid, with fewer
+    evaluations, and respect the turbine exit quality constraint.
+    """
+    for objective in ('efficiency', 'net_work'):
+        optimum = optimize_rankine({'p_high': (1000, 16000), 't_high': (400, 600)}, fixed={'p_low': 20},
+                                   objective=objective, min_quality=0.9)
+        brute = RankineSweep(20, np.geomspace(1000, 16000, 100), np.linspace(400, 600, 100), grid=True)
+        values = np.array(objective_values(brute, objective))
+        feasible = (turbine_exit_quality(brute) >= 0.9) & (brute.heat_added > 0) & \
+            (brute.turbine_work > brute.pump_work)
+        assert optimum.value >= values[feasible].max() - 1e-9
+        assert optimum.evaluations < brute.efficiency.size
+        if objective == 'efficiency':
+            assert np.isclose(optimum.cycle.efficiency, optimum.value)
+
+    # the quality constraint is active: a wetter exit at lower p_low would give more work
+    optimum = optimize_rankine({'p_low': (5, 100)}, fixed={'p_high': 1000, 't_high': 600}, objective='net_work',
+                               min_quality=0.99)
+    assert 0.99 <= optimum.cycle.state2.x < 0.9901
+
+def test_cycle_graph():
+    """
+    Test function for the cycle graph model.
+
+    The simple cycle graph should match RankineSweep, the open heater bleed fraction should satisfy the heater
+    energy balance, and a batched regenerative sweep should match point-by-point solutions.
+    """
+    p_low, t_high = np.array([8.0, 20.0]), np.array([500.0, 600.0])
+    simple = simple_cycle(p_low, 8000, t_high)
+    sweep = RankineSweep(p_low, 8000, t_high)
+    assert np.allclose(simple.efficiency, sweep.efficiency) and np.allclose(simple.pump_work, sweep.pump_work)
+
+    cycle = regenerative_cycle(10, [1200], 15000, 600)
+    h = {k: st.h for k, st in cycle.states.items()}
+    y = (h['liquid 0'] - h['feed 1']) / (h['bleed 0'] - h['feed 1'])
+    assert np.isclose(cycle.mass['bleed 0'], y) and np.isclose(cycle.mass['feed 1'], 1 - y)
+    turbine_work = h['steam 0'] - h['steam 1'] + (1 - y) * (h['steam 1'] - h['exhaust'])
+    assert np.isclose(cycle.turbine_work, turbine_work)
+
+    p_bleed, t_high = np.array([800.0, 1200.0, 2000.0]), np.array([[550.0], [600.0]])
+    for heaters in ('open', 'closed'):
+        batch = regenerative_cycle(10, [4000, p_bleed], 15000, t_high, heaters=heaters)
+        assert batch.efficiency.shape == (2, 3)
+        for i in range(2):
+            for j in range(3):
+                single = regenerative_cycle(10, [4000, p_bleed[j]], 15000, t_high[i, 0], heaters=heaters)
+                assert np.isclose(batch.efficiency[i, j], single.efficiency)
+                assert np.isclose(batch.mass['bleed 1'][i, j], single.mass['bleed 1'])
+    assert np.isfinite(reheat_cycle(8, 1000, 8000, 500, 500).efficiency)
+    # every state of a closed heater cycle is resolved, including the compressed liquid feedwater
+    closed = regenerative_cycle(10, [4000, 1200], 15000, 600, heaters='closed')
+    assert all((st.region_code != SteamStateArray.UNKNOWN).all() and np.isfinite(st.T).all() and
+               np.isfinite(st.s).all() for st in closed.states.values())
+    with pytest.raises(TypeError):
+        Component('mixer', ('a',), ('b',))  # abstract: every component computes its own outlets
+
+def test_results_export(tmp_path):
+    """
+    Test function for structured Rankine results.
+
+    A cycle should convert to a JSON-serializable dict, and a sweep exported as CSV, JSON lines and columnar binary
+    should read back with the same values.
+    """
+    cycle = rankine(p_low=8, p_high=8000, t_high=500)
+    out = json.loads(json.dumps(cycle.to_dict()))
+    assert out['efficiency'] == cycle.efficiency and out['states']['state2']['x'] == cycle.state2.x
+    assert out['states']['state1']['region'] == 'Superheated' and out['states']['state1']['x'] is None
+
+    sweep = RankineSweep([8, 20], [4000, 8000], [450, 500, 600], grid=True)
+    records = sweep.to_records()
+    assert len(records) == 12 and np.array_equal(records.efficiency, sweep.efficiency.ravel())
+    assert records.state3_p[7] == 20 and records.t_high[7] == 500
+    columns = sweep.to_columns()
+    for name in ('results.csv', 'results.jsonl', 'results.rcol'):
+        assert export(sweep, str(tmp_path / name)) == 12
+    binary = read_columnar(str(tmp_path / 'results.rcol'))
+    rows = list(csv.DictReader(open(tmp_path / 'results.csv')))
+    lines = [json.loads(line) for line in open(tmp_path / 'results.jsonl')]
+    for k, v in columns.items():
+        assert np.array_equal(binary[k], v, equal_nan=True) and binary[k].dtype == v.dtype
+        assert np.array_equal([float(row[k]) for row in rows], v, equal_nan=True)
+        assert np.array_equal([np.nan if line[k] is None else line[k] for line in lines], v, equal_nan=True)
+
+def test_benchmark_baseline():
+    """
+    Test function for the benchmark harness.
+
+    The cycle accuracy should not have regressed against the stored baseline, and compare should flag throughput
+    and accuracy regressions.
+    """
+    results = {'rankine': bench_rankine(n=20)}
+    accuracy = {k: v for k, v in results['rankine'].items() if not k.endswith('/s')}
+    assert compare({'rankine': accuracy}, load_baseline()) == []
+
+    baseline = {'sweep': {'sweep points/s': 1000.0, 'max error': 0.1}}
+    assert compare({'sweep': {'sweep points/s': 600.0, 'max error': 0.1}}, baseline) == []
+    assert len(compare({'sweep': {'sweep points/s': 400.0, 'max error': 0.2}}, baseline)) == 2
+
 if __name__ == "__main__":
     test_rankine_cycle()
@@ -0,0 +1,205 @@
+import numpy as np
+import pytest
+from HW6_1_OOP import ResistorNetwork, Resistor, VoltageSource
+from HW6_1_2_OOP import ResistorNetwork_2
+from bench_network import bench_residuals, grid_circuit, scan_loop_voltage_drops
+
+def grid_network(nx, ny):
+    """
+    A rectangular grid of 1 Ohm (along x) and 2 Ohm (along y) resistors with a 10 V source across its corners.
+    """
+    Net = ResistorNetwork()
+    name = lambda i, j: 'n{}_{}'.format(i, j)
+    for i in range(nx):
+        for j in range(ny):
+            if i + 1 < nx:
+                Net.Resistors.append(Resistor(1.0, name='x{}_{}'.format(i, j), nodes=(name(i, j), name(i + 1, j))))
+            if j + 1 < ny:
+                Net.Resistors.append(Resistor(2.0, name='y{}_{}'.format(i, j), nodes=(name(i, j), name(i, j + 1))))
+    Net.VSources.append(VoltageSource(10.0, name='src', nodes=(name(0, 0), name(nx - 1, ny - 1))))
+    return Net
+
+def test_mna_matches_fsolve():
+    """
+    The sparse MNA solution of both homework circuits matches the direct and the fsolve solutions of the equations
+    derived from the file, with currents signed by the node order of each resistor's name.
+    """
+    for filename in ('ResistorNetwork.txt', 'ResistorNetwork_2.txt'):
+        Net = ResistorNetwork_2()
+        Net.BuildNetworkFromFile(filename)
+        direct = Net.AnalyzeCircuit()
+        assert np.allclose(direct, Net.AnalyzeCircuit(solver='fsolve'))
+        assert np.allclose(direct, Net.AnalyzeCircuit(solver='mna'))
+    current = {r.Name: r.Current for r in Net.Resistors}
+    assert np.allclose([current['ad'], current['cd'], current['df']], [-14 / 3, -8 / 3, -13.7333333])
+
+def test_kirchoff_matrices():
+    """
+    KCL and KVL are derived from the file as one sparse system, and the residual is zero at the solution.
+    """
+    Net = ResistorNetwork()
+    Net.BuildNetworkFromFile('ResistorNetwork.txt')
+    M, rhs = Net.BuildKirchoffMatrices()
+    assert M.shape == (6, 6)  # 4 KCL (5 nodes) + 2 KVL, for 4 resistors + 2 sources
+    Net.AnalyzeCircuit()
+    i = [e.Current for e in Net.Resistors + Net.VSources]
+    assert np.allclose(Net.GetKirchoffVals(i), 0.0)
+    Net.Loops[1].Nodes = Net.Loops[0].Nodes[::-1]  # as many loops as needed, but not independent
+    with pytest.raises(ValueError):
+        Net.AnalyzeCircuit()
+    Net.Loops[1].Nodes = ['c', 'a', 'e']
+    with pytest.raises(ValueError):
+        Net.BuildKirchoffMatrices()
+    Net.Loops.pop()
+    with pytest.raises(ValueError):
+        Net.AnalyzeCircuit()
+
+def test_mna_kirchoff_laws():
+    """
+    The MNA solution of the second circuit, with a zero-ohm resistor, satisfies KCL at every node and KVL across
+    every resistor.
+    """
+    Net = ResistorNetwork()
+    Net.BuildNetworkFromFile('ResistorNetwork_2.txt')
+    V = Net.SolveMNA(ground='d')
+    assert V['d'] == 0.0 and np.isclose(V['f'], 0.0)  # df is a short
+    assert np.isclose(V['f'] - V['e'], 32.0) and np.isclose(V['b'] - V['a'], 16.0)
+    into = dict.fromkeys(V, 0.0)
+    for e in Net.Resistors + Net.VSources:
+        a, b = e.GetNodes()
+        into[a] -= e.Current
+        into[b] += e.Current
+    assert np.allclose(list(into.values()), 0.0)
+    # KVL: every resistor's voltage drop is the difference of its node voltages
+    for r in Net.Resistors:
+        a, b = r.GetNodes()
+        assert np.isclose(V[a] - V[b], r.DeltaV())
+
+def test_element_index():
+    """
+    Elements are found by name in either node order, and the loop voltage drops are signed by the direction of
+    traversal, so they vanish at the solution.
+    """
+    Net = ResistorNetwork()
+    Net.BuildNetworkFromFile('ResistorNetwork_2.txt')
+    assert Net.GetResistorByName('da') is Net.GetResistorByName('ad') is Net.Resistors[0]
+    assert Net.GetResistorByName('ab') is None and Net.GetElement('ba') == (Net.VSources[1], -1)
+    assert Net.GetElementDeltaV('fe') == -32.0
+    Net.AnalyzeCircuit()
+    assert np.allclose(Net.GetLoopVoltageDrops(), 0.0)
+    ad = Net.Resistors[0]
+    Net.Resistors[0] = Resistor(2.0, name='da')  # replaced in place, so the index is rebuilt on the next lookup
+    assert Net.GetElement('ad') == (Net.Resistors[0], -1) and Net.GetResistorByName('da') is not ad
+    Net.Resistors[0].Current = -ad.Current  # the same current, in the opposite node order
+    assert np.allclose(Net.GetLoopVoltageDrops(), 0.0)
+    Net.Resistors.append(Resistor(3.0, name='bf'))  # added by hand
+    assert Net.GetResistorByName('fb') is Net.Resistors[-1]
+    del Net.Resistors[-1]
+    assert Net.GetResistorByName('fb') is None
+
+def test_residual_benchmark():
+    """
+    The residual benchmark runs on a small circuit, whose generated loops satisfy KVL at the solution.
+    """
+    Net = grid_circuit(6, 5)
+    assert len(Net.Loops) == len(Net.Resistors) + len(Net.VSources) - 6 * 5 + 1
+    Net.AnalyzeCircuit()
+    drops = Net.GetLoopVoltageDrops()
+    assert np.allclose(drops, 0.0)
+    assert len(scan_loop_voltage_drops(Net, Net.Loops)) == len(drops)
+    results = bench_residuals(6, 5, sample=10)
+    assert results['elements'] == 50 and results['index speed up'] > 1
+
+def test_loops_found_automatically():
+    """
+    Without loops in the file, the KVL equations come from a fundamental cycle basis and give the same currents,
+    also on a grid of thousands of elements.
+    """
+    Net = ResistorNetwork()
+    Net.BuildNetworkFromFile('ResistorNetwork_2.txt')
+    listed = Net.AnalyzeCircuit()
+    Net.Loops = []
+    assert np.allclose(Net.AnalyzeCircuit(), listed)
+    Net = grid_network(40, 40)
+    assert np.allclose(Net.AnalyzeCircuit(), Net.AnalyzeCircuit(solver='mna'))
+
+def test_mna_large_grid():
+    """
+    A generated grid with tens of thousands of nodes solves directly to a small residual.
+    """
+    Net = grid_network(150, 150)
+    A, b, nodes, branches, ends = Net.BuildMNA()
+    # one node is ground and one unknown is the source current
+    assert len(nodes) == 150 * 150 and A.shape == (len(nodes),) * 2
+    Net.SolveMNA()
+    V = Net.NodeVoltages
+    x = np.append(np.delete(np.array(list(V.values())), 0), Net.VSources[0].Current)
+    assert np.abs(A @ x - b).max() < 1e-9
+    assert np.isclose(V['n149_149'] - V['n0_0'], 10.0)
+
+def test_network_file_parser(tmp_path):
+    """
+    Files are read in one pass into element tables: only whole tags open blocks, the Nodes field allows longer node
+    names, and malformed files raise ValueErrors naming the line.
+    """
+    Net = ResistorNetwork()
+    Net.BuildNetworkFromFile('ResistorNetwork.txt')
+    assert [r.Name for r in Net.Resistors] == ['ad', 'bc', 'cd', 'ce'] and len(Net.Loops) == 2
+    assert Net.ResistorNodes.shape == (4, 2) and Net.SourceNodes.shape == (2, 2)
+    names, ends = Net.GetNodeIndices()
+    Net.ElementsChanged()  # discards the tables, so the nodes are numbered from the element objects
+    by_objects = Net.GetNodeIndices()
+    assert names == by_objects[0] and np.array_equal(ends, by_objects[1])
+    # replacing an element in place discards the tables too, so the solvers see the new element
+    Net.BuildNetworkFromFile('ResistorNetwork.txt')
+    Net.Resistors[3] = Resistor(4.0, name='be')
+    assert np.allclose(Net.AnalyzeCircuit(solver='mna'), [-0.6154, 4.9231, 4.9231, -4.3077], atol=1e-4)
+    Net.Resistors[3].Resistance = 2.0  # values edited in place are read by the next solve
+    assert np.allclose(Net.AnalyzeCircuit(solver='mna'), [1.0, 6.0, 6.0, -7.0])
+    Net.BuildNetworkFromFile('ResistorNetwork.txt')
+    before = Net.AnalyzeCircuit()
+    Net.Resistors[0].Resistance = 100.0
+    Net.VSources[0].Voltage = 0.0
+    for solver in ('kirchoff', 'mna'):
+        after = Net.AnalyzeCircuit(solver=solver)
+        assert not np.allclose(after, before)
+        assert np.allclose(Net.GetKirchoffVals([e.Current for e in Net.Resistors + Net.VSources]), 0.0)
+
+    f = tmp_path / 'net.txt'
+    f.write_text('<Resistor>\nName = source1\nResistance = 5\nNodes = loop, resistor\n</Resistor>\n'
+                 '< source >\nName = s\nValue = 10\nNodes = resistor, loop\n</source>\n')
+    Net.BuildNetworkFromFile(str(f))
+    assert Net.Resistors[0].Name == 'source1' and Net.Resistors[0].GetNodes() == ('loop', 'resistor')
+    assert Net.NodeNames == ['loop', 'resistor'] and Net.GetElement('source1') == (Net.Resistors[0], 1)
+    assert np.isclose(Net.AnalyzeCircuit(solver='mna')[0], 2.0)  # the source raises the loop node by 10 V
+
+    bad = {'<Resistor>\nName = ab\nResistance = 2 ohm\n</Resistor>\n': 'line 3',
+           '<Resistor>\nName = ab\nResistance = 2\n': 'line 1',
+           '<Resistor>\nName = ab\nResistance = 2\n</Resistor>\n<Capacitor>\n': 'line 5',
+           'Name = ab\n': 'line 1',
+           '\n<Source>\nName = ab\n</Source>\n': 'line 2',
+           '<Resistor>\nName = ab\nColour = red\n</Resistor>\n': 'line 3'}
+    for text, line in bad.items():
+        f.write_text(text)
+        with pytest.raises(ValueError, match=line + ':'):
+            Net.BuildNetworkFromFile(str(f))
+
+def test_network_file_runs(tmp_path):
+    """
+    A file of many like blocks reads the same whatever the chunk size, and an error inside a run of blocks
+    still names its own line.
+    """
+    block = '<Resistor>\nName = r{0}\nResistance = {1}\nNodes = n{0}, n{2}\n</Resistor>\n\n'
+    f = tmp_path / 'chain.txt'
+    f.write_text(''.join(block.format(k, k + 1, k + 1) for k in range(50)))
+    Net = ResistorNetwork()
+    Net.BuildNetworkFromFile(str(f))
+    Small = ResistorNetwork()
+    Small.BuildNetworkFromFile(str(f), chunk_size=16)
+    assert len(Net.Resistors) == 50 and Net.Resistors[49].Resistance == 50.0
+    assert [r.GetNodes() for r in Net.Resistors] == [r.GetNodes() for r in Small.Resistors]
+    assert Net.NodeNames == Small.NodeNames
+
+    f.write_text(''.join(block.format(k, 'x' if k == 30 else k + 1, k + 1) for k in range(50)))
+    with pytest.raises(ValueError, match='line 183:'):
+        Net.BuildNetworkFromFile(str(f))
@@ -0,0 +1,177 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import if97
+from scipy.interpolate import griddata
+from steam import steam, SteamStateArray, STEAM_CACHE, cached_steam, get_backend
+from steam_tables import SteamTables, TABLES, convert_table, SAT_TABLE_FILE, SUPERHEATED_TABLE_FILE, saturation_line, \
+    superheated_table, spline_cache_file, spline_saturation_line
+
+def test_tables_parsed_once(tmp_path):
+    """
+    Test function for the shared steam table registry.
+
+    The tables should be parsed once, shared as read-only arrays, and re-read only after the file changes on disk.
+    """
+    sat_file = tmp_path / 'sat.txt'
+    shutil.copy(SAT_TABLE_FILE, sat_file)
+    tables = SteamTables(sat_file=str(sat_file), superheated_file=SUPERHEATED_TABLE_FILE)
+
+    first = tables.saturated()
+    assert tables.saturated() is first
+    assert not first[0].flags.writeable
+    assert not tables.refresh()
+
+    # rewrite the file without its last row; the cache should notice and re-read it
+    lines = sat_file.read_text().splitlines()
+    sat_file.write_text('\n'.join(lines[:-1]) + '\n')
+    os.utime(sat_file, ns=(0, 0))
+    assert tables.refresh()
+    assert len(tables.saturated()[0]) == len(first[0]) - 1
+
+def test_saturation_line_matches_griddata():
+    """
+    Test function for the saturation line interpolator.
+
+    A single lookup should return the same seven properties as seven separate griddata calls.
+    """
+    ts, ps, hfs, hgs, sfs, sgs, vfs, vgs = TABLES.saturated()
+    p = np.array([8.0, 100.0, 7350.0, 8575.0])  # kPa
+    expected = [griddata(ps, col, p / 100, method='linear') for col in (ts, hfs, hgs, sfs, sgs, vfs, vgs)]
+    assert np.allclose(saturation_line()(p), expected)
+    assert np.isnan(saturation_line()(1e6)).all()
+
+def test_superheated_table():
+    """
+    Test function for the superheated region interpolator.
+
+    Table points should be reproduced exactly, arrays of points answered in one call, and points off the table nan.
+    """
+    tcol, hcol, scol, pcol = TABLES.superheated()
+    h, s, v = superheated_table()(pcol, tcol)
+    assert np.allclose(h, hcol) and np.allclose(s, scol)
+    h, s, v = superheated_table()(8000, 500)  # midway between the 480 and 520 °C rows of the 8 MPa isobar
+    assert np.isclose(h, (3348.4 + 3447.7) / 2) and np.isclose(s, (6.66 + 6.79) / 2)
+    assert np.isnan(superheated_table()(8000, 2000)[:2]).all()
+
+def test_steam_state_array_matches_steam():
+    """
+    Test function for the batch steam API.
+
+    Every element of a SteamStateArray should agree with a steam object built from the same inputs.
+    """
+    p = np.array([8.0, 100.0, 7350.0, 8000.0])
+    for prop, values in (('T', [200.0, 400.0, 500.0, 600.0]), ('x', [0.0, 0.3, 0.9, 1.0]),
+                         ('h', [2000.0, 1500.0, 2050.0, 2500.0]), ('s', [6.0, 5.5, 5.0, 4.0])):
+        batch = SteamStateArray(p, **{prop: values})
+        for i in range(len(p)):
+            single = steam(p[i], **{prop: values[i]})
+            assert batch.region[i] == single.region
+            for k in ('T', 'h', 's', 'v'):
+                assert np.isclose(getattr(batch, k)[i], getattr(single, k))
+
+def test_superheated_inverse_lookups():
+    """
+    Test function for the (p, h) and (p, s) inverse superheated tables.
+
+    A superheated state given h or s should recover the temperature of the forward (p, T) lookup, in both the
+    steam class and the batch API.
+    """
+    p = np.array([100.0, 1000.0, 4000.0, 8000.0])
+    T = np.array([250.0, 450.0, 500.0, 600.0])
+    h, s, v = superheated_table()(p, T)
+    for prop, values in (('h', h), ('s', s)):
+        batch = SteamStateArray(p, **{prop: values})
+        assert (batch.region == 'Superheated').all()
+        assert np.allclose(batch.T, T, atol=1.0) and np.allclose(batch.v, v, rtol=1e-2)
+        single = steam(p[1], **{prop: values[1]})
+        assert single.region == 'Superheated' and np.isclose(single.T, T[1], atol=1.0)
+    # a compressed liquid h (x < 0) and an h off the superheated table are undetermined in both APIs
+    for h in (500.0, 9000.0):
+        batch = SteamStateArray([8000.0], h=[h])
+        single = steam(8000.0, h=h)
+        assert batch.region[0] is single.region is None and np.isnan(batch.x[0]) and single.x is None
+
+def test_binary_tables(tmp_path):
+    """
+    Test function for the binary steam table format.
+
+    Converted tables should be memory-mapped and give the same columns as the text tables.
+    """
+    sat_bin = convert_table(SAT_TABLE_FILE, str(tmp_path / 'sat.bin'))
+    sup_bin = convert_table(SUPERHEATED_TABLE_FILE, str(tmp_path / 'sup.bin'))
+    tables = SteamTables(sat_file=sat_bin, superheated_file=sup_bin)
+    for binary, text in ((tables.saturated(), TABLES.saturated()), (tables.superheated(), TABLES.superheated())):
+        assert isinstance(binary[0], np.memmap) and not binary[0].flags.writeable
+        assert all(np.array_equal(b, t) for b, t in zip(binary, text))
+
+def test_cached_steam():
+    """
+    Test function for the memoized steam constructor.
+
+    Repeated states should be served from the cache as immutable snapshots, with LRU eviction, and reloading the
+    tables should force a recompute.
+    """
+    STEAM_CACHE.clear()
+    STEAM_CACHE.maxsize = 2
+    try:
+        first = cached_steam(8, x=0, name='Pump Inlet')
+        again = cached_steam(8, x=0)
+        assert again.h == first.h and first.name == 'Pump Inlet' and again.name is None
+        assert STEAM_CACHE.info()['hits'] == 1
+        with pytest.raises(AttributeError):
+            first.h = 0.0
+        cached_steam(8000, x=1)
+        cached_steam(8000, T=500)  # evicts the least recently used state (8 kPa, x=0)
+        cached_steam(8, x=0)
+        assert STEAM_CACHE.info() == {'hits': 1, 'misses': 4, 'size': 2, 'maxsize': 2}
+        TABLES.invalidate()
+        cached_steam(8, x=0)
+        assert STEAM_CACHE.misses == 5
+    finally:
+        STEAM_CACHE.maxsize = 1024
+        STEAM_CACHE.clear()
+
+def test_if97_backend():
+    """
+    Test function for the IAPWS-IF97 property backend.
+
+    The region 1, 2 and 4 equations should reproduce the verification values published with IAPWS-IF97, and the
+    steam class should give the same states with either backend to within the table accuracy.
+    """
+    h, s, v, cp = if97.region1(np.array([3.0, 80.0, 3.0]), np.array([300.0, 300.0, 500.0]))
+    assert np.allclose(h, [115.331273, 184.142828, 975.542239])
+    assert np.allclose(s, [0.392294792, 0.368563852, 2.58041912])
+    h, s, v, cp = if97.region2(np.array([0.0035, 0.0035, 30.0]), np.array([300.0, 700.0, 700.0]))
+    assert np.allclose(h, [2549.91145, 3335.68375, 2631.49474])
+    assert np.allclose(v, [39.4913866, 92.3015898, 0.00542946619])
+    assert np.allclose(if97.psat(np.array([300.0, 500.0, 600.0])), [0.00353658941, 2.63889776, 12.3443146])
+    assert np.allclose(if97.Tsat(np.array([0.1, 1.0, 10.0])), [372.755919, 453.035632, 584.149488])
+
+    for kwargs in ({'x': 0.5}, {'T': 500.0}, {'s': 7.0}):
+        table, analytic = steam(8000, **kwargs), steam(8000, backend='if97', **kwargs)
+        assert table.region == analytic.region and np.isclose(table.h, analytic.h, rtol=1e-2)
+
+def test_spline_saturation_line(tmp_path):
+    """
+    Test function for the spline saturation model.
+
+    The coefficients should be cached beside the table and reused, the spline should pass through the table rows,
+    and between rows it should be closer to IF97 than linear interpolation.
+    """
+    sat_file = tmp_path / 'sat.txt'
+    shutil.copy(SAT_TABLE_FILE, sat_file)
+    tables = SteamTables(sat_file=str(sat_file), superheated_file=SUPERHEATED_TABLE_FILE)
+    spline = spline_saturation_line(tables)
+    assert os.path.exists(spline_cache_file(str(sat_file)))
+    tables.invalidate()
+    assert np.array_equal(spline_saturation_line(tables).coefs, spline.coefs)
+
+    ps = tables.saturated()[1] * 100
+    assert np.allclose(spline(ps), saturation_line(tables)(ps))
+    pm = (ps[1:] + ps[:-1]) / 2
+    reference = get_backend('if97').saturation(pm)
+    spline_error = np.nanmedian(np.abs(spline(pm) - reference)[1:5])
+    linear_error = np.nanmedian(np.abs(saturation_line(tables)(pm) - reference)[1:5])
+    assert spline_error < linear_error / 100